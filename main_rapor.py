@@ -1,56 +1,61 @@
+import time
+_T_START = time.perf_counter()
+
 import os
-import json
+import sys
+import queue
+import threading
 import customtkinter as ctk
 from tkinter import messagebox
-from fpdf import FPDF
 from tkinter import filedialog
+from rapor.core import (
+    SUBJECTS, get_predikat, hitung_rata_status, validasi_siswa, validasi_nilai,
+    open_app_storage, save_data,
+)
+# modul PDF / export (fpdf, process pool) di-import saat dipakai saja
+from rapor.saver import SaveWorker
+from rapor import core
+from rapor.model import DataModel
+from rapor.student import Student
+from rapor.storage import move_aside
+from rapor.json_stream import DataFileError, LoadReport
+from rapor.aggregates import Aggregates
+from rapor.search_index import SearchIndex
+from rapor.columns import ColumnIndex
+from rapor.terms import TermHistory
 
 # KONFIGURASI GLOBAL
 COLOR_LULUS = "#22c55e"
 COLOR_TIDAK_LULUS = "#ef4444"
 
 # Konfigurasi dasar
-DATA_FILE = "data_siswa.json"
-SUBJECTS = ["Matematika", "Bahasa Indonesia", "Bahasa Inggris", "IPA", "IPS"]
-
-def load_data():
-    if not os.path.exists(DATA_FILE):
-        return {}
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-def save_data(data):
-    with open(DATA_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def hitung_rata_status(nilai_dict):
-    total = sum(nilai_dict.values()) if nilai_dict else 0
-    rata = total / len(nilai_dict) if nilai_dict else 0
-    status = "LULUS" if rata >= 75 else "TIDAK LULUS"
-    return rata, status
-
-def get_predikat(nilai):
-    if nilai >= 90:
-        return "A"
-    elif nilai >= 80:
-        return "B"
-    elif nilai >= 70:
-        return "C"
-    elif nilai >= 60:
-        return "D"
-    else:
-        return "E"
+MODE_TERPISAH = "File terpisah"
+MODE_BUKU = "Satu file (buku rapor)"
+MAX_MATCHES = 50  # batas pilihan hasil pencarian di halaman Input Nilai
+SEARCH_DEBOUNCE_MS = 150  # jeda ketikan sebelum pencarian dijalankan
+SEARCH_CHUNK = 2000       # kandidat yang diperiksa per tick event loop
+DASHBOARD_PAGE_SIZES = ["50", "100", "250", "500"]
+DASHBOARD_PAGE_SIZE = "100"  # siswa per halaman di daftar dashboard
+URUT_NISN = "Urut NISN"
+URUT_TERTINGGI = "Nilai tertinggi"
+URUT_TERENDAH = "Nilai terendah"
+TOP_PERINGKAT = 10  # jumlah siswa di daftar peringkat halaman statistik
+SEMUA_KELAS = "Semua"  # sama dengan rapor.batch.SEMUA_KELAS
+SEMESTER_BERJALAN = "Semester berjalan"  # pilihan semester di detail siswa
+# laporan waktu startup di console: set RAPOR_STARTUP_REPORT=1
+STARTUP_REPORT = os.environ.get("RAPOR_STARTUP_REPORT") == "1"
+LOAD_QUEUE_SIZE = 8      # potongan siswa yang boleh menunggu di antrean loading
+LOAD_POLL_MS = 20
+LOAD_TICK_MS = 50        # lama maksimal memasukkan data per tick event loop
+LOAD_REFRESH_MS = 1000   # halaman yang tampil digambar ulang selama loading
+WATCH_MS = 1000          # cek perubahan file dari instance lain
+MAX_LOAD_ERRORS = 15     # record rusak yang ditampilkan di pesan
 
 def export_pdf_for_student(nisn, nama, kelas, nilai_dict):
-    rata, status = hitung_rata_status(nilai_dict)
-    predikat_rata = get_predikat(rata)
+    from rapor.pdf import rapor_filename, write_rapor_pdf
 
     # FILE SAVE DIALOG
-    safe_name = nama.replace(" ", "_")
-    default_filename = f"Rapor_{nisn}_{safe_name}.pdf"
+    default_filename = rapor_filename(nisn, nama, kelas)
 
     filepath = filedialog.asksaveasfilename(
         title="Simpan Rapor PDF",
@@ -63,63 +68,7 @@ def export_pdf_for_student(nisn, nama, kelas, nilai_dict):
         return None
 
     try:
-        pdf = FPDF()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.add_page()
-
-        # ===== HEADER =====
-        pdf.set_font("Arial", "B", 16)
-        pdf.cell(0, 10, "LAPORAN HASIL BELAJAR SISWA", ln=True, align="C")
-        pdf.cell(0, 10, "(RAPOR)", ln=True, align="C")
-        pdf.ln(8)
-
-        # ===== IDENTITAS =====
-        pdf.set_font("Arial", size=12)
-
-        def info_row(label, value, label_w=40):
-            pdf.cell(label_w, 8, label)
-            pdf.cell(2, 8, ":")
-            pdf.cell(0, 8, str(value), ln=True)
-
-        info_row("Nama Peserta Didik", nama)
-        info_row("NISN", nisn)
-        info_row("Kelas", kelas)
-
-        pdf.ln(8)
-
-        # ===== TABEL NILAI =====
-        COL_NO = 12
-        COL_MAPEL = 90
-        COL_NILAI = 28
-        COL_PRED = 28
-
-        table_width = COL_NO + COL_MAPEL + COL_NILAI + COL_PRED
-        start_x = (pdf.w - table_width) / 2
-
-        pdf.set_font("Arial", "B", 12)
-        pdf.set_x(start_x)
-        pdf.cell(COL_NO, 8, "No", border=1, align="C")
-        pdf.cell(COL_MAPEL, 8, "Mata Pelajaran", border=1, align="C")
-        pdf.cell(COL_NILAI, 8, "Nilai", border=1, align="C")
-        pdf.cell(COL_PRED, 8, "Predikat", border=1, align="C", ln=True)
-
-        pdf.set_font("Arial", size=12)
-        for i, (mapel, nilai) in enumerate(nilai_dict.items(), start=1):
-            pdf.set_x(start_x)
-            pdf.cell(COL_NO, 8, str(i), border=1, align="C")
-            pdf.cell(COL_MAPEL, 8, mapel, border=1)
-            pdf.cell(COL_NILAI, 8, str(nilai), border=1, align="C")
-            pdf.cell(COL_PRED, 8, get_predikat(nilai), border=1, align="C", ln=True)
-
-        pdf.ln(8)
-
-        # ===== RINGKASAN =====
-        info_row("Nilai Rata-rata", f"{rata:.2f}")
-        info_row("Predikat Rata-rata", predikat_rata)
-        info_row("Status Kelulusan", status)
-
-        pdf.output(filepath)
-        return filepath
+        return write_rapor_pdf(filepath, nisn, nama, kelas, nilai_dict)
 
     except Exception as e:
         messagebox.showerror("Error", f"Gagal membuat PDF:\n{e}")
@@ -133,11 +82,64 @@ class RaporApp(ctk.CTk):
     def __init__(self):
         super().__init__()
         self.title("Aplikasi Rapor Sederhana")
+        if core.RULES_ERROR:
+            # aturan penilaian rusak: jangan diam-diam memakai aturan default
+            self.withdraw()
+            messagebox.showerror("Aturan nilai tidak valid", core.RULES_ERROR)
+            sys.exit(1)
         self.iconbitmap("logo.ico")
         self.geometry("980x640")
         self.minsize(860, 540)
 
-        self.data = load_data()
+        self.startup_timing = {"import": time.perf_counter() - _T_START}
+        t0 = time.perf_counter()
+
+        # data siswa dimuat bertahap setelah jendela tampil (start_loading)
+        backend = open_app_storage()
+        self.backend = backend
+        self.data = {}
+        self.index = SearchIndex(self.data)
+        self.aggregates = Aggregates(self.data)
+        self.columns = ColumnIndex(self.data)
+        # riwayat semester: hanya index (ringkasan per semester) yang dibaca
+        self.history = TermHistory(core.TERM_DIR)
+        if self.history.aktif:
+            self.title(f"Aplikasi Rapor Sederhana — {self.history.aktif}")
+        self.startup_timing["open_storage"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+
+        # penyimpanan berjalan di thread terpisah, status dikirim lewat antrean
+        self.save_status = queue.Queue()
+        self.store = SaveWorker(
+            backend, on_status=lambda status, detail: self.save_status.put((status, detail)),
+            version=lambda: self.synced_seq,
+        )
+
+        # file data bisa dipakai bersama instance lain: perubahan dari luar
+        # digabung per baris (poll_watch), versi yang sudah digabung = synced_seq
+        self.synced_seq = None
+        self.watch_events = queue.Queue()
+        self.watch_busy = False
+        self.refresh_rows = set()
+
+        # semua mutasi lewat model; index dan halaman menerima event perubahan
+        self.model = DataModel(
+            self.data, self.store, wrap=Student.from_dict if core.COMPACT_MODEL else None
+        )
+        self.model.subscribe(self.index.apply_change)
+        self.model.subscribe(self.aggregates.apply_change)
+        self.model.subscribe(self.columns.apply_change)
+        self.model.subscribe(self.on_data_change)
+
+        # penyimpanan per kelas (shard): hanya manifest yang dibaca saat start,
+        # siswa satu kelas dimuat saat halaman membutuhkannya (require)
+        self.lazy_shards = getattr(backend, "lazy", False)
+        self.shard_summary = backend.summaries() if self.lazy_shards else {}
+        self.loaded_kelas = set()
+        self.loading = False
+        self.load_kelas = None
+        self.load_waiting = set()
+        self.after_load = []
 
         # Layout: sidebar + content frame
         self.grid_rowconfigure(0, weight=1)
@@ -169,25 +171,399 @@ class RaporApp(ctk.CTk):
         self.btn_mapel = ctk.CTkButton(self.sidebar, text="Search Mapel", command=self.show_mapel)
         self.btn_mapel.grid(row=4, column=0, padx=12, pady=8, sticky="we")
 
+        self.btn_statistik = ctk.CTkButton(self.sidebar, text="Statistik", command=self.show_statistik)
+        self.btn_statistik.grid(row=5, column=0, padx=12, pady=8, sticky="we")
+
+        self.btn_batch = ctk.CTkButton(
+            self.sidebar, text="Export Massal", fg_color="gray", command=self.open_batch_export
+        )
+        self.btn_batch.grid(row=6, column=0, padx=12, pady=8, sticky="we")
+
+        self.lbl_load = ctk.CTkLabel(self.sidebar, text="", text_color="gray")
+        self.lbl_load.grid(row=7, column=0, padx=12, pady=8, sticky="we")
+
+        self.lbl_save = ctk.CTkLabel(self.sidebar, text="", text_color="gray")
+        self.lbl_save.grid(row=9, column=0, padx=12, pady=8, sticky="we")
+
         self.sidebar_buttons = [
             self.btn_dashboard,
             self.btn_siswa,
             self.btn_nilai,
             self.btn_search,
-            self.btn_mapel
+            self.btn_mapel,
+            self.btn_statistik
         ]
         
         self.COLOR_NORMAL = self.btn_dashboard.cget("fg_color") 
         self.COLOR_ACTIVE = self.btn_dashboard.cget("hover_color")
 
-        # Create pages
+        # Pages dibuat saat pertama kali dibuka
+        self.page_classes = {
+            Page.__name__: Page
+            for Page in (DashboardPage, SiswaPage, NilaiPage, SearchPage, MapelPage, StatistikPage)
+        }
         self.pages = {}
-        for Page in (DashboardPage, SiswaPage, NilaiPage, SearchPage, MapelPage):
-            page = Page(self.content, self)
-            self.pages[Page.__name__] = page
-            page.grid(row=0, column=0, sticky="nsew")
+        self.current_page = None
+        self.startup_timing["sidebar"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
 
         self.show_dashboard()
+        self.startup_timing["dashboard"] = time.perf_counter() - t0
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(100, self.poll_save_status)
+        self.after(WATCH_MS, self.poll_watch)
+        if not self.lazy_shards:
+            self.start_loading()
+        # dipanggil setelah mainloop berjalan dan jendela pertama kali digambar
+        self.after_idle(self.report_startup)
+
+    def report_startup(self):
+        self.startup_timing["first_paint"] = time.perf_counter() - _T_START
+        if STARTUP_REPORT:
+            parts = " | ".join(f"{k}: {v * 1000:.0f} ms" for k, v in self.startup_timing.items())
+            print(f"[startup] {len(self.data)} siswa | {parts}", file=sys.stderr)
+
+    # LOADING BERTAHAP: file dibaca di thread loader, siswa masuk ke model per
+    # potongan sehingga dashboard sudah tampil selama file masih dibaca
+    def start_loading(self, kelas=None):
+        # kelas: daftar shard yang dimuat (penyimpanan per kelas), None = semua
+        if kelas is not None:
+            self.loaded_kelas.update(kelas)
+        self.load_kelas = kelas
+        self.loading = True
+        self.load_started = time.perf_counter()
+        self.load_report = LoadReport()
+        self.load_events = queue.Queue(maxsize=LOAD_QUEUE_SIZE)
+        self.load_cancel = threading.Event()
+        self.load_dirty = False
+        self.last_refresh = time.perf_counter()
+        self.lbl_load.configure(text="Memuat data...", text_color="gray")
+        threading.Thread(target=self.load_worker, daemon=True).start()
+        self.after(LOAD_POLL_MS, self.poll_load)
+
+    def load_worker(self):
+        # thread loader: hanya mengirim event ke antrean, tidak menyentuh Tk
+        def progress(done, total):
+            self.send_load(("progress", done, total))
+
+        options = {} if self.load_kelas is None else {"kelas": self.load_kelas}
+        try:
+            for students in self.backend.stream(self.load_report, progress=progress, **options):
+                if not self.send_load(("students", students)):
+                    return
+        except Exception as e:
+            self.send_load(("error", e))
+            return
+        self.send_load(("done",))
+
+    def send_load(self, item):
+        # antrean dibatasi supaya data tidak menumpuk di memori kalau GUI lebih
+        # lambat dari parser; False kalau loading dibatalkan
+        while not self.load_cancel.is_set():
+            try:
+                self.load_events.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def poll_load(self):
+        deadline = time.perf_counter() + LOAD_TICK_MS / 1000
+        finished = None
+        while finished is None and time.perf_counter() < deadline:
+            try:
+                item = self.load_events.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == "students":
+                self.model.load_many(item[1])
+            elif item[0] == "progress":
+                done, total = item[1], item[2]
+                persen = done * 100 // total if total else 100
+                self.lbl_load.configure(text=f"Memuat data... {persen}%")
+            else:
+                finished = item
+
+        if finished is not None:
+            self.finish_loading(finished)
+            return
+        if self.load_dirty and time.perf_counter() - self.last_refresh >= LOAD_REFRESH_MS / 1000:
+            self.load_dirty = False
+            self.last_refresh = time.perf_counter()
+            self.refresh_all()
+        self.after(LOAD_POLL_MS, self.poll_load)
+
+    def finish_loading(self, item):
+        self.loading = False
+        self.load_dirty = False
+        self.synced_seq = getattr(self.backend, "loaded_seq", None)
+        self.refresh_all()
+        self.startup_timing["load_data"] = time.perf_counter() - self.load_started
+        if STARTUP_REPORT:
+            print(f"[startup] data dimuat: {len(self.data)} siswa dalam "
+                  f"{self.startup_timing['load_data'] * 1000:.0f} ms", file=sys.stderr)
+
+        if item[0] == "error":
+            if self.load_kelas is not None:
+                self.loaded_kelas.difference_update(self.load_kelas)
+            self.load_waiting = set()
+            self.after_load = []
+            self.lbl_load.configure(text="⚠ Data tidak terbaca", text_color=COLOR_TIDAK_LULUS)
+            self.load_failed(item[1])
+            return
+
+        report = self.load_report
+        if report.ok:
+            self.lbl_load.configure(text="")
+        else:
+            self.lbl_load.configure(text=f"⚠ {len(report.errors)} data rusak", text_color=COLOR_TIDAK_LULUS)
+            lines = [
+                f"Baris {line}, kolom {column}" + (f" (NISN {nisn})" if nisn else "") + f": {msg}"
+                for line, column, nisn, msg in report.errors[:MAX_LOAD_ERRORS]
+            ]
+            if len(report.errors) > MAX_LOAD_ERRORS:
+                lines.append(f"... dan {len(report.errors) - MAX_LOAD_ERRORS} lainnya")
+            messagebox.showwarning(
+                "Data rusak",
+                f"{len(report.errors)} data siswa tidak bisa dibaca dan dilewati:\n\n"
+                + "\n".join(lines)
+                + f"\n\nSalinan file asli: {report.backup}",
+            )
+
+        # kelas yang diminta selama loading berjalan, lalu callback yang menunggu
+        waiting = [k for k in self.load_waiting if k not in self.loaded_kelas]
+        self.load_waiting = set()
+        if waiting:
+            self.start_loading(waiting)
+            return
+        callbacks, self.after_load = self.after_load, []
+        for callback in callbacks:
+            callback()
+
+    def load_failed(self, error):
+        # file sama sekali tidak terbaca: jangan diam-diam mulai dengan data
+        # kosong (simpan berikutnya bisa menimpa file itu)
+        if not isinstance(error, DataFileError):
+            messagebox.showerror("Data tidak terbaca", f"Gagal membaca data siswa:\n{error}")
+            self.destroy()
+            return
+        lanjut = messagebox.askyesno(
+            "Data tidak terbaca",
+            f"File data siswa tidak bisa dibaca:\n{error}\n\n"
+            "Pindahkan file itu (disimpan sebagai salinan) dan mulai tanpa data tersebut?",
+        )
+        if not lanjut:
+            self.destroy()
+            return
+        try:
+            backup = move_aside(error.path)
+        except OSError as e:
+            messagebox.showerror("Gagal", f"File tidak bisa dipindahkan:\n{e}")
+            self.destroy()
+            return
+        messagebox.showinfo("Data dipindahkan", f"File lama disimpan sebagai:\n{backup}")
+        # journal (perubahan setelah snapshot) tetap dimuat
+        self.start_loading(self.load_kelas)
+
+    # DATA PER KELAS
+    def unloaded_kelas(self):
+        return [k for k in self.shard_summary if k not in self.loaded_kelas]
+
+    def require(self, kelas=None, then=None):
+        # pastikan siswa satu kelas (None = semua kelas) sudah ada di memori;
+        # then dipanggil setelah dimuat. True kalau sudah lengkap sekarang
+        missing = [k for k in self.unloaded_kelas() if kelas is None or k == kelas]
+        if not missing and not self.loading:
+            if then:
+                then()
+            return True
+        if then:
+            self.after_load.append(then)
+        if missing:
+            if self.loading:
+                self.load_waiting.update(missing)
+            else:
+                self.start_loading(missing)
+        return False
+
+    def kelas_list(self):
+        return sorted(set(self.unloaded_kelas()) | {info.get("kelas", "-") for info in self.data.values()})
+
+    def kelas_summaries(self):
+        # kelas -> [siswa, dinilai, lulus]: kelas yang belum dimuat dari
+        # manifest, siswa di memori dari ringkasan per siswa
+        result = {}
+        for kelas in self.unloaded_kelas():
+            s = self.shard_summary[kelas]
+            result[kelas] = [s["siswa"], s["dinilai"], s["lulus"]]
+        for nisn, info in self.data.items():
+            row = result.setdefault(info.get("kelas", "-"), [0, 0, 0])
+            row[0] += 1
+            if info.get("nilai"):
+                row[1] += 1
+                if self.aggregates.summary(nisn, info)[1] == "LULUS":
+                    row[2] += 1
+        return result
+
+    def totals(self):
+        # (total, dinilai, lulus) untuk kartu dashboard
+        agg = self.aggregates
+        total, dinilai, lulus = agg.total, agg.dinilai, agg.lulus
+        for kelas in self.unloaded_kelas():
+            s = self.shard_summary[kelas]
+            total += s["siswa"]
+            dinilai += s["dinilai"]
+            lulus += s["lulus"]
+        return total, dinilai, lulus
+
+    def find_registered(self, nisn):
+        # data siswa dengan NISN ini, juga yang ada di kelas yang belum dimuat
+        info = self.data.get(nisn)
+        if info is None and self.lazy_shards:
+            kelas = self.backend.kelas_of(nisn)
+            if kelas is not None and kelas not in self.loaded_kelas:
+                info = self.backend.read_shard(kelas).get(nisn)
+        return info
+
+    # STATUS PENYIMPANAN (dibaca di thread Tk)
+    def poll_save_status(self):
+        last = None
+        conflicts = []
+        try:
+            while True:
+                last = self.save_status.get_nowait()
+                if last[0] == "conflict":
+                    conflicts.extend(last[1])
+        except queue.Empty:
+            pass
+        if conflicts:
+            self.save_conflict(conflicts)
+
+        if last:
+            status, detail = last
+            if status == "pending":
+                self.lbl_save.configure(text="Menyimpan...", text_color="gray")
+            elif status in ("saved", "conflict"):
+                self.lbl_save.configure(text="✔ Tersimpan", text_color=COLOR_LULUS)
+            else:
+                self.lbl_save.configure(text="⚠ Gagal menyimpan", text_color=COLOR_TIDAK_LULUS)
+
+        self.after(100, self.poll_save_status)
+
+    # perubahan yang ditolak penyimpanan: siswa itu sudah diubah instance
+    # lain sejak data ditampilkan. Baris tersebut dimuat ulang dari file
+    def save_conflict(self, records):
+        nisns = sorted({n for r in records for n in ((r["nisn"], r["old"]) if "old" in r else (r["nisn"],))})
+        self.refresh_rows.update(nisns)
+        daftar = ", ".join(nisns[:10]) + (f" dan {len(nisns) - 10} lainnya" if len(nisns) > 10 else "")
+        messagebox.showwarning(
+            "Data diubah di tempat lain",
+            f"Perubahan untuk NISN {daftar} tidak disimpan karena data siswa tersebut "
+            "sudah diubah dari komputer / jendela lain.\n\nData terbaru dimuat, silakan ulangi perubahan.",
+        )
+
+    # PERUBAHAN DARI INSTANCE LAIN: stat file dicek berkala (murah); kalau
+    # berubah, record baru dibaca di thread lalu digabung ke model per baris
+    def poll_watch(self):
+        try:
+            while True:
+                self.apply_watch(*self.watch_events.get_nowait())
+        except queue.Empty:
+            pass
+
+        if not self.loading and not self.watch_busy:
+            if self.refresh_rows:
+                nisns, self.refresh_rows = self.refresh_rows, set()
+                self.start_watch("rows", self.read_rows, nisns)
+            elif self.backend.changed():
+                self.start_watch("changes", self.backend.read_changes)
+        if self.history.changed():
+            self.reload_history()
+        self.after(WATCH_MS, self.poll_watch)
+
+    def reload_history(self):
+        # semester ditutup di instance lain / command line (new-term); index
+        # riwayat kecil, dibaca langsung di thread Tk
+        try:
+            self.history.reload()
+        except (OSError, ValueError):
+            return  # index sedang ditulis, dicoba lagi di poll berikutnya
+        aktif = self.history.aktif
+        self.title(f"Aplikasi Rapor Sederhana — {aktif}" if aktif else "Aplikasi Rapor Sederhana")
+        page = self.pages.get("SearchPage")
+        if page is not None:
+            page.update_terms()
+        self.refresh_all()
+
+    def start_watch(self, kind, job, *args):
+        self.watch_busy = True
+        threading.Thread(target=self.watch_worker, args=(kind, job, args), daemon=True).start()
+
+    def watch_worker(self, kind, job, args):
+        try:
+            result = job(*args)
+        except Exception as e:
+            kind, result = "error", e
+        self.watch_events.put((kind, result))
+
+    def read_rows(self, nisns):
+        # siswa tertentu dari file; yang tidak ada lagi = dihapus instance lain
+        found = self.backend.read_students(nisns)
+        records = [{"op": "put", "nisn": nisn, "data": info} for nisn, info in found.items()]
+        return records + [{"op": "delete", "nisn": nisn} for nisn in nisns if nisn not in found]
+
+    def resync_rows(self, current):
+        # perubahan instance lain tidak bisa dibaca per record (file disimpan
+        # penuh / journal sudah di-compact): file dibaca ulang di thread, yang
+        # dikirim ke GUI hanya siswa yang berbeda
+        fresh = self.backend.load()
+        records = [
+            {"op": "put", "nisn": nisn, "data": info}
+            for nisn, info in fresh.items() if current.get(nisn) != info
+        ]
+        records += [{"op": "delete", "nisn": nisn} for nisn in current if nisn not in fresh]
+        return records, self.backend.loaded_seq
+
+    def apply_watch(self, kind, result):
+        self.watch_busy = False
+        if kind == "error":
+            self.lbl_load.configure(text="⚠ Gagal membaca perubahan data", text_color=COLOR_TIDAK_LULUS)
+            return
+
+        resync = False
+        if kind == "changes":
+            records, resync, seq = result
+        elif kind == "resync":
+            records, seq = result
+            # perubahan sendiri yang belum tertulis tidak ditimpa
+            pending = self.store.pending_nisns()
+            records = [r for r in records if r["nisn"] not in pending]
+        else:  # "rows"
+            records, seq = result, self.synced_seq
+
+        merged = self.model.merge_external(records)
+        self.synced_seq = seq
+        if merged:
+            self.lbl_load.configure(text=f"↻ {merged} perubahan dari komputer lain", text_color="gray")
+        if resync:
+            self.start_watch("resync", self.resync_rows, dict(self.data))
+
+    # pastikan semua perubahan tertulis sebelum aplikasi ditutup
+    def on_close(self):
+        if self.loading:
+            self.load_cancel.set()
+        self.lbl_save.configure(text="Menyimpan...", text_color="gray")
+        self.update_idletasks()
+
+        if not self.store.close(timeout=10):
+            keluar = messagebox.askyesno(
+                "Gagal menyimpan",
+                f"Perubahan terakhir belum tersimpan:\n{self.store.error}\n\nTetap keluar tanpa menyimpan?"
+            )
+            if not keluar:
+                return
+        self.destroy()
     
     def set_active_sidebar(self, active_btn):
         for btn in self.sidebar_buttons:
@@ -195,15 +571,47 @@ class RaporApp(ctk.CTk):
 
         active_btn.configure(fg_color=self.COLOR_ACTIVE)
 
-    def show_page(self, page_name):
+    def get_page(self, page_name):
         page = self.pages.get(page_name)
+        if page is None and page_name in self.page_classes:
+            page = self.page_classes[page_name](self.content, self)
+            page.grid(row=0, column=0, sticky="nsew")
+            page.dirty = True
+            self.pages[page_name] = page
+        return page
+
+    def show_page(self, page_name):
+        page = self.get_page(page_name)
         if page:
-            try:
-                page.update_contents()
-            except Exception:
-                pass
+            # page hanya digambar ulang kalau datanya berubah sejak terakhir tampil
+            if page.dirty:
+                try:
+                    page.update_contents()
+                except Exception:
+                    pass
+                page.dirty = False
+            self.current_page = page_name
             page.tkraise()
 
+    # EVENT DARI MODEL: page yang tampil menerapkan perubahan itu saja,
+    # page lain cukup ditandai kotor
+    def on_data_change(self, event):
+        if event.get("load"):
+            # data dari file: digambar ulang berkala oleh poll_load
+            self.load_dirty = True
+            return
+        for name, page in self.pages.items():
+            if name != self.current_page:
+                page.dirty = True
+            elif event["op"] == "batch":
+                # banyak siswa sekaligus: gambar ulang sekali saja
+                page.update_contents()
+            else:
+                try:
+                    page.apply_change(event)
+                except Exception:
+                    page.update_contents()
+
     def show_dashboard(self):
         self.show_page("DashboardPage")
         self.set_active_sidebar(self.btn_dashboard)
@@ -213,23 +621,714 @@ class RaporApp(ctk.CTk):
         self.set_active_sidebar(self.btn_siswa)
 
     def show_nilai(self):
+        self.require()
         self.show_page("NilaiPage")
         self.set_active_sidebar(self.btn_nilai)
 
     def show_search(self):
+        self.require()
         self.show_page("SearchPage")
         self.set_active_sidebar(self.btn_search)
 
     def show_mapel(self):
+        self.require()
         self.show_page("MapelPage")
         self.set_active_sidebar(self.btn_mapel)
 
+    def show_statistik(self):
+        self.require()
+        self.show_page("StatistikPage")
+        self.set_active_sidebar(self.btn_statistik)
+
+    def open_batch_export(self):
+        self.require(then=lambda: BatchExportWindow(self))
+
+    # perubahan besar (mis. seluruh data diganti): semua page digambar ulang
     def refresh_all(self):
-        for page in self.pages.values():
-            try:
-                page.update_contents()
-            except Exception:
-                pass
+        for name, page in self.pages.items():
+            if name == self.current_page:
+                try:
+                    page.update_contents()
+                except Exception:
+                    pass
+                page.dirty = False
+            else:
+                page.dirty = True
+
+# Pop-up: export rapor massal (per kelas / seluruh sekolah)
+class BatchExportWindow(ctk.CTkToplevel):
+    def __init__(self, app):
+        from rapor.pdf import FILENAME_PATTERN
+
+        super().__init__(app)
+        self.app = app
+        self.title("Export Rapor Massal")
+        self.geometry("480x430")
+        self.transient(app)
+
+        self.cancel_event = None
+        self.events = queue.Queue()
+        self.running = False
+
+        ctk.CTkLabel(self, text="Export Rapor Massal", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+
+        # Kelas
+        frame_kelas = ctk.CTkFrame(self)
+        frame_kelas.pack(fill="x", padx=12, pady=6)
+        ctk.CTkLabel(frame_kelas, text="Kelas", width=110, anchor="w").pack(side="left")
+        kelas_list = sorted({info.get("kelas", "-") for info in app.data.values()})
+        self.kelas_var = ctk.StringVar(value=SEMUA_KELAS)
+        ctk.CTkOptionMenu(
+            frame_kelas, values=[SEMUA_KELAS] + kelas_list, variable=self.kelas_var
+        ).pack(side="left", fill="x", expand=True)
+
+        # Mode: satu PDF per siswa atau satu buku rapor
+        frame_mode = ctk.CTkFrame(self)
+        frame_mode.pack(fill="x", padx=12, pady=6)
+        ctk.CTkLabel(frame_mode, text="Mode", width=110, anchor="w").pack(side="left")
+        self.mode_var = ctk.StringVar(value=MODE_TERPISAH)
+        ctk.CTkOptionMenu(
+            frame_mode, values=[MODE_TERPISAH, MODE_BUKU], variable=self.mode_var
+        ).pack(side="left", fill="x", expand=True)
+
+        # Folder tujuan
+        frame_dir = ctk.CTkFrame(self)
+        frame_dir.pack(fill="x", padx=12, pady=6)
+        ctk.CTkLabel(frame_dir, text="Folder", width=110, anchor="w").pack(side="left")
+        self.ent_dir = ctk.CTkEntry(frame_dir)
+        self.ent_dir.pack(side="left", fill="x", expand=True, padx=(0, 6))
+        ctk.CTkButton(frame_dir, text="Pilih", width=60, command=self.choose_dir).pack(side="left")
+
+        # Pola nama file
+        frame_pattern = ctk.CTkFrame(self)
+        frame_pattern.pack(fill="x", padx=12, pady=6)
+        ctk.CTkLabel(frame_pattern, text="Nama file", width=110, anchor="w").pack(side="left")
+        self.ent_pattern = ctk.CTkEntry(frame_pattern)
+        self.ent_pattern.pack(side="left", fill="x", expand=True)
+        self.ent_pattern.insert(0, FILENAME_PATTERN)
+
+        ctk.CTkLabel(
+            self, text="Pola boleh memakai {nisn}, {nama}, {kelas}", text_color="gray",
+            font=ctk.CTkFont(size=12)
+        ).pack(padx=12, anchor="w")
+
+        # Progress
+        self.progress = ctk.CTkProgressBar(self)
+        self.progress.pack(fill="x", padx=12, pady=(14, 4))
+        self.progress.set(0)
+
+        self.lbl_status = ctk.CTkLabel(self, text="")
+        self.lbl_status.pack(padx=12)
+
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(pady=10)
+        self.btn_start = ctk.CTkButton(btn_row, text="Mulai Export", command=self.start)
+        self.btn_start.pack(side="left", padx=5)
+        self.btn_cancel = ctk.CTkButton(
+            btn_row, text="Batal", fg_color="gray", state="disabled", command=self.cancel
+        )
+        self.btn_cancel.pack(side="left", padx=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def choose_dir(self):
+        folder = filedialog.askdirectory(title="Pilih folder tujuan rapor", parent=self)
+        if folder:
+            self.ent_dir.delete(0, "end")
+            self.ent_dir.insert(0, folder)
+
+    def start(self):
+        folder = self.ent_dir.get().strip()
+        pattern = self.ent_pattern.get().strip()
+
+        if not folder:
+            messagebox.showerror("Error", "Folder tujuan wajib diisi.", parent=self)
+            return
+        # NISN wajib ada supaya nama file tidak bentrok
+        if "{nisn}" not in pattern:
+            messagebox.showerror("Error", "Pola nama file harus memuat {nisn}.", parent=self)
+            return
+        from rapor.pdf import rapor_filename
+        from rapor.batch import iter_students, select_students
+
+        try:
+            rapor_filename("0", "x", "x", pattern)
+        except (KeyError, IndexError, ValueError):
+            messagebox.showerror("Error", "Pola nama file tidak valid.", parent=self)
+            return
+
+        kelas = self.kelas_var.get()
+        if self.mode_var.get() == MODE_BUKU:
+            # buku rapor: siswa dialirkan satu per satu, tidak dikumpulkan dulu
+            total = sum(1 for _ in iter_students(self.app.data, kelas))
+            target = self._run_book
+            args = (iter_students(self.app.data, kelas), total, folder, kelas)
+        else:
+            students = select_students(self.app.data, kelas)
+            total = len(students)
+            target = self._run
+            args = (students, folder, pattern)
+
+        if not total:
+            messagebox.showwarning("Kosong", "Tidak ada siswa untuk diexport.", parent=self)
+            return
+
+        self.running = True
+        self.cancel_event = threading.Event()
+        self.btn_start.configure(state="disabled")
+        self.btn_cancel.configure(state="normal")
+        self.progress.set(0)
+        self.lbl_status.configure(text=f"0 / {total}")
+
+        # export dijalankan dari thread supaya jendela tetap responsif
+        threading.Thread(target=target, args=args, daemon=True).start()
+        self.after(100, self.poll)
+
+    def _run(self, students, folder, pattern):
+        from rapor.batch import export_batch
+
+        try:
+            results = export_batch(
+                students, folder, pattern,
+                progress=lambda done, total: self.events.put(("progress", done, total)),
+                cancel_event=self.cancel_event,
+            )
+            self.events.put(("done", results, len(students)))
+        except Exception as e:
+            self.events.put(("error", e))
+
+    def _run_book(self, students, total, folder, kelas):
+        from rapor.book import book_filename, write_rapor_book
+
+        path = os.path.join(folder, book_filename(kelas))
+
+        def progress(done):
+            # cukup kirim tiap 50 halaman, jangan membanjiri antrean
+            if done % 50 == 0 or done == total:
+                self.events.put(("progress", done, total))
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+            count = write_rapor_book(path, students, progress=progress, cancel_event=self.cancel_event)
+            self.events.put(("book", path, count, total))
+        except Exception as e:
+            self.events.put(("error", e))
+
+    def poll(self):
+        if not self.winfo_exists():
+            return
+        try:
+            while True:
+                event = self.events.get_nowait()
+                if event[0] == "progress":
+                    _, done, total = event
+                    self.progress.set(done / total)
+                    self.lbl_status.configure(text=f"{done} / {total}")
+                else:
+                    self.finish(event)
+                    return
+        except queue.Empty:
+            pass
+        self.after(100, self.poll)
+
+    def finish(self, event):
+        self.running = False
+        self.btn_start.configure(state="normal")
+        self.btn_cancel.configure(state="disabled")
+
+        if event[0] == "error":
+            self.lbl_status.configure(text="Gagal")
+            messagebox.showerror("Error", f"Export gagal:\n{event[1]}", parent=self)
+            return
+
+        if event[0] == "book":
+            _, path, count, total = event
+            if self.cancel_event.is_set():
+                text = f"Dibatalkan: {count} dari {total} halaman sudah ditulis ke\n{path}"
+            else:
+                text = f"Buku rapor ({count} halaman) berhasil disimpan:\n{path}"
+            self.lbl_status.configure(text=text.splitlines()[0])
+            messagebox.showinfo("Export Massal", text, parent=self)
+            return
+
+        _, results, total = event
+        gagal = [r for r in results if r[2]]
+        berhasil = len(results) - len(gagal)
+        if self.cancel_event.is_set():
+            text = f"Dibatalkan: {berhasil} dari {total} rapor sudah dibuat."
+        else:
+            text = f"{berhasil} rapor berhasil dibuat."
+        dari_cache = sum(1 for r in results if r[3])
+        if dari_cache:
+            text += f" ({dari_cache} tidak berubah, diambil dari cache)"
+        if gagal:
+            text += f"\n{len(gagal)} gagal, contoh: NISN {gagal[0][0]} — {gagal[0][2]}"
+        self.lbl_status.configure(text=text.splitlines()[0])
+        messagebox.showinfo("Export Massal", text, parent=self)
+
+    def cancel(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.lbl_status.configure(text="Membatalkan...")
+            self.btn_cancel.configure(state="disabled")
+
+    def on_close(self):
+        if self.running:
+            self.cancel()
+        self.destroy()
+
+# Pop-up: tabel nilai satu kelas (baris = siswa, kolom = mapel), disimpan
+# sekali di akhir sebagai satu batch
+class GradeGridWindow(ctk.CTkToplevel):
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Input Nilai per Kelas")
+        self.geometry("900x600")
+        self.transient(app)
+
+        self.rows = []   # (nisn, {mapel: entry})
+        self.invalid = set()
+
+        top = ctk.CTkFrame(self)
+        top.pack(fill="x", padx=10, pady=8)
+        ctk.CTkLabel(top, text="Kelas").pack(side="left", padx=(6, 8))
+        kelas_list = app.kelas_list()
+        self.kelas_var = ctk.StringVar(value=kelas_list[0] if kelas_list else "")
+        ctk.CTkOptionMenu(
+            top, values=kelas_list or [""], variable=self.kelas_var,
+            command=lambda _: self.change_kelas()
+        ).pack(side="left")
+        self.lbl_info = ctk.CTkLabel(top, text="", text_color="gray")
+        self.lbl_info.pack(side="left", padx=10)
+
+        ctk.CTkLabel(
+            self, text="Enter / ↓ ke baris berikutnya, ↑ ke baris sebelumnya, Tab ke mapel berikutnya. "
+                       "Sel kosong = nilai tidak diubah.",
+            text_color="gray", font=ctk.CTkFont(size=12)
+        ).pack(padx=10, anchor="w")
+
+        self.table = ctk.CTkScrollableFrame(self)
+        self.table.pack(fill="both", expand=True, padx=10, pady=6)
+
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(pady=8)
+        ctk.CTkButton(btn_row, text="Simpan Semua", command=self.save).pack(side="left", padx=5)
+        ctk.CTkButton(btn_row, text="Tutup", fg_color="gray", command=self.on_close).pack(side="left", padx=5)
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.load_kelas()
+
+    def load_kelas(self):
+        for child in self.table.winfo_children():
+            child.destroy()
+        self.rows = []
+        self.invalid = set()
+
+        kelas = self.kelas_loaded = self.kelas_var.get()
+        # penyimpanan per kelas: shard kelas ini dimuat dulu
+        if not self.app.require(kelas, then=lambda: self.winfo_exists() and self.load_kelas()):
+            self.lbl_info.configure(text="Memuat kelas...")
+            return
+        students = sorted(nisn for nisn, info in self.app.data.items() if info.get("kelas") == kelas)
+
+        # HEADER
+        ctk.CTkLabel(self.table, text="NISN", anchor="w", font=ctk.CTkFont(weight="bold")).grid(
+            row=0, column=0, padx=4, sticky="w")
+        ctk.CTkLabel(self.table, text="Nama", anchor="w", font=ctk.CTkFont(weight="bold")).grid(
+            row=0, column=1, padx=4, sticky="w")
+        for j, mapel in enumerate(SUBJECTS):
+            ctk.CTkLabel(self.table, text=mapel, font=ctk.CTkFont(weight="bold")).grid(row=0, column=2 + j, padx=4)
+
+        for i, nisn in enumerate(students):
+            info = self.app.data[nisn]
+            nilai = info.get("nilai", {})
+            ctk.CTkLabel(self.table, text=nisn, anchor="w").grid(row=i + 1, column=0, padx=4, sticky="w")
+            ctk.CTkLabel(self.table, text=info.get("nama", "-"), anchor="w").grid(
+                row=i + 1, column=1, padx=4, sticky="w")
+
+            cells = {}
+            for j, mapel in enumerate(SUBJECTS):
+                ent = ctk.CTkEntry(self.table, width=90, justify="center")
+                if mapel in nilai:
+                    ent.insert(0, str(nilai[mapel]))
+                ent.grid(row=i + 1, column=2 + j, padx=4, pady=2)
+                ent.original = ent.get()
+                ent.bind("<KeyRelease>", lambda _, e=ent, m=mapel: self.check_cell(e, m))
+                ent.bind("<Return>", lambda _, r=i, c=j: self.move(r + 1, c))
+                ent.bind("<Down>", lambda _, r=i, c=j: self.move(r + 1, c))
+                ent.bind("<Up>", lambda _, r=i, c=j: self.move(r - 1, c))
+                cells[mapel] = ent
+            self.rows.append((nisn, cells))
+
+        self.lbl_info.configure(text=f"{len(students)} siswa")
+        if self.rows:
+            self.move(0, 0)
+
+    def move(self, row, col):
+        if 0 <= row < len(self.rows):
+            ent = self.rows[row][1][SUBJECTS[col]]
+            ent.focus_set()
+            ent.select_range(0, "end")
+        return "break"
+
+    # VALIDASI SEL: sama dengan form Input Nilai (kosong boleh, 0-100)
+    def cell_error(self, ent, mapel):
+        v = ent.get().strip()
+        if v == "":
+            return None
+        if not v.lstrip("-").isdigit():
+            return f"Nilai {mapel} harus berupa angka bulat."
+        return validasi_nilai(mapel, int(v))
+
+    def check_cell(self, ent, mapel):
+        if self.cell_error(ent, mapel):
+            ent.configure(border_color=COLOR_TIDAK_LULUS)
+            self.invalid.add(ent)
+        else:
+            changed = ent.get().strip() != ent.original
+            ent.configure(border_color=COLOR_LULUS if changed else ctk.ThemeManager.theme["CTkEntry"]["border_color"])
+            self.invalid.discard(ent)
+
+    def changes(self):
+        # {nisn: {mapel: nilai}} hanya untuk sel yang isinya berubah
+        result = {}
+        for nisn, cells in self.rows:
+            for mapel, ent in cells.items():
+                v = ent.get().strip()
+                if v != "" and v != ent.original and not self.cell_error(ent, mapel):
+                    result.setdefault(nisn, {})[mapel] = int(v)
+        return result
+
+    def save(self):
+        errors = []
+        for i, (nisn, cells) in enumerate(self.rows):
+            for j, mapel in enumerate(SUBJECTS):
+                error = self.cell_error(cells[mapel], mapel)
+                if error:
+                    errors.append((i, j, f"{nisn}: {error}"))
+        if errors:
+            detail = "\n".join(msg for _, _, msg in errors[:10])
+            if len(errors) > 10:
+                detail += f"\n... dan {len(errors) - 10} lainnya"
+            messagebox.showerror("Nilai tidak valid", detail, parent=self)
+            self.move(errors[0][0], errors[0][1])
+            return False
+
+        changes = self.changes()
+        if not changes:
+            self.lbl_info.configure(text="Tidak ada perubahan.")
+            return True
+
+        # satu batch penyimpanan + satu event untuk seluruh kelas
+        students = []
+        for nisn, nilai in changes.items():
+            info = self.app.data.get(nisn)
+            if info is None:
+                continue  # dihapus dari halaman lain selama tabel terbuka
+            students.append((nisn, {**info, "nilai": {**info.get("nilai", {}), **nilai}}))
+        self.app.model.put_many(students)
+
+        for _, cells in self.rows:
+            for mapel, ent in cells.items():
+                ent.original = ent.get().strip()
+                self.check_cell(ent, mapel)
+        self.lbl_info.configure(text=f"Nilai {len(students)} siswa disimpan.")
+        return True
+
+    def confirm_discard(self):
+        if not self.changes() and not self.invalid:
+            return True
+        return messagebox.askyesno("Belum disimpan", "Perubahan nilai belum disimpan. Buang perubahan?", parent=self)
+
+    def change_kelas(self):
+        if self.confirm_discard():
+            self.load_kelas()
+        else:
+            self.kelas_var.set(self.kelas_loaded)
+
+    def on_close(self):
+        if self.confirm_discard():
+            self.destroy()
+
+# Pop-up: import siswa + nilai dari CSV / XLSX
+class ImportWindow(ctk.CTkToplevel):
+    MAX_REPORT_LINES = 500  # sisanya ada di file laporan
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.app = app
+        self.title("Import Siswa")
+        self.geometry("560x520")
+        self.transient(app)
+
+        self.events = queue.Queue()
+        self.running = False
+        self.result = None
+
+        ctk.CTkLabel(self, text="Import Siswa dari CSV / XLSX", font=ctk.CTkFont(size=16, weight="bold")).pack(pady=10)
+        ctk.CTkLabel(
+            self, text="Kolom: nisn, nama, kelas, lalu kolom mapel (boleh kosong)", text_color="gray",
+            font=ctk.CTkFont(size=12)
+        ).pack(padx=12, anchor="w")
+
+        frame_file = ctk.CTkFrame(self)
+        frame_file.pack(fill="x", padx=12, pady=6)
+        ctk.CTkLabel(frame_file, text="File", width=60, anchor="w").pack(side="left")
+        self.ent_file = ctk.CTkEntry(frame_file)
+        self.ent_file.pack(side="left", fill="x", expand=True, padx=(0, 6))
+        ctk.CTkButton(frame_file, text="Pilih", width=60, command=self.choose_file).pack(side="left")
+
+        self.update_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            self, text="Perbarui siswa yang NISN-nya sudah terdaftar", variable=self.update_var
+        ).pack(padx=12, pady=4, anchor="w")
+        self.skip_var = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            self, text="Tetap simpan baris yang valid walaupun ada kesalahan", variable=self.skip_var
+        ).pack(padx=12, pady=4, anchor="w")
+
+        self.lbl_status = ctk.CTkLabel(self, text="")
+        self.lbl_status.pack(padx=12, pady=(8, 0), anchor="w")
+
+        self.report_box = ctk.CTkTextbox(self, state="disabled", font=("Consolas", 12))
+        self.report_box.pack(fill="both", expand=True, padx=12, pady=6)
+
+        btn_row = ctk.CTkFrame(self, fg_color="transparent")
+        btn_row.pack(pady=10)
+        self.btn_start = ctk.CTkButton(btn_row, text="Import", command=self.start)
+        self.btn_start.pack(side="left", padx=5)
+        self.btn_report = ctk.CTkButton(
+            btn_row, text="Simpan Laporan...", fg_color="gray", state="disabled", command=self.save_report
+        )
+        self.btn_report.pack(side="left", padx=5)
+
+    def choose_file(self):
+        path = filedialog.askopenfilename(
+            title="Pilih file import", parent=self,
+            filetypes=[("CSV / Excel", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if path:
+            self.ent_file.delete(0, "end")
+            self.ent_file.insert(0, path)
+
+    def start(self):
+        path = self.ent_file.get().strip()
+        if not path or not os.path.exists(path):
+            messagebox.showerror("Error", "Pilih file yang akan diimport.", parent=self)
+            return
+
+        self.running = True
+        self.btn_start.configure(state="disabled")
+        self.btn_report.configure(state="disabled")
+        self.lbl_status.configure(text="Membaca file...")
+        self.show_report("")
+
+        # salinan dangkal: thread membaca data tanpa terganggu edit di GUI
+        existing = dict(self.app.data)
+        args = (path, existing, self.update_var.get())
+        threading.Thread(target=self._run, args=args, daemon=True).start()
+        self.after(100, self.poll)
+
+    def _run(self, path, existing, update_existing):
+        from rapor.importer import read_import
+
+        try:
+            result = read_import(
+                path, existing, update_existing,
+                progress=lambda rows: self.events.put(("progress", rows)),
+            )
+            self.events.put(("done", result))
+        except Exception as e:
+            self.events.put(("error", e))
+
+    def poll(self):
+        if not self.winfo_exists():
+            return
+        try:
+            while True:
+                event = self.events.get_nowait()
+                if event[0] == "progress":
+                    self.lbl_status.configure(text=f"{event[1]} baris dibaca...")
+                else:
+                    self.finish(event)
+                    return
+        except queue.Empty:
+            pass
+        self.after(100, self.poll)
+
+    def finish(self, event):
+        self.running = False
+        self.btn_start.configure(state="normal")
+
+        if event[0] == "error":
+            self.lbl_status.configure(text="Gagal membaca file")
+            messagebox.showerror("Import gagal", str(event[1]), parent=self)
+            return
+
+        result = self.result = event[1]
+        if not self.update_var.get():
+            # siswa yang ditambahkan lewat form selama file dibaca
+            fresh = []
+            for nisn, info in result.students:
+                if nisn in self.app.data:
+                    result.errors.append((0, nisn, f"NISN '{nisn}' sudah terdaftar."))
+                else:
+                    fresh.append((nisn, info))
+            result.students = fresh
+
+        lines = [f"Baris {row}: NISN {nisn or '-'} — {msg}" for row, nisn, msg in result.errors[:self.MAX_REPORT_LINES]]
+        if len(result.errors) > self.MAX_REPORT_LINES:
+            lines.append(f"... dan {len(result.errors) - self.MAX_REPORT_LINES} kesalahan lain (lihat Simpan Laporan)")
+        lines.extend(result.warnings)
+        self.show_report("\n".join(lines))
+        self.btn_report.configure(state="normal" if result.errors else "disabled")
+
+        if result.errors and not self.skip_var.get():
+            self.lbl_status.configure(
+                text=f"{result.rows} baris, {len(result.errors)} kesalahan — tidak ada data yang disimpan."
+            )
+            return
+
+        # semua siswa disimpan dalam satu batch dan satu event
+        self.app.model.put_many(result.students)
+        text = f"{len(result.students)} siswa diimport dari {result.rows} baris."
+        if result.errors:
+            text += f" {len(result.errors)} baris dilewati."
+        self.lbl_status.configure(text=text)
+
+    def show_report(self, text):
+        self.report_box.configure(state="normal")
+        self.report_box.delete("1.0", "end")
+        self.report_box.insert("end", text)
+        self.report_box.configure(state="disabled")
+
+    def save_report(self):
+        from rapor.importer import write_report
+
+        path = filedialog.asksaveasfilename(
+            title="Simpan laporan import", parent=self, defaultextension=".csv",
+            initialfile="laporan_import.csv", filetypes=[("CSV", "*.csv")]
+        )
+        if path:
+            write_report(path, self.result)
+
+# Widget: daftar hasil virtual
+# Hanya sebanyak baris yang terlihat yang dibuat sebagai widget; saat di-scroll
+# baris yang sama diisi ulang dengan data dari posisi scroll yang baru.
+class VirtualList(ctk.CTkFrame):
+    def __init__(self, parent, command=None, row_height=38, empty_text="Tidak ada hasil.", **kwargs):
+        super().__init__(parent, **kwargs)
+        self.command = command
+        self.row_height = row_height
+        self.items = []
+        self.label_func = str
+        self.offset = 0
+        self.rows = []
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.grid(row=0, column=0, sticky="nsew")
+        self.body.grid_columnconfigure(0, weight=1)
+        # ukuran body ditentukan parent, bukan jumlah baris di dalamnya
+        self.body.grid_propagate(False)
+
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.empty_label = ctk.CTkLabel(self.body, text=empty_text, fg_color="transparent")
+
+        self.body.bind("<Configure>", lambda _: self.render())
+        self._bind_wheel(self)
+        self._bind_wheel(self.body)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self.on_wheel)
+        widget.bind("<Button-4>", self.on_wheel)
+        widget.bind("<Button-5>", self.on_wheel)
+
+    def visible_count(self):
+        return max(1, self.body.winfo_height() // self.row_height)
+
+    # ganti isi daftar tanpa membuat ulang widget
+    def set_items(self, items, label_func=str):
+        self.items = items
+        self.label_func = label_func
+        self.offset = 0
+        self.render()
+
+    # ganti / buang satu item tanpa mengubah posisi scroll
+    def replace_item(self, old, new):
+        try:
+            i = self.items.index(old)
+        except ValueError:
+            return False
+        self.items[i] = new
+        self.render()
+        return True
+
+    def remove_item(self, value):
+        try:
+            self.items.remove(value)
+        except ValueError:
+            return False
+        self.offset = max(0, min(self.offset, len(self.items) - self.visible_count()))
+        self.render()
+        return True
+
+    def scroll_to(self, offset):
+        max_offset = max(0, len(self.items) - self.visible_count())
+        offset = max(0, min(offset, max_offset))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.scroll_to(round(float(args[0]) * len(self.items)))
+        elif action == "scroll":
+            step = int(args[0])
+            if len(args) > 1 and args[1] == "pages":
+                step *= self.visible_count()
+            self.scroll_to(self.offset + step)
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_to(self.offset - 3)
+        else:
+            self.scroll_to(self.offset + 3)
+        return "break"
+
+    def render(self):
+        count = self.visible_count()
+
+        # pool hanya bertambah mengikuti tinggi jendela, bukan jumlah hasil
+        while len(self.rows) < count:
+            btn = ctk.CTkButton(self.body, text="", anchor="w", height=self.row_height - 6)
+            self._bind_wheel(btn)
+            self.rows.append(btn)
+
+        for i, btn in enumerate(self.rows):
+            idx = self.offset + i
+            if i < count and idx < len(self.items):
+                value = self.items[idx]
+                btn.configure(
+                    text=self.label_func(value),
+                    command=lambda v=value: self.command(v) if self.command else None
+                )
+                btn.grid(row=i, column=0, padx=6, pady=3, sticky="we")
+            else:
+                btn.grid_remove()
+
+        total = len(self.items)
+        if total:
+            self.empty_label.grid_remove()
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + count) / total))
+        else:
+            self.empty_label.grid(row=0, column=0, padx=6, pady=6)
+            self.scrollbar.set(0, 1)
 
 # Page: Dashboard
 class DashboardPage(ctk.CTkFrame):
@@ -287,6 +1386,30 @@ class DashboardPage(ctk.CTkFrame):
         )
         self.card_lulus.grid(row=0, column=2, padx=(8, 0), sticky="we")
 
+        # PAGER: daftar siswa ditampilkan per halaman
+        pager = ctk.CTkFrame(self, fg_color="transparent")
+        pager.pack(side="bottom", padx=10, pady=(0, 10), fill="x")
+
+        self.btn_prev = ctk.CTkButton(pager, text="‹ Sebelumnya", width=110, command=lambda: self.go_page(-1))
+        self.btn_prev.pack(side="left")
+
+        self.lbl_page = ctk.CTkLabel(pager, text="")
+        self.lbl_page.pack(side="left", padx=10)
+
+        self.btn_next = ctk.CTkButton(pager, text="Berikutnya ›", width=110, command=lambda: self.go_page(1))
+        self.btn_next.pack(side="left")
+
+        self.page_size_var = ctk.StringVar(value=DASHBOARD_PAGE_SIZE)
+        ctk.CTkOptionMenu(
+            pager, values=DASHBOARD_PAGE_SIZES, variable=self.page_size_var, width=80,
+            command=lambda _: self.change_page_size()
+        ).pack(side="right")
+        ctk.CTkLabel(pager, text="Per halaman").pack(side="right", padx=6)
+
+        self.order = []    # NISN terurut
+        self.page_no = 0
+        self.page_size = int(DASHBOARD_PAGE_SIZE)
+
         # DETAIL BOX
         self.info_box = ctk.CTkTextbox(self, state="disabled")
         self.info_box.pack(padx=10, pady=10, fill="both", expand=True)
@@ -323,65 +1446,111 @@ class DashboardPage(ctk.CTkFrame):
         frame.value_label = lbl_value
         return frame
 
-    # UPDATE CONTENT
-    def update_contents(self):
-        data = self.app.data
-        total = len(data)
-
-        count_nilai = 0
-        lulus = 0
-
-        for info in data.values():
-            nilai = info.get("nilai", {})
-            if nilai:
-                count_nilai += 1
-                _, status = hitung_rata_status(nilai)
-                if status == "LULUS":
-                    lulus += 1
-
-        persen_lulus = (lulus / count_nilai * 100) if count_nilai else 0
-
-        # UPDATE CARD
+    def apply_change(self, event):
+        self.update_cards()
+        if self.app.unloaded_kelas():
+            self.render_kelas_table()
+        elif event["op"] in ("add", "delete", "rename"):
+            self.update_contents()  # urutan / jumlah halaman berubah
+        elif event["nisn"] in self.order[self.page_no * self.page_size:(self.page_no + 1) * self.page_size]:
+            self.render_page()
+
+    # UPDATE CARD (dari ringkasan yang sudah diperbarui per mutasi)
+    def update_cards(self):
+        total, dinilai, lulus = self.app.totals()
+        persen = (lulus / dinilai * 100) if dinilai else 0
         self.card_total.value_label.configure(text=str(total))
-        self.card_avg.value_label.configure(text=f"{persen_lulus:.0f}%")
+        self.card_avg.value_label.configure(text=f"{persen:.0f}%")
         self.card_lulus.value_label.configure(text=str(lulus))
 
-        # UPDATE DETAIL BOX
+    # UPDATE CONTENT
+    def update_contents(self):
+        self.update_cards()
+        if self.app.unloaded_kelas():
+            self.render_kelas_table()
+            return
+        self.order = sorted(self.app.data)
+        self.render_page()
+
+    # penyimpanan per kelas yang belum dimuat semua: ringkasan per kelas dari
+    # manifest, daftar siswa baru tampil setelah semua kelas dimuat
+    def render_kelas_table(self):
+        rows = self.app.kelas_summaries()
+        lines = [f"{'Kelas':<14} {'Siswa':>7} {'Dinilai':>8} {'Lulus':>7} {'% Lulus':>8}", ""]
+        for kelas in sorted(rows):
+            siswa, dinilai, lulus = rows[kelas]
+            persen = f"{lulus / dinilai * 100:.0f}%" if dinilai else "-"
+            lines.append(f"{kelas:<14} {siswa:>7} {dinilai:>8} {lulus:>7} {persen:>8}")
+
+        self.order = []
         self.info_box.configure(state="normal")
         self.info_box.delete("1.0", "end")
+        self.info_box.insert("end", "\n".join(lines) + "\n" if rows else "Belum ada data siswa.\n")
+        self.info_box.configure(state="disabled")
+        self.lbl_page.configure(text=f"{len(rows)} kelas · daftar siswa dimuat saat dibuka di Search / Input Nilai")
+        self.btn_prev.configure(state="disabled")
+        self.btn_next.configure(state="disabled")
+
+    def page_count(self):
+        return max(1, -(-len(self.order) // self.page_size))
+
+    def go_page(self, step):
+        self.page_no += step
+        self.render_page()
+
+    def change_page_size(self):
+        # tetap di sekitar siswa yang sedang terlihat
+        first = self.page_no * self.page_size
+        self.page_size = int(self.page_size_var.get())
+        self.page_no = first // self.page_size
+        if self.app.unloaded_kelas():
+            return
+        self.render_page()
 
+    # UPDATE DETAIL BOX: satu halaman disusun jadi satu teks dan satu kali
+    # insert, warna status dipasang lewat rentang tag yang sudah dihitung
+    def render_page(self):
+        data = self.app.data
+        self.page_no = max(0, min(self.page_no, self.page_count() - 1))
+        start = self.page_no * self.page_size
+        end = min(start + self.page_size, len(self.order))
+
+        lines = []
+        ranges = []  # (tag, awal, akhir)
+        for idx in range(start, end):
+            nisn = self.order[idx]
+            info = data.get(nisn, {})
+            nama = info.get("nama", "-")
+            kelas = info.get("kelas", "-")
+            nilai = info.get("nilai")
+
+            lines.append(f"{idx + 1}. {nisn} — {nama} — {kelas}")
+            if not nilai:
+                lines.append("     Nilai belum diinput")
+            else:
+                rata, status = self.app.aggregates.summary(nisn, info)
+                prefix = f"     Rata-rata : {rata:.2f} | Status: "
+                lines.append(prefix + status)
+                # setiap siswa 3 baris, baris status = baris ke-2
+                line = len(lines)
+                tag = "lulus" if status == "LULUS" else "tidak_lulus"
+                ranges.append((tag, f"{line}.{len(prefix)}", f"{line}.{len(prefix) + len(status)}"))
+            lines.append("")
+
+        self.info_box.configure(state="normal")
+        self.info_box.delete("1.0", "end")
         if not data:
             self.info_box.insert("end", "Belum ada data siswa.\n")
         else:
-            for idx, (nisn, info) in enumerate(sorted(data.items()), start=1):
-                nama = info.get("nama", "-")
-                kelas = info.get("kelas", "-")
-                nilai = info.get("nilai")
-
-                self.info_box.insert(
-                    "end", f"{idx}. {nisn} — {nama} — {kelas}\n"
-                )
-
-                if not nilai:
-                    self.info_box.insert(
-                        "end", "     Nilai belum diinput\n\n"
-                    )
-                else:
-                    rata, status = hitung_rata_status(nilai)
-                    self.info_box.insert(
-                        "end", f"     Rata-rata : {rata:.2f} | Status: "
-                    )
-
-                    if status == "LULUS":
-                        self.info_box.insert(
-                            "end", "LULUS\n\n", "lulus"
-                        )
-                    else:
-                        self.info_box.insert(
-                            "end", "TIDAK LULUS\n\n", "tidak_lulus"
-                        )
-
+            self.info_box.insert("end", "\n".join(lines) + "\n")
+            for tag, first, last in ranges:
+                self.info_box.tag_add(tag, first, last)
         self.info_box.configure(state="disabled")
+        self.info_box.yview_moveto(0)
+
+        self.lbl_page.configure(text=f"Halaman {self.page_no + 1} / {self.page_count()} · {len(self.order)} siswa")
+        self.btn_prev.configure(state="normal" if self.page_no > 0 else "disabled")
+        self.btn_next.configure(state="normal" if self.page_no < self.page_count() - 1 else "disabled")
 
 # Page: Input Siswa
 class SiswaPage(ctk.CTkFrame):
@@ -438,9 +1607,17 @@ class SiswaPage(ctk.CTkFrame):
         )
         btn_clear.pack(side="left", padx=8)
 
+        # import banyak siswa sekaligus dari file
+        ctk.CTkButton(
+            self, text="Import CSV / XLSX...", fg_color="gray", command=lambda: self.app.require(then=lambda: ImportWindow(self.app))
+        ).pack(pady=(0, 10))
+
     def update_contents(self):
         pass
 
+    def apply_change(self, event):
+        pass
+
     def clear_form(self):
         self.entry_nisn.delete(0, "end")
         self.entry_name.delete(0, "end")
@@ -452,40 +1629,21 @@ class SiswaPage(ctk.CTkFrame):
         kelas = self.entry_kelas.get().strip()
         
         # =VALIDASI INPUT=
-        # NISN wajib, angka, dan 10 digit
-        if not nisn:
-            messagebox.showerror("Error", "NISN wajib diisi.")
-            return
-        if not nisn.isdigit():
-            messagebox.showerror("Error", "NISN harus berupa angka.")
-            return
-
-        # Nama wajib dan tidak boleh angka
-        if not nama:
-            messagebox.showerror("Error", "Nama siswa wajib diisi.")
-            return
-        if any(char.isdigit() for char in nama):
-            messagebox.showerror("Error", "Nama tidak boleh mengandung angka.")
+        error = validasi_siswa(nisn, nama, kelas)
+        if error:
+            messagebox.showerror("Error", error)
             return
         nama = nama.title()
-
-        # Kelas wajib diisi
-        if not kelas:
-            messagebox.showerror("Error", "Kelas wajib diisi.")
-            return
         kelas = kelas.upper()
 
-        # CEK DUPLIKAT NISN
-        if nisn in self.app.data:
-            messagebox.showerror("Error", f"NISN '{nisn}' sudah terdaftar (Nama: {self.app.data[nisn].get('nama')}).")
+        # CEK DUPLIKAT NISN (termasuk kelas yang belum dimuat)
+        terdaftar = self.app.find_registered(nisn)
+        if terdaftar is not None:
+            messagebox.showerror("Error", f"NISN '{nisn}' sudah terdaftar (Nama: {terdaftar.get('nama')}).")
             return
 
-        # SIMPAN DATA
-        self.app.data[nisn] = {"nama": nama,"kelas": kelas}
-        save_data(self.app.data)
-
-        # Update halaman lain
-        self.app.refresh_all()
+        # SIMPAN DATA (halaman lain diperbarui lewat event model)
+        self.app.model.add(nisn, {"nama": nama,"kelas": kelas})
 
         messagebox.showinfo(
             "Sukses",
@@ -510,9 +1668,22 @@ class NilaiPage(ctk.CTkFrame):
         self.btn_search = ctk.CTkButton(self, text="Cari", command=self.search_siswa)
         self.btn_search.pack(padx=10, pady=4)
 
+        # isi nilai satu kelas sekaligus
+        ctk.CTkButton(
+            self, text="Input per Kelas (tabel)", fg_color="gray", command=lambda: GradeGridWindow(self.app)
+        ).pack(padx=10, pady=4)
+
         self.search_result = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=14))
         self.search_result.pack(pady=4)
 
+        # Pilihan siswa kalau hasil pencarian lebih dari satu
+        self.matches = {}
+        self.match_var = ctk.StringVar(value="")
+        self.match_menu = ctk.CTkOptionMenu(
+            self, values=[""], variable=self.match_var, command=self.select_match
+        )
+        self.match_menu.pack_forget()
+
         # Frame Form Nilai (disembunyikan dulu)
         self.form_frame = ctk.CTkFrame(self)
         self.form_frame.pack_forget()
@@ -545,6 +1716,27 @@ class NilaiPage(ctk.CTkFrame):
         self.selected_nisn = None
         self.selected_name = None
 
+    # siswa yang dipilih bisa saja sudah dihapus / diganti NISN-nya
+    def update_contents(self):
+        if self.selected_nisn and self.selected_nisn not in self.app.data:
+            self.reset_selection("Siswa yang dipilih sudah tidak ada.")
+
+    def apply_change(self, event):
+        if event["op"] == "rename" and event["old"] == self.selected_nisn:
+            self.matches = {self.match_label(event["nisn"], event["info"]): event["nisn"]}
+            self.match_menu.pack_forget()
+            self.select_match(next(iter(self.matches)))
+        elif event["op"] == "delete" and event["nisn"] == self.selected_nisn:
+            self.reset_selection("Siswa yang dipilih sudah dihapus.")
+
+    def reset_selection(self, text=""):
+        self.search_result.configure(text=text)
+        self.match_menu.pack_forget()
+        self.form_frame.pack_forget()
+        self.matches = {}
+        self.selected_nisn = None
+        self.selected_name = None
+
     # Fungsi Search
     def search_siswa(self):
         key = self.search_entry.get().strip()
@@ -553,30 +1745,47 @@ class NilaiPage(ctk.CTkFrame):
             messagebox.showwarning("Kosong", "Masukkan NISN atau Nama.")
             return
 
-        found = None
-
-        # Cari berdasarkan NISN atau nama
-        for nisn, info in self.app.data.items():
-            if key == nisn or key.lower() in info["nama"].lower():
-                found = (nisn, info)
-                break
+        # Cari berdasarkan NISN atau nama (sudah urut dari yang paling cocok)
+        found = self.app.index.search(key, limit=MAX_MATCHES)
 
         if not found:
-            self.search_result.configure(text="Siswa tidak ditemukan.")
-            self.form_frame.pack_forget()
+            self.reset_selection("Siswa tidak ditemukan.")
             return
 
-        # Data ditemukan
-        self.selected_nisn = found[0]
-        self.selected_name = found[1]["nama"]
+        self.matches = {}
+        for nisn in found:
+            self.matches[self.match_label(nisn, self.app.data[nisn])] = nisn
+        labels = list(self.matches)
 
-        self.search_result.configure(
-            text=f"✔ Ditemukan: {self.selected_name} (NISN {self.selected_nisn})"
-        )
+        # lebih dari satu hasil: tampilkan pilihan, jangan diam-diam ambil yang pertama
+        if len(labels) > 1:
+            self.match_menu.configure(values=labels)
+            self.match_var.set(labels[0])
+            self.match_menu.pack(padx=10, pady=4, fill="x", after=self.search_result)
+        else:
+            self.match_menu.pack_forget()
+
+        self.select_match(labels[0])
 
         # tampilkan form nilai
         self.form_frame.pack(padx=10, pady=10, fill="x")
 
+    def match_label(self, nisn, info):
+        return f"{nisn} — {info.get('nama', '-')} — {info.get('kelas', '-')}"
+
+    # Pilih salah satu hasil pencarian
+    def select_match(self, label):
+        nisn = self.matches.get(label)
+        if not nisn:
+            return
+        self.selected_nisn = nisn
+        self.selected_name = self.app.data[nisn]["nama"]
+
+        text = f"✔ Ditemukan: {self.selected_name} (NISN {self.selected_nisn})"
+        if len(self.matches) > 1:
+            text += f" — {len(self.matches)} hasil, pilih di bawah"
+        self.search_result.configure(text=text)
+
     # Clear Form
     def clear_form(self):
         for ent in self.subject_vars.values():
@@ -604,15 +1813,8 @@ class NilaiPage(ctk.CTkFrame):
             messagebox.showerror("Kesalahan nilai", str(e))
             return
 
-        # Simpan nilai ke data siswa
-        if "nilai" not in self.app.data[self.selected_nisn]:
-            self.app.data[self.selected_nisn]["nilai"] = {}
-
-        # update nilai yang ada (tidak menimpa mapel lain yang sudah ada)
-        self.app.data[self.selected_nisn]["nilai"].update(nilai_dict)
-        save_data(self.app.data)
-
-        self.app.refresh_all()
+        # Simpan nilai ke data siswa (tidak menimpa mapel lain yang sudah ada)
+        self.app.model.set_nilai(self.selected_nisn, nilai_dict)
 
         messagebox.showinfo(
             "Sukses",
@@ -646,12 +1848,22 @@ class SearchPage(ctk.CTkFrame):
         btn_search = ctk.CTkButton(top, text="Cari", width=80, command=self.perform_search)
         btn_search.pack(side="left")
 
+        # pencarian langsung saat mengetik
+        self.search_job = None
+        self.search_gen = 0
+        self.last_timing = None
+        self.search_var.trace_add("write", lambda *_: self.schedule_search())
+        self.entry_search.bind("<Return>", lambda _: self.perform_search())
+
+        self.lbl_info = ctk.CTkLabel(self, text="", text_color="gray", font=ctk.CTkFont(size=12))
+        self.lbl_info.pack(padx=10, anchor="w")
+
         # BODY (2 kolom)
         body = ctk.CTkFrame(self)
         body.pack(fill="both", expand=True, padx=10, pady=8)
 
         # LEFT COLUMN — List Siswa
-        self.listbox = ctk.CTkScrollableFrame(body, width=320)
+        self.listbox = VirtualList(body, command=self.show_detail, width=320)
         self.listbox.pack(side="left", fill="both", expand=True)
 
         # RIGHT COLUMN — Detail Siswa
@@ -660,7 +1872,15 @@ class SearchPage(ctk.CTkFrame):
         detail_frame.grid_rowconfigure(0, weight=1)
         detail_frame.grid_columnconfigure(0, weight=1)
 
-        self.detail_box = ctk.CTkTextbox(detail_frame, width=380, height=380)
+        # semester lama dibaca dari riwayat saat dipilih
+        self.term_var = ctk.StringVar(value=SEMESTER_BERJALAN)
+        self.term_menu = ctk.CTkOptionMenu(
+            detail_frame, values=[SEMESTER_BERJALAN] + app.history.terms()[::-1],
+            variable=self.term_var, command=lambda _: self.detail_nisn and self.show_detail(self.detail_nisn)
+        )
+        self.term_menu.pack(fill="x", pady=(0, 6))
+
+        self.detail_box = ctk.CTkTextbox(detail_frame, width=380, height=420)
         self.detail_box.pack(fill="both", expand=True)
 
         # TAMBAH sub-frame khusus grid
@@ -677,39 +1897,91 @@ class SearchPage(ctk.CTkFrame):
         self.delete_btn = ctk.CTkButton(btn_frame, text="Hapus Siswa", fg_color="red", width=90)
         self.delete_btn.grid(row=0, column=2, padx=5)
 
-    # dipanggil saat page dibuka
+        self.detail_nisn = None
+
+    # dipanggil saat page dibuka dan datanya berubah
     def update_contents(self):
         self.perform_search()
 
+    # perubahan satu siswa: hanya baris / detail yang bersangkutan
+    def apply_change(self, event):
+        op = event["op"]
+        nisn = event["nisn"]
+        if op == "add":
+            self.perform_search()
+        elif op == "delete":
+            self.listbox.remove_item(nisn)
+            if self.detail_nisn == nisn:
+                self.clear_detail()
+        elif op == "rename":
+            if not self.listbox.replace_item(event["old"], nisn):
+                self.listbox.render()
+            if self.detail_nisn == event["old"]:
+                self.show_detail(nisn)
+        else:
+            # label baris dibaca ulang dari data saat render
+            self.listbox.render()
+            if self.detail_nisn == nisn:
+                self.show_detail(nisn)
+
+    # debounce: ketikan beruntun hanya menjalankan satu pencarian
+    def schedule_search(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DEBOUNCE_MS, self.perform_search)
+
     # SEARCH FUNCTION
     def perform_search(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
+
+        # query baru menggantikan query lama yang mungkin masih berjalan
+        self.search_gen += 1
         key = self.search_var.get().strip().lower()
+        steps = self.app.index.search_steps(key, chunk=SEARCH_CHUNK)
+        self._search_step(self.search_gen, key, steps, time.perf_counter(), 0.0)
 
-        for widget in self.listbox.winfo_children():
-            widget.destroy()
+    def _search_step(self, gen, key, steps, started, busy):
+        if gen != self.search_gen:
+            return  # sudah ada ketikan yang lebih baru
 
-        found_any = False
+        t0 = time.perf_counter()
+        result = next(steps)
+        busy += time.perf_counter() - t0
 
-        for nisn, info in sorted(self.app.data.items()):
-            nama = info.get("nama", "")
-            kelas = info.get("kelas", "")
-            if key == "" or key in nisn.lower() or key in nama.lower():
-                label = f"{nisn} — {nama} — {kelas}"
-                btn = ctk.CTkButton(
-                    self.listbox, text=label, anchor="w",
-                    command=lambda n=nisn: self.show_detail(n)
-                )
-                btn.pack(fill="x", padx=6, pady=3)
-                found_any = True
-
-        if not found_any:
-            lbl = ctk.CTkLabel(self.listbox, text="Tidak ada hasil.", fg_color="transparent")
-            lbl.pack(padx=6, pady=6)
+        if result is None:
+            # hasil banyak: lanjutkan di tick berikutnya agar ketikan tidak tersendat
+            self.after(1, lambda: self._search_step(gen, key, steps, started, busy))
+            return
 
+        # widget baris dipakai ulang, hanya array hasilnya yang diganti
+        t0 = time.perf_counter()
+        self.listbox.set_items(result, self.result_label)
         self.clear_detail()
+        busy += time.perf_counter() - t0
+
+        self.last_timing = {
+            "query": key,
+            "hasil": len(result),
+            "proses_ms": busy * 1000,
+            "total_ms": (time.perf_counter() - started) * 1000,
+        }
+        self.lbl_info.configure(text=f"{len(result)} hasil · {busy * 1000:.1f} ms")
+
+    def result_label(self, nisn):
+        info = self.app.data.get(nisn, {})
+        return f"{nisn} — {info.get('nama', '')} — {info.get('kelas', '')}"
 
     # CLEAR DETAIL
+    def update_terms(self):
+        terms = self.app.history.terms()
+        self.term_menu.configure(values=[SEMESTER_BERJALAN] + terms[::-1])
+        if self.term_var.get() not in terms:
+            self.term_var.set(SEMESTER_BERJALAN)
+
     def clear_detail(self):
+        self.detail_nisn = None
         self.detail_box.configure(state="normal")
         self.detail_box.delete("1.0", "end")
         self.detail_box.configure(state="disabled")
@@ -720,14 +1992,20 @@ class SearchPage(ctk.CTkFrame):
         
     # MENAMPILKAN DETAIL SISWA
     def show_detail(self, nisn):
-        info = self.app.data.get(nisn, {})
+        self.detail_nisn = nisn
+        term = self.term_var.get()
+        if term == SEMESTER_BERJALAN:
+            info = self.app.data.get(nisn, {})
+            # Hitung rata dan status (memo, dihitung ulang hanya kalau nilai berubah)
+            rata, status = self.app.aggregates.summary(nisn, info)
+        else:
+            # nilai semester lama: partisinya dibaca sekali lalu disimpan
+            info = self.app.history.record(term, nisn) or {}
+            rata, status = hitung_rata_status(info.get("nilai", {}))
         nama = info.get("nama", "-")
         kelas = info.get("kelas", "-")
         nilai = info.get("nilai", {})
 
-        # Hitung rata dan status
-        rata, status = hitung_rata_status(nilai)
-
         # Siapkan textbox
         self.detail_box.configure(state="normal")
         self.detail_box.delete("1.0", "end")
@@ -775,6 +2053,17 @@ class SearchPage(ctk.CTkFrame):
         else:
             self.detail_box.insert("end", "TIDAK LULUS\n", "tidak_lulus")
 
+        # RIWAYAT SEMESTER (dari ringkasan per semester, tanpa membaca nilainya)
+        riwayat = self.app.history.student_history(nisn)
+        if riwayat:
+            self.detail_box.insert("end", "\nRiwayat Semester\n")
+            for term_nama, term_kelas, term_rata, term_status in riwayat:
+                self.detail_box.insert("end", f"{term_nama:<20} {term_kelas:<8} {term_rata:>6.2f} {term_status}\n")
+            current = rata if term == SEMESTER_BERJALAN and nilai else None
+            semua = self.app.history.student_average(nisn, current=current)
+            jumlah = len(riwayat) + (current is not None)
+            self.detail_box.insert("end", row(f"Rata-rata {jumlah} smt", f"{semua:.2f}"))
+
         self.detail_box.configure(state="disabled")
 
         # Aktifkan tombol export
@@ -783,15 +2072,14 @@ class SearchPage(ctk.CTkFrame):
             command=lambda: self.export_pdf(nisn, nama, kelas, nilai)
         )
 
-        # aktifkan tombol edit
+        # edit / hapus hanya untuk data semester berjalan
+        berjalan = term == SEMESTER_BERJALAN and nisn in self.app.data
         self.edit_btn.configure(
-            state="normal",
+            state="normal" if berjalan else "disabled",
             command=lambda: self.open_edit_popup(nisn)
         )
-
-        # aktifkan tombol delete
         self.delete_btn.configure(
-            state="normal",
+            state="normal" if berjalan else "disabled",
             command=lambda: self.delete_student(nisn)
         )
 
@@ -801,15 +2089,10 @@ class SearchPage(ctk.CTkFrame):
         if not confirm:
             return
 
-        # hapus dari data
-        if nisn in self.app.data:
-            del self.app.data[nisn]
-            save_data(self.app.data)
+        # hapus dari data (daftar & halaman lain diperbarui lewat event model)
+        self.app.model.delete(nisn)
         messagebox.showinfo("Sukses", f"Siswa dengan NISN '{nisn}' berhasil dihapus.")
 
-        # refresh halaman & other pages
-        self.app.refresh_all()
-
     # Pop-up edit data siswa
     def open_edit_popup(self, nisn):
         info = self.app.data.get(nisn, {})
@@ -897,26 +2180,26 @@ class SearchPage(ctk.CTkFrame):
                 # Handle rename NISN: kalau ganti nisn, pindahkan key di dict
                 saved_nisn = nisn
                 if new_nisn != nisn:
-                    if new_nisn in self.app.data:
-                        ok = messagebox.askyesno("Konfirmasi", f"NISN '{new_nisn}' sudah ada (Nama: {self.app.data[new_nisn].get('nama')}). Timpa data?")
+                    # juga siswa di shard kelas yang belum dimuat (sama dengan form tambah)
+                    terdaftar = self.app.find_registered(new_nisn)
+                    if terdaftar is not None and new_nisn not in self.app.data:
+                        messagebox.showerror("Error", f"NISN '{new_nisn}' sudah terdaftar (Nama: {terdaftar.get('nama')}, Kelas: {terdaftar.get('kelas')}).")
+                        return
+                    if terdaftar is not None:
+                        ok = messagebox.askyesno("Konfirmasi", f"NISN '{new_nisn}' sudah ada (Nama: {terdaftar.get('nama')}). Timpa data?")
                         if not ok:
                             return
                     # tulis data baru dan hapus yang lama
-                    self.app.data[new_nisn] = {"nama": new_name, "kelas": new_kelas, "nilai": updated}
-                    if nisn in self.app.data:
-                        del self.app.data[nisn]
+                    self.app.model.rename(nisn, new_nisn, {"nama": new_name, "kelas": new_kelas, "nilai": updated})
                     saved_nisn = new_nisn
                 else:
                     # update nilai dan nama pada nisn lama
-                    self.app.data[nisn] = {"nama": new_name,"kelas": new_kelas,  "nilai": updated}
+                    self.app.model.update(nisn, {"nama": new_name,"kelas": new_kelas,  "nilai": updated})
                     saved_nisn = nisn
 
-                save_data(self.app.data)
-
                 messagebox.showinfo("Sukses", f"Data '{new_name}' (NISN: {saved_nisn}) berhasil diperbarui.")
                 win.destroy()
 
-                self.app.refresh_all()
                 self.show_detail(saved_nisn)
 
             except Exception as e:
@@ -953,30 +2236,211 @@ class MapelPage(ctk.CTkFrame):
         )
         self.mapel_menu.pack(side="left", padx=(0, 8))
 
+        self.sort_var = ctk.StringVar(value=URUT_NISN)
+        ctk.CTkOptionMenu(
+            top,
+            values=[URUT_NISN, URUT_TERTINGGI, URUT_TERENDAH],
+            variable=self.sort_var,
+            command=lambda _: self.show_mapel_list()
+        ).pack(side="left", padx=(0, 8))
+
+        # filter rentang nilai dan top-N (kosong = semua)
+        self.entry_min = ctk.CTkEntry(top, placeholder_text="Min", width=60)
+        self.entry_min.pack(side="left", padx=(0, 4))
+        self.entry_max = ctk.CTkEntry(top, placeholder_text="Max", width=60)
+        self.entry_max.pack(side="left", padx=(0, 8))
+        self.entry_top = ctk.CTkEntry(top, placeholder_text="Top N", width=70)
+        self.entry_top.pack(side="left", padx=(0, 8))
+        for ent in (self.entry_min, self.entry_max, self.entry_top):
+            ent.bind("<Return>", lambda _: self.show_mapel_list())
+
+        ctk.CTkButton(top, text="Tampilkan", width=90, command=self.show_mapel_list).pack(side="left")
+
+        self.lbl_info = ctk.CTkLabel(self, text="", text_color="gray", font=ctk.CTkFont(size=12))
+        self.lbl_info.pack(padx=10, anchor="w")
+
         self.result_box = ctk.CTkTextbox(self, state="disabled")
         self.result_box.pack(fill="both", expand=True, padx=10, pady=8)
 
     def update_contents(self):
         self.show_mapel_list()
 
+    def apply_change(self, event):
+        # nilai mapel lain yang berubah tidak mempengaruhi daftar ini
+        if event["op"] == "nilai" and self.mapel_var.get() not in event["changed"]:
+            return
+        self.show_mapel_list()
+
+    def read_filter(self, entry, label):
+        v = entry.get().strip()
+        if v == "":
+            return None
+        if not v.isdigit():
+            raise ValueError(f"{label} harus angka bulat.")
+        return int(v)
+
+    # hasil diambil dari index kolom mapel, tidak memeriksa semua siswa
+    def query(self, mapel):
+        low = self.read_filter(self.entry_min, "Nilai minimum")
+        high = self.read_filter(self.entry_max, "Nilai maksimum")
+        top_n = self.read_filter(self.entry_top, "Top N")
+        column = self.app.columns.column(mapel)
+        sort = self.sort_var.get()
+
+        if low is not None or high is not None:
+            rows = column.in_range(low, high)  # urut nilai tertinggi
+            if sort == URUT_NISN:
+                rows.sort()
+            elif sort == URUT_TERENDAH:
+                rows.reverse()
+        elif sort == URUT_TERTINGGI:
+            return column.top(top_n)
+        elif sort == URUT_TERENDAH:
+            rows = column.top()
+            rows.reverse()
+        else:
+            rows = column.rows()
+        return rows[:top_n] if top_n is not None else rows
+
     def show_mapel_list(self):
         mapel = self.mapel_var.get()
+        try:
+            rows = self.query(mapel)
+        except ValueError as e:
+            messagebox.showerror("Filter tidak valid", str(e))
+            return
+
+        data = self.app.data
+        parts = []
+        for nisn, nilai_mapel in rows:
+            info = data.get(nisn, {})
+            parts.append(
+                f"{nisn} — {info.get('nama', '-')} — {info.get('kelas', '-')}\n"
+                f"Nilai {mapel}: {nilai_mapel}\n\n"
+            )
+
         self.result_box.configure(state="normal")
         self.result_box.delete("1.0", "end")
-        found = False
-        for nisn, info in sorted(self.app.data.items()):
-            nilai = info.get("nilai", {})
-            if mapel in nilai:
-                nama = info.get("nama", "-")
-                kelas = info.get("kelas", "-")
-                nilai_mapel = nilai[mapel]
-
-                self.result_box.insert("end", f"{nisn} — {nama} — {kelas}\n")
-                self.result_box.insert("end", f"Nilai {mapel}: {nilai_mapel}\n\n")
-                found = True
-        if not found:
+        if parts:
+            self.result_box.insert("end", "".join(parts))
+        else:
             self.result_box.insert("end", "Belum ada data untuk mapel ini.")
         self.result_box.configure(state="disabled")
+        self.lbl_info.configure(text=f"{len(rows)} dari {len(self.app.columns.column(mapel))} siswa bernilai {mapel}")
+
+# Page: Statistik (analitik NumPy, dibangun ulang saat data berubah)
+class StatistikPage(ctk.CTkFrame):
+    def __init__(self, parent, app):
+        super().__init__(parent)
+        self.app = app
+        self.matrix = None
+
+        title = ctk.CTkLabel(self, text="Statistik Nilai", font=ctk.CTkFont(size=18, weight="bold"))
+        title.pack(pady=(10, 8))
+
+        top = ctk.CTkFrame(self)
+        top.pack(padx=10, pady=6, fill="x")
+
+        ctk.CTkLabel(top, text="Kelas").pack(side="left", padx=(6, 8))
+        self.kelas_var = ctk.StringVar(value=SEMUA_KELAS)
+        self.kelas_menu = ctk.CTkOptionMenu(
+            top, values=[SEMUA_KELAS], variable=self.kelas_var,
+            command=lambda _: self.render()
+        )
+        self.kelas_menu.pack(side="left")
+
+        self.lbl_info = ctk.CTkLabel(top, text="", text_color="gray", font=ctk.CTkFont(size=12))
+        self.lbl_info.pack(side="right", padx=6)
+
+        self.result_box = ctk.CTkTextbox(self, state="disabled", font=("Consolas", 13))
+        self.result_box.pack(fill="both", expand=True, padx=10, pady=8)
+
+    def update_contents(self):
+        try:
+            from rapor.analytics import GradeMatrix
+        except ImportError:
+            self.show_text("Halaman statistik membutuhkan numpy (pip install numpy).")
+            return
+
+        t0 = time.perf_counter()
+        self.matrix = GradeMatrix(self.app.data)
+        self.update_kelas_menu()
+        self.render()
+        self.lbl_info.configure(text=f"{len(self.matrix)} siswa · {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    def apply_change(self, event):
+        # nilai / data satu siswa: baris matriks diganti, tanpa membangun
+        # ulang GradeMatrix dari seluruh data
+        g = self.matrix
+        if g is not None and event["op"] in ("nilai", "update") and g.update_row(event["nisn"], event["info"]):
+            self.update_kelas_menu()
+            self.render()
+        else:
+            self.update_contents()
+
+    def update_kelas_menu(self):
+        kelas_list = self.matrix.kelas_list()
+        self.kelas_menu.configure(values=[SEMUA_KELAS] + kelas_list)
+        if self.kelas_var.get() not in kelas_list:
+            self.kelas_var.set(SEMUA_KELAS)
+
+    def show_text(self, text):
+        self.result_box.configure(state="normal")
+        self.result_box.delete("1.0", "end")
+        self.result_box.insert("end", text)
+        self.result_box.configure(state="disabled")
+
+    def render(self):
+        g = self.matrix
+        if g is None:
+            return
+        kelas = self.kelas_var.get()
+        semua = kelas == SEMUA_KELAS
+        rows = g.rows(None if semua else kelas)
+        r = g.ringkasan(rows)
+
+        out = []
+        out.append("RINGKASAN\n")
+        out.append(f"{'Jumlah siswa':<17} : {r['siswa']}\n")
+        out.append(f"{'Sudah dinilai':<17} : {r['dinilai']}\n")
+        out.append(f"{'Jumlah lulus':<17} : {r['lulus']} ({r['persen_lulus']:.0f}%)\n")
+        if r["rata"] is not None:
+            out.append(f"{'Rata-rata':<17} : {r['rata']:.2f}\n")
+
+        out.append("\nDISTRIBUSI PREDIKAT (rata-rata siswa)\n")
+        out.append("  ".join(f"{h}: {n}" for h, n in g.distribusi_predikat(rows).items()) + "\n")
+
+        out.append("\nSTATISTIK MAPEL\n")
+        out.append(
+            f"{'Mata Pelajaran':<17} {'n':>6} {'Mean':>7} {'Median':>7} {'Stdev':>7} "
+            f"{'Min':>5} {'P25':>6} {'P75':>6} {'P90':>6} {'Max':>5}  Predikat A/B/C/D/E\n"
+        )
+        out.append("-" * 110 + "\n")
+        for mapel, st in g.statistik_mapel(rows).items():
+            dist = "/".join(str(n) for n in g.distribusi_predikat(rows, mapel).values())
+            out.append(
+                f"{mapel:<17} {st['n']:>6} {st['mean']:>7.2f} {st['median']:>7.1f} {st['stdev']:>7.2f} "
+                f"{st['min']:>5.0f} {st['p25']:>6.1f} {st['p75']:>6.1f} {st['p90']:>6.1f} {st['max']:>5.0f}  {dist}\n"
+            )
+
+        judul = "SEKOLAH" if semua else f"KELAS {kelas}"
+        out.append(f"\nPERINGKAT {judul} ({TOP_PERINGKAT} teratas)\n")
+        for rank, nisn, rata in g.ranking(rows, TOP_PERINGKAT, per_kelas=not semua):
+            nama = self.app.data.get(nisn, {}).get("nama", "-")
+            out.append(f"{rank:>3}. {nisn} — {nama} — {rata:.2f}\n")
+
+        # TREN: semester lama dari index riwayat, semester berjalan dari matrix
+        rows_tren = self.app.history.kelas_trend(None if semua else kelas)
+        if rows_tren:
+            rows_tren.append((self.app.history.aktif or SEMESTER_BERJALAN, r["siswa"], r["dinilai"], r["lulus"], r["rata"]))
+            out.append("\nTREN PER SEMESTER\n")
+            out.append(f"{'Semester':<20} {'Siswa':>6} {'Dinilai':>8} {'% Lulus':>8} {'Rata-rata':>10}\n")
+            for nama, siswa, dinilai, lulus, rata in rows_tren:
+                persen = f"{lulus / dinilai * 100:.0f}%" if dinilai else "-"
+                rata = f"{rata:.2f}" if rata is not None else "-"
+                out.append(f"{nama:<20} {siswa:>6} {dinilai:>8} {persen:>8} {rata:>10}\n")
+
+        self.show_text("".join(out))
 
 # main program
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import sys
+
+from rapor.cli import main
+
+sys.exit(main())
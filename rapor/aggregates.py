@@ -0,0 +1,91 @@
+from rapor.core import hitung_rata_status
+
+# Ringkasan dashboard yang diperbarui per event model, bukan dihitung ulang
+# dari seluruh data: setiap mutasi hanya mengurangi kontribusi data lama
+# siswa itu lalu menambahkan kontribusi data barunya.
+# Rata-rata / status per siswa disimpan (memo) dan hanya dihapus saat
+# nilai siswa tersebut berubah.
+
+
+class Aggregates:
+    def __init__(self, data=None):
+        self.summaries = {}  # nisn -> (rata, status)
+        self.build(data or {})
+
+    def build(self, data):
+        self.total = 0
+        self.dinilai = 0
+        self.lulus = 0
+        self.mapel_sum = {}
+        self.mapel_count = {}
+        self.summaries = {}
+        for nisn, info in data.items():
+            self._add(nisn, info)
+
+    @property
+    def persen_lulus(self):
+        return (self.lulus / self.dinilai * 100) if self.dinilai else 0
+
+    def rata_mapel(self, mapel):
+        n = self.mapel_count.get(mapel)
+        return self.mapel_sum[mapel] / n if n else None
+
+    # rata-rata & status satu siswa (memo)
+    def summary(self, nisn, info):
+        result = self.summaries.get(nisn)
+        if result is None:
+            result = hitung_rata_status(info.get("nilai", {}))
+            self.summaries[nisn] = result
+        return result
+
+    # pendengar DataModel
+    def apply_change(self, event):
+        if event["op"] == "batch":
+            for e in event["events"]:
+                self.apply_change(e)
+            return
+        op = event["op"]
+        if op == "add":
+            self._add(event["nisn"], event["info"])
+        elif op in ("update", "nilai"):
+            self._remove(event["nisn"], event["prev"])
+            self._add(event["nisn"], event["info"])
+        elif op == "rename":
+            self._remove(event["old"], event["prev"])
+            self._add(event["nisn"], event["info"])
+        elif op == "delete":
+            self._remove(event["nisn"], event["prev"])
+
+    def _add(self, nisn, info):
+        self.total += 1
+        nilai = info.get("nilai")
+        if not nilai:
+            return
+        _, status = self.summary(nisn, info)
+        self.dinilai += 1
+        if status == "LULUS":
+            self.lulus += 1
+        for mapel, v in nilai.items():
+            self.mapel_sum[mapel] = self.mapel_sum.get(mapel, 0) + v
+            self.mapel_count[mapel] = self.mapel_count.get(mapel, 0) + 1
+
+    def _remove(self, nisn, prev):
+        # memo masih milik data lama, jadi dipakai lalu dibuang
+        result = self.summaries.pop(nisn, None)
+        if prev is None:
+            return
+        self.total -= 1
+        nilai = prev.get("nilai")
+        if not nilai:
+            return
+        if result is None:
+            result = hitung_rata_status(nilai)
+        self.dinilai -= 1
+        if result[1] == "LULUS":
+            self.lulus -= 1
+        for mapel, v in nilai.items():
+            self.mapel_sum[mapel] -= v
+            self.mapel_count[mapel] -= 1
+            if not self.mapel_count[mapel]:
+                del self.mapel_sum[mapel]
+                del self.mapel_count[mapel]
@@ -0,0 +1,198 @@
+import numpy as np
+
+from rapor import core
+from rapor.student import MISSING, Student
+
+# Analitik nilai dengan NumPy: seluruh nilai disusun jadi satu matriks
+# (siswa x mapel) plus mask nilai yang terisi, lalu rata-rata, status,
+# predikat, statistik mapel dan peringkat kelas dihitung sekaligus.
+# Hasil untuk nilai (dan bobot) bulat sama persis dengan hitung_rata_status /
+# get_predikat: jumlah dihitung per kolom (tepat untuk bilangan bulat) lalu
+# dibagi jumlah bobot, sama seperti versi skalar di GradingRules.
+
+PERSENTIL = (25, 75, 90)
+
+
+class GradeMatrix:
+    def __init__(self, data, subjects=None, rules=None):
+        self.rules = rules or core.RULES
+        subjects = list(subjects or self.rules.subjects)
+        self.nisn = sorted(data)
+        infos = [data[nisn] for nisn in self.nisn]
+
+        if all(type(info) is Student and info.subjects == tuple(subjects) and not info.others for info in infos):
+            self._load_students(infos, subjects)
+        else:
+            self._load_dicts(infos, subjects)
+        self._finish()
+
+    @classmethod
+    def from_store(cls, store, rules=None):
+        # dari BinaryStore: kolom nilai dibaca langsung dari view mmap, tanpa
+        # membangun dict siswa. Nilai di luar kolom int8 butuh jalur dict
+        if store.has_others():
+            return cls(store.load(), rules=rules)
+        matrix = cls.__new__(cls)
+        matrix.rules = rules or core.RULES
+        matrix.nisn = store.nisn_list()
+        matrix.subjects = list(store.subjects)
+        raw = store.grades
+        matrix.mask = raw != MISSING
+        matrix.values = np.where(matrix.mask, raw, 0).astype(np.float64)
+        matrix.kelas = store.kelas_array()
+        matrix._finish()
+        return matrix
+
+    def _finish(self):
+        self.row_of = {nisn: i for i, nisn in enumerate(self.nisn)}
+        self.counts = self.mask.sum(axis=1)
+        self.graded = self.counts > 0
+        self.regrade(self.rules)
+
+    def _load_dicts(self, infos, subjects):
+        # mapel di luar daftar tetap ikut dihitung, sama seperti hitung_rata_status
+        extra = sorted({m for info in infos for m in info.get("nilai", {})} - set(subjects))
+        self.subjects = subjects + extra
+        col = {m: j for j, m in enumerate(self.subjects)}
+
+        n, m = len(infos), len(self.subjects)
+        self.values = np.zeros((n, m), dtype=np.float64)
+        self.mask = np.zeros((n, m), dtype=bool)
+        kelas = []
+        for i, info in enumerate(infos):
+            kelas.append(info.get("kelas", "-"))
+            for mapel, v in info.get("nilai", {}).items():
+                j = col[mapel]
+                self.values[i, j] = v
+                self.mask[i, j] = True
+        self.kelas = np.array(kelas, dtype=object)
+
+    def _load_students(self, infos, subjects):
+        # Student: nilai sudah berupa array byte urut SUBJECTS, disalin sekaligus
+        self.subjects = subjects
+        m = len(subjects)
+        empty = bytes([MISSING & 0xFF]) * m
+        raw = np.frombuffer(
+            b"".join(empty if s.grades is None else s.grades.tobytes() for s in infos), dtype=np.int8
+        ).reshape(len(infos), m)
+        self.mask = raw != MISSING
+        self.values = np.where(self.mask, raw, 0).astype(np.float64)
+        self.kelas = np.array(["-" if s.kelas is None else s.kelas for s in infos], dtype=object)
+
+    # hitung ulang rata-rata & status seluruh siswa dengan aturan lain,
+    # matriks nilai tidak dibangun ulang
+    def regrade(self, rules):
+        self.rules = rules
+        self.rata = rules.rata_array(self.values, self.mask, self.subjects)
+        self.lulus = rules.lulus_array(self.rata)
+
+    # satu siswa berubah (nilai / kelas): baris matriks diganti di tempat.
+    # False kalau perubahan butuh bangun ulang (siswa baru, mapel baru)
+    def update_row(self, nisn, info):
+        i = self.row_of.get(nisn)
+        nilai = info.get("nilai", {})
+        if i is None or any(m not in self.subjects for m in nilai):
+            return False
+        self.values[i] = [nilai.get(m, 0) for m in self.subjects]
+        self.mask[i] = [m in nilai for m in self.subjects]
+        self.kelas[i] = info.get("kelas", "-")
+        self.counts[i] = self.mask[i].sum()
+        self.graded[i] = self.counts[i] > 0
+        self.rata[i] = self.rules.rata_array(self.values[i:i + 1], self.mask[i:i + 1], self.subjects)[0]
+        self.lulus[i] = self.rules.lulus_array(self.rata[i])
+        return True
+
+    def __len__(self):
+        return len(self.nisn)
+
+    def rows(self, kelas=None):
+        # mask baris untuk satu kelas (None = semua)
+        if kelas is None:
+            return np.ones(len(self.nisn), dtype=bool)
+        return self.kelas == kelas
+
+    def kelas_list(self):
+        return sorted(set(self.kelas.tolist()))
+
+    def summary(self, nisn):
+        i = self.row_of[nisn]
+        return float(self.rata[i]), "LULUS" if self.lulus[i] else "TIDAK LULUS"
+
+    def ringkasan(self, rows=None):
+        rows = self.rows() if rows is None else rows
+        graded = rows & self.graded
+        dinilai = int(graded.sum())
+        lulus = int((graded & self.lulus).sum())
+        return {
+            "siswa": int(rows.sum()),
+            "dinilai": dinilai,
+            "lulus": lulus,
+            "persen_lulus": (lulus / dinilai * 100) if dinilai else 0,
+            "rata": float(self.rata[graded].mean()) if dinilai else None,
+        }
+
+    def distribusi_predikat(self, rows=None, mapel=None):
+        # mapel None = predikat rata-rata siswa
+        rows = self.rows() if rows is None else rows
+        if mapel is None:
+            values = self.rata[rows & self.graded]
+        else:
+            j = self.subjects.index(mapel)
+            values = self.values[rows & self.mask[:, j], j]
+        letters, counts = np.unique(self.rules.predikat_array(values), return_counts=True)
+        found = dict(zip(letters.tolist(), counts.tolist()))
+        return {h: found.get(h, 0) for h in reversed(self.rules.huruf)}
+
+    def statistik_mapel(self, rows=None):
+        rows = self.rows() if rows is None else rows
+        result = {}
+        for j, mapel in enumerate(self.subjects):
+            values = self.values[rows & self.mask[:, j], j]
+            if not len(values):
+                continue
+            stats = {
+                "n": int(len(values)),
+                "mean": float(values.sum() / len(values)),
+                "median": float(np.median(values)),
+                "stdev": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+                "min": float(values.min()),
+                "max": float(values.max()),
+            }
+            for p, v in zip(PERSENTIL, np.percentile(values, PERSENTIL)):
+                stats[f"p{p}"] = float(v)
+            result[mapel] = stats
+        return result
+
+    def peringkat(self, per_kelas=True):
+        # peringkat rata-rata di dalam kelas / satu sekolah (1 = tertinggi,
+        # nilai sama = peringkat sama); siswa tanpa nilai mendapat 0
+        ranks = np.zeros(len(self.nisn), dtype=np.int64)
+        idx = np.flatnonzero(self.graded)
+        if not len(idx):
+            return ranks
+        if per_kelas:
+            _, codes = np.unique(self.kelas[idx].astype(str), return_inverse=True)
+        else:
+            codes = np.zeros(len(idx), dtype=np.int64)
+        rata = self.rata[idx]
+        order = np.lexsort((-rata, codes))
+        sorted_codes = codes[order]
+        sorted_rata = rata[order]
+
+        pos = np.arange(len(idx))
+        group_start = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+        tie_start = group_start | np.r_[True, sorted_rata[1:] != sorted_rata[:-1]]
+        first_in_group = np.maximum.accumulate(np.where(group_start, pos, 0))
+        first_in_tie = np.maximum.accumulate(np.where(tie_start, pos, 0))
+        ranks[idx[order]] = first_in_tie - first_in_group + 1
+        return ranks
+
+    def ranking(self, rows=None, limit=None, per_kelas=True):
+        # list (peringkat, nisn, rata) urut peringkat
+        rows = self.rows() if rows is None else rows
+        ranks = self.peringkat(per_kelas)
+        idx = np.flatnonzero(rows & self.graded)
+        idx = idx[np.lexsort((idx, ranks[idx]))]
+        if limit:
+            idx = idx[:limit]
+        return [(int(ranks[i]), self.nisn[i], float(self.rata[i])) for i in idx]
@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from rapor import core
+from rapor.rules import GradingRules
+from rapor.pdf import FILENAME_PATTERN, rapor_filename, write_rapor_pdf
+from rapor.pdf_cache import CACHE_DIR, PdfCache
+
+# Export rapor massal (satu kelas / seluruh sekolah) memakai process pool,
+# satu task berisi beberapa siswa supaya overhead antar-proses kecil.
+
+SEMUA_KELAS = "Semua"
+CHUNK_SIZE = 25
+
+
+def is_semua(kelas):
+    return kelas in (None, "", SEMUA_KELAS, "all")
+
+
+def iter_students(data, kelas=None):
+    # generator urut NISN; yang disalin di awal hanya daftar key
+    for nisn in sorted(data):
+        info = data.get(nisn)
+        if info is None:
+            continue
+        if not is_semua(kelas) and info.get("kelas") != kelas:
+            continue
+        yield nisn, info.get("nama", "-"), info.get("kelas", "-"), dict(info.get("nilai", {}))
+
+
+def select_students(data, kelas=None):
+    return list(iter_students(data, kelas))
+
+
+def render_chunk(out_dir, pattern, students, cache_dir=None, rules=None):
+    # dijalankan di proses worker; hasil: (nisn, path, error, dari_cache).
+    # rules: aturan proses induk (to_dict). Dengan spawn / forkserver worker
+    # meng-import ulang rapor.core dan membaca aturan_nilai.json lagi, jadi
+    # aturan dari --rules harus dikirim dan dipasang sebelum render / hash cache
+    if rules is not None:
+        core.set_rules(GradingRules.from_dict(rules))
+    cache = PdfCache(cache_dir) if cache_dir else None
+    results = []
+    for nisn, nama, kelas, nilai in students:
+        path = os.path.join(out_dir, rapor_filename(nisn, nama, kelas, pattern))
+        try:
+            if cache:
+                cached = cache.get_or_render(path, nisn, nama, kelas, nilai, write_rapor_pdf)
+            else:
+                write_rapor_pdf(path, nisn, nama, kelas, nilai)
+                cached = False
+            results.append((nisn, path, None, cached))
+        except Exception as e:
+            results.append((nisn, None, str(e), False))
+    return results
+
+
+def export_batch(students, out_dir, pattern=FILENAME_PATTERN, workers=None,
+                 progress=None, cancel_event=None, chunk_size=CHUNK_SIZE, cache_dir=CACHE_DIR):
+    # progress(selesai, total) dipanggil dari thread pemanggil setiap chunk selesai
+    os.makedirs(out_dir, exist_ok=True)
+    total = len(students)
+    done = 0
+    results = []
+
+    if cache_dir:
+        # cek versi layout sekali di sini, sebelum worker mulai memakai cache
+        cache = PdfCache(cache_dir)
+
+    chunks = [students[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    rules = core.RULES.to_dict()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(render_chunk, out_dir, pattern, chunk, cache_dir, rules) for chunk in chunks]
+        try:
+            for future in as_completed(futures):
+                chunk_results = future.result()
+                results.extend(chunk_results)
+                done += len(chunk_results)
+                if progress:
+                    progress(done, total)
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+        finally:
+            # batal: chunk yang belum mulai tidak dikerjakan
+            for future in futures:
+                future.cancel()
+
+    if cache_dir:
+        cache.evict()
+    return results
@@ -0,0 +1,304 @@
+import os
+import mmap
+import json
+import struct
+
+import numpy as np
+
+from rapor.storage import StorageBackend
+from rapor.student import MISSING, Student, current_layout
+
+# Penyimpanan nilai biner (data_siswa.bin) untuk laporan yang banyak membaca:
+# file dibuka dengan mmap dan dibaca langsung tanpa parse JSON.
+#
+#   header   : magic, versi, jumlah mapel, jumlah siswa, posisi setiap bagian
+#   mapel    : daftar nama mapel (JSON), urutan kolom nilai
+#   tabel    : satu record lebar tetap per siswa, urut NISN:
+#              nisn, flag, posisi nama / kelas / extra di heap, nilai int8
+#   heap     : teks UTF-8 nama, kelas (satu kali per kelas) dan extra
+#
+# Nilai yang tidak muat di kolom int8 (mapel di luar daftar, bukan bilangan
+# bulat), urutan mapel tidak standar dan key lain disimpan sebagai JSON
+# "extra" di heap, jadi konversi JSON -> biner -> JSON tidak kehilangan data.
+# File ini hanya-baca: perubahan tetap lewat data_siswa.json lalu convert ulang.
+
+MAGIC = b"RAPORBIN"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIIQIQQQ")
+# magic, versi, jumlah mapel, jumlah siswa, ukuran record,
+# posisi + panjang daftar mapel, posisi tabel, posisi + panjang heap
+NISN_SIZE = 20
+ALIGN = 8
+
+HAS_NAMA = 1
+HAS_KELAS = 2
+HAS_NILAI = 4
+HAS_OTHERS = 8  # ada nilai di extra (di luar kolom int8)
+
+
+def record_dtype(n_subjects):
+    return np.dtype([
+        ("nisn", f"S{NISN_SIZE}"),
+        ("flags", "u1"),
+        ("nama_off", "<u4"), ("nama_len", "<u4"),
+        ("kelas_off", "<u4"), ("kelas_len", "<u4"),
+        ("extra_off", "<u4"), ("extra_len", "<u4"),
+        ("grades", "i1", (n_subjects,)),
+    ])
+
+
+def _aligned(pos):
+    return (pos + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _check_nisn(nisn):
+    try:
+        raw = nisn.encode("ascii")
+    except UnicodeEncodeError:
+        raw = None
+    if raw is None or len(raw) > NISN_SIZE or b"\0" in raw:
+        raise ValueError(f"NISN '{nisn}' tidak bisa disimpan di file biner (maks {NISN_SIZE} karakter ASCII).")
+    return raw
+
+
+# KONVERSI JSON -> BINER
+def write_binstore(path, data):
+    subjects = current_layout()[0]
+    nisns = sorted(data)
+    n, k = len(nisns), len(subjects)
+    empty = bytes([MISSING & 0xFF]) * k
+
+    heap = bytearray()
+    kelas_pos = {}  # kelas sama cukup disimpan sekali
+
+    def put_text(text):
+        raw = text.encode("utf-8")
+        off = len(heap)
+        heap.extend(raw)
+        return off, len(raw)
+
+    columns = {name: [] for name in ("flags", "nama_off", "nama_len", "kelas_off", "kelas_len", "extra_off", "extra_len")}
+    grades = []
+    for nisn in nisns:
+        student = Student.from_dict(data[nisn])
+        flags = 0
+        nama_off = nama_len = kelas_off = kelas_len = extra_off = extra_len = 0
+        if student.nama is not None:
+            flags |= HAS_NAMA
+            nama_off, nama_len = put_text(student.nama)
+        if student.kelas is not None:
+            flags |= HAS_KELAS
+            if student.kelas not in kelas_pos:
+                kelas_pos[student.kelas] = put_text(student.kelas)
+            kelas_off, kelas_len = kelas_pos[student.kelas]
+        if student.grades is not None:
+            flags |= HAS_NILAI
+            grades.append(student.grades.tobytes())
+        else:
+            grades.append(empty)
+
+        extra = {}
+        if student.others:
+            flags |= HAS_OTHERS
+            extra["others"] = student.others
+        if student.order is not None:
+            extra["order"] = list(student.order)
+        if student.fields:
+            extra["fields"] = student.fields
+        if extra:
+            extra_off, extra_len = put_text(json.dumps(extra, ensure_ascii=False, separators=(",", ":")))
+
+        for name, value in (
+            ("flags", flags), ("nama_off", nama_off), ("nama_len", nama_len),
+            ("kelas_off", kelas_off), ("kelas_len", kelas_len),
+            ("extra_off", extra_off), ("extra_len", extra_len),
+        ):
+            columns[name].append(value)
+    if len(heap) >= 1 << 32:
+        raise ValueError("Data terlalu besar untuk file biner (heap > 4 GiB).")
+
+    dtype = record_dtype(k)
+    table = np.zeros(n, dtype=dtype)
+    table["nisn"] = [_check_nisn(nisn) for nisn in nisns]
+    for name, values in columns.items():
+        table[name] = values
+    if n:
+        table["grades"] = np.frombuffer(b"".join(grades), dtype=np.int8).reshape(n, k)
+
+    subjects_raw = json.dumps(list(subjects), ensure_ascii=False).encode("utf-8")
+    subjects_off = HEADER.size
+    table_off = _aligned(subjects_off + len(subjects_raw))
+    heap_off = _aligned(table_off + table.nbytes)
+    header = HEADER.pack(
+        MAGIC, VERSION, k, n, dtype.itemsize,
+        subjects_off, len(subjects_raw), table_off, heap_off, len(heap),
+    )
+
+    # tulis ke file sementara lalu rename, sama seperti atomic_write_json
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(subjects_raw)
+        f.write(b"\0" * (table_off - subjects_off - len(subjects_raw)))
+        f.write(table.tobytes())
+        f.write(b"\0" * (heap_off - table_off - table.nbytes))
+        f.write(heap)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return n
+
+
+class BinaryStore(StorageBackend):
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.mm = None
+        self.table = None
+        self.subjects = ()
+        if os.path.exists(path):
+            self._open()
+
+    def _open(self):
+        self.file = open(self.path, "rb")
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm.size() < HEADER.size:
+            raise ValueError(f"{self.path}: bukan file data biner (terlalu kecil).")
+        (magic, version, k, n, record_size, subjects_off, subjects_len,
+         table_off, heap_off, heap_len) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path}: bukan file data biner.")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: versi file biner {version} tidak didukung.")
+        dtype = record_dtype(k)
+        if record_size != dtype.itemsize or heap_off + heap_len > self.mm.size():
+            raise ValueError(f"{self.path}: file biner rusak atau terpotong.")
+
+        self.subjects = tuple(json.loads(self.mm[subjects_off:subjects_off + subjects_len].decode("utf-8")))
+        self.col = {m: j for j, m in enumerate(self.subjects)}
+        # view langsung ke mmap, tidak ada yang disalin
+        self.table = np.frombuffer(self.mm, dtype=dtype, count=n, offset=table_off)
+        self.heap_off = heap_off
+
+    def __len__(self):
+        return 0 if self.table is None else len(self.table)
+
+    # AKSES O(1) PER BARIS (baris = urutan NISN)
+    @property
+    def grades(self):
+        # (siswa x mapel) int8, MISSING = belum diisi
+        return self.table["grades"]
+
+    def column(self, mapel):
+        # nilai satu mapel untuk semua siswa (view, bukan salinan)
+        return self.table["grades"][:, self.col[mapel]]
+
+    def row(self, nisn):
+        # posisi NISN di tabel (bisect pada kolom NISN terurut), None kalau tidak ada
+        if self.table is None:
+            return None
+        try:
+            key = _check_nisn(nisn)
+        except ValueError:
+            return None
+        nisns = self.table["nisn"]
+        i = int(np.searchsorted(nisns, key))
+        if i < len(nisns) and nisns[i] == key:
+            return i
+        return None
+
+    def text(self, off, length):
+        start = self.heap_off + off
+        return self.mm[start:start + length].decode("utf-8")
+
+    def nisn_at(self, i):
+        return self.table["nisn"][i].decode("ascii")
+
+    def nisn_list(self):
+        return [] if self.table is None else self.table["nisn"].astype(str).tolist()
+
+    def kelas_array(self):
+        # kelas per baris (object array); setiap kelas cukup di-decode sekali
+        result = np.full(len(self), "-", dtype=object)
+        if self.table is None:
+            return result
+        idx = np.flatnonzero(self.table["flags"] & HAS_KELAS)
+        offs = self.table["kelas_off"][idx].astype(np.uint64)
+        lens = self.table["kelas_len"][idx].astype(np.uint64)
+        # (posisi, panjang) sebagai satu kunci: kelas "" bisa berbagi posisi
+        _, first, inverse = np.unique((offs << 32) | lens, return_index=True, return_inverse=True)
+        names = np.array([self.text(int(offs[f]), int(lens[f])) for f in first], dtype=object)
+        result[idx] = names[inverse.reshape(-1)]
+        return result
+
+    def has_others(self):
+        # ada nilai yang tidak tersimpan di kolom int8
+        return self.table is not None and bool(np.count_nonzero(self.table["flags"] & HAS_OTHERS))
+
+    def record(self, i):
+        # data siswa baris i dalam bentuk dict (sama dengan data_siswa.json)
+        _, flags, nama_off, nama_len, kelas_off, kelas_len, extra_off, extra_len, grades = self.table[i].item()
+        info = {}
+        if flags & HAS_NAMA:
+            info["nama"] = self.text(nama_off, nama_len)
+        if flags & HAS_KELAS:
+            info["kelas"] = self.text(kelas_off, kelas_len)
+        extra = json.loads(self.text(extra_off, extra_len)) if extra_len else {}
+        if flags & HAS_NILAI:
+            subjects = self.subjects
+            nilai = {subjects[j]: v for j, v in enumerate(grades.tolist()) if v != MISSING}
+            nilai.update(extra.get("others", {}))
+            if "order" in extra:
+                nilai = {m: nilai[m] for m in extra["order"]}
+            info["nilai"] = nilai
+        info.update(extra.get("fields", {}))
+        return info
+
+    def get(self, nisn, default=None):
+        i = self.row(nisn)
+        return default if i is None else self.record(i)
+
+    # ANTARMUKA StorageBackend (hanya-baca)
+    def load(self, report=None):
+        return {self.nisn_at(i): self.record(i) for i in range(len(self))}
+
+    def iter_students(self, kelas=None, page_size=500):
+        # tabel sudah urut NISN
+        for i in range(len(self)):
+            info = self.record(i)
+            if kelas is not None and info.get("kelas") != kelas:
+                continue
+            yield self.nisn_at(i), info.get("nama", "-"), info.get("kelas", "-"), info.get("nilai", {})
+
+    def write_snapshot(self, data):
+        self.close()
+        write_binstore(self.path, data)
+        self._open()
+
+    def _read_only(self, *args):
+        raise ValueError("File biner hanya-baca: ubah data di data_siswa.json lalu convert ulang.")
+
+    put = put_nilai = delete = rename = apply_batch = _read_only
+
+    def close(self):
+        # view NumPy yang masih dipegang pemanggil membuat mmap belum bisa
+        # ditutup; dalam hal itu mmap dilepas saat view tidak dipakai lagi
+        self.table = None
+        if self.mm is not None:
+            try:
+                self.mm.close()
+            except BufferError:
+                pass
+            self.mm = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_binstore(path):
+    # KONVERSI BINER -> JSON (dict data siswa)
+    store = BinaryStore(path)
+    try:
+        return store.load()
+    finally:
+        store.close()
@@ -0,0 +1,135 @@
+import zlib
+
+from rapor.pdf import new_pdf, draw_rapor_page, rapor_filename
+
+# Buku rapor: satu file PDF berisi banyak rapor (satu rapor per siswa).
+# Setiap halaman digambar dengan layout yang sama seperti rapor tunggal,
+# lalu isi halamannya langsung ditulis ke file. Yang disimpan di memori
+# hanya offset objek dan nomor objek halaman, bukan isi halaman.
+
+BOOK_FILENAME = "Buku_Rapor_{kelas}.pdf"
+
+
+def book_filename(kelas):
+    return rapor_filename("", "", kelas, BOOK_FILENAME)
+
+
+def _page_fonts(pdf):
+    # nama resource (/F1, /F2, ...) -> nama font dasar
+    fonts = {}
+    for font in pdf.fonts.values():
+        if isinstance(font, dict):
+            fonts[f"F{font['i']}"] = font["name"]
+        else:
+            fonts[f"F{font.i}"] = font.name
+    return fonts
+
+
+def _page_content(pdf, num):
+    page = pdf.pages[num]
+    content = getattr(page, "contents", page)
+    if isinstance(content, str):
+        content = content.encode("latin-1")
+    return bytes(content)
+
+
+class StreamingPdfWriter:
+    # objek 1 = catalog, objek 2 = daftar halaman (ditulis paling akhir)
+    def __init__(self, path, width_pt, height_pt):
+        self.f = open(path, "wb")
+        self.width_pt = width_pt
+        self.height_pt = height_pt
+        self.offsets = {}
+        self.next_obj = 3
+        self.kids = []
+        self.font_objs = {}  # nama font dasar -> nomor objek
+
+        self.f.write(b"%PDF-1.3\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write_obj(self, num, body):
+        self.offsets[num] = self.f.tell()
+        self.f.write(f"{num} 0 obj\n".encode("latin-1"))
+        self.f.write(body)
+        self.f.write(b"\nendobj\n")
+
+    def _new_obj(self):
+        num = self.next_obj
+        self.next_obj += 1
+        return num
+
+    def _font_ref(self, base_font):
+        if base_font not in self.font_objs:
+            num = self._new_obj()
+            encoding = "" if base_font in ("Symbol", "ZapfDingbats") else " /Encoding /WinAnsiEncoding"
+            self._write_obj(
+                num, f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font}{encoding} >>".encode("latin-1")
+            )
+            self.font_objs[base_font] = num
+        return self.font_objs[base_font]
+
+    def add_page(self, content, fonts):
+        font_refs = " ".join(
+            f"/{res} {self._font_ref(base)} 0 R" for res, base in sorted(fonts.items())
+        )
+
+        data = zlib.compress(content)
+        content_num = self._new_obj()
+        self._write_obj(
+            content_num,
+            f"<< /Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode("latin-1")
+            + data + b"\nendstream",
+        )
+
+        page_num = self._new_obj()
+        self._write_obj(
+            page_num,
+            (
+                f"<< /Type /Page /Parent 2 0 R "
+                f"/MediaBox [0 0 {self.width_pt:.2f} {self.height_pt:.2f}] "
+                f"/Resources << /ProcSet [/PDF /Text] /Font << {font_refs} >> >> "
+                f"/Contents {content_num} 0 R >>"
+            ).encode("latin-1"),
+        )
+        self.kids.append(page_num)
+
+    def close(self):
+        kids = " ".join(f"{n} 0 R" for n in self.kids)
+        self._write_obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.kids)} >>".encode("latin-1"))
+        self._write_obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self.f.tell()
+        count = self.next_obj
+        self.f.write(f"xref\n0 {count}\n0000000000 65535 f \n".encode("latin-1"))
+        for num in range(1, count):
+            self.f.write(f"{self.offsets[num]:010d} 00000 n \n".encode("latin-1"))
+        self.f.write(
+            f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+        )
+        self.f.close()
+
+
+def write_rapor_book(path, students, progress=None, cancel_event=None):
+    # students: iterable (nisn, nama, kelas, nilai_dict), boleh generator
+    writer = None
+    count = 0
+    try:
+        for nisn, nama, kelas, nilai in students:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            # FPDF baru per halaman, dibuang setelah isinya ditulis ke file
+            pdf = new_pdf()
+            first = pdf.page + 1
+            draw_rapor_page(pdf, nisn, nama, kelas, nilai)
+            if writer is None:
+                writer = StreamingPdfWriter(path, pdf.w_pt, pdf.h_pt)
+            # rapor dengan banyak mapel bisa lebih dari satu halaman
+            fonts = _page_fonts(pdf)
+            for num in range(first, pdf.page + 1):
+                writer.add_page(_page_content(pdf, num), fonts)
+            count += 1
+            if progress:
+                progress(count)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
@@ -0,0 +1,410 @@
+import os
+import sys
+import json
+import argparse
+
+from rapor import core
+from rapor.storage import open_storage
+from rapor.json_stream import LoadReport
+
+# Command line tanpa GUI: python -m rapor <perintah>
+# Modul berat (fpdf, sqlite, process pool) baru di-import oleh perintah
+# yang membutuhkannya supaya startup tetap cepat.
+
+
+def open_store(args, read_only=False):
+    # read_only: perintah yang hanya membaca, tanpa lock file data
+    if args.data:
+        return open_storage(args.data, read_only)
+    return core.open_app_storage(read_only)
+
+
+def load_store(store):
+    # record yang rusak dilewati, lokasinya dilaporkan ke stderr
+    report = LoadReport()
+    data = core.load_data(store, report)
+    for line, column, nisn, msg in report.errors:
+        print(f"data rusak baris {line} kolom {column}: {nisn or '-'}: {msg}", file=sys.stderr)
+    if report.backup:
+        print(f"{len(report.errors)} record dilewati, salinan file asli: {report.backup}", file=sys.stderr)
+    return data
+
+
+# IMPORT: gabungkan data dari file JSON (format sama dengan data_siswa.json)
+# atau CSV / XLSX, keduanya divalidasi seperti form input
+def cmd_import(args):
+    if args.source.lower().endswith((".csv", ".xlsx")):
+        return import_table(args)
+
+    from rapor.importer import validate_json, write_report
+
+    try:
+        with open(args.source, "r", encoding="utf-8") as f:
+            result = validate_json(json.load(f))
+    except ValueError as e:
+        print(f"{args.source}: {e}", file=sys.stderr)
+        return 1
+    for row, nisn, msg in result.errors:
+        print(f"record {row}: {nisn or '-'}: {msg}", file=sys.stderr)
+    if args.report and result.errors:
+        write_report(args.report, result)
+    if result.errors and (args.replace or not args.skip_errors):
+        # --replace dengan data sebagian akan menghapus siswa yang tidak valid
+        print(f"{len(result.errors)} kesalahan, tidak ada data yang disimpan.")
+        return 1
+
+    store = open_store(args)
+    try:
+        if args.replace:
+            store.write_snapshot(dict(result.students))
+        else:
+            store.apply_batch(
+                [{"op": "put", "nisn": nisn, "data": info} for nisn, info in result.students]
+            )
+    finally:
+        store.close()
+    print(f"{len(result.students)} siswa diimport.")
+    return 1 if result.errors else 0
+
+
+def import_table(args):
+    from rapor.importer import read_import, write_report
+
+    store = open_store(args)
+    try:
+        existing = load_store(store)
+        result = read_import(args.source, existing, update_existing=args.update)
+        for msg in result.warnings:
+            print(msg, file=sys.stderr)
+        for row, nisn, msg in result.errors:
+            print(f"baris {row}: {nisn or '-'}: {msg}", file=sys.stderr)
+        if args.report and result.errors:
+            write_report(args.report, result)
+
+        if result.errors and not args.skip_errors:
+            print(f"{len(result.errors)} kesalahan, tidak ada data yang disimpan.")
+            return 1
+        # satu batch = satu transaksi / satu append journal
+        store.apply_batch([{"op": "put", "nisn": nisn, "data": info} for nisn, info in result.students])
+    finally:
+        store.close()
+    print(f"{len(result.students)} siswa diimport dari {result.rows} baris.")
+    return 1 if result.errors else 0
+
+
+# EXPORT PDF: per siswa (process pool) atau satu buku rapor
+def cmd_export_pdf(args):
+    from rapor.batch import export_batch, is_semua, select_students
+
+    kelas = None if is_semua(args.kelas) else args.kelas
+    store = open_store(args)
+    try:
+        if args.book:
+            from rapor.book import book_filename, write_rapor_book
+
+            os.makedirs(args.out, exist_ok=True)
+            path = os.path.join(args.out, book_filename(args.kelas))
+            count = write_rapor_book(path, store.iter_students(kelas))
+            print(f"Buku rapor ({count} siswa): {path}")
+            return 0
+
+        students = select_students(load_store(store), kelas)
+    finally:
+        store.close()
+
+    def progress(done, total):
+        print(f"\r{done} / {total}", end="", file=sys.stderr, flush=True)
+
+    results = export_batch(
+        students, args.out, args.pattern, workers=args.workers,
+        progress=progress, cache_dir=None if args.no_cache else args.cache_dir,
+    )
+    print(file=sys.stderr)
+
+    gagal = [r for r in results if r[2]]
+    for nisn, _, error, _ in gagal:
+        print(f"GAGAL {nisn}: {error}", file=sys.stderr)
+    print(f"{len(results) - len(gagal)} rapor dibuat, {sum(1 for r in results if r[3])} dari cache.")
+    return 1 if gagal else 0
+
+
+# STATS: ringkasan seperti dashboard, per kelas dan per mapel
+def cmd_stats(args):
+    store = open_store(args, read_only=True)
+    try:
+        data = load_store(store)
+    finally:
+        store.close()
+
+    per_kelas = {}
+    per_mapel = {}
+    total_nilai = 0
+    total_lulus = 0
+    for info in data.values():
+        kelas = per_kelas.setdefault(info.get("kelas", "-"), [0, 0, 0])
+        kelas[0] += 1
+        nilai = info.get("nilai", {})
+        if not nilai:
+            continue
+        _, status = core.hitung_rata_status(nilai)
+        kelas[1] += 1
+        total_nilai += 1
+        if status == "LULUS":
+            kelas[2] += 1
+            total_lulus += 1
+        for mapel, v in nilai.items():
+            acc = per_mapel.setdefault(mapel, [0, 0])
+            acc[0] += v
+            acc[1] += 1
+
+    persen = (total_lulus / total_nilai * 100) if total_nilai else 0
+    if args.json:
+        print(json.dumps({
+            "total": len(data),
+            "sudah_dinilai": total_nilai,
+            "lulus": total_lulus,
+            "persen_lulus": persen,
+            "kelas": {k: {"siswa": v[0], "dinilai": v[1], "lulus": v[2]} for k, v in sorted(per_kelas.items())},
+            "mapel": {m: v[0] / v[1] for m, v in per_mapel.items()},
+        }, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"Total siswa     : {len(data)}")
+    print(f"Sudah dinilai   : {total_nilai}")
+    print(f"Jumlah lulus    : {total_lulus}")
+    print(f"Persentase lulus: {persen:.0f}%")
+    print()
+    print(f"{'Kelas':<10} {'Siswa':>7} {'Dinilai':>8} {'Lulus':>7}")
+    for kelas, (siswa, dinilai, lulus) in sorted(per_kelas.items()):
+        print(f"{kelas:<10} {siswa:>7} {dinilai:>8} {lulus:>7}")
+    print()
+    print(f"{'Mata Pelajaran':<17} {'Rata-rata':>9}")
+    for mapel in core.SUBJECTS + sorted(set(per_mapel) - set(core.SUBJECTS)):
+        if mapel in per_mapel:
+            jumlah, n = per_mapel[mapel]
+            print(f"{mapel:<17} {jumlah / n:>9.2f}")
+    return 0
+
+
+# VALIDATE: cek seluruh data dengan aturan yang sama seperti form input
+def cmd_validate(args):
+    store = open_store(args, read_only=True)
+    try:
+        data = load_store(store)
+    finally:
+        store.close()
+
+    problems = []
+    for nisn, info in data.items():
+        error = core.validasi_siswa(nisn, info.get("nama", ""), info.get("kelas", ""))
+        if error:
+            problems.append((nisn, error))
+        for mapel, v in info.get("nilai", {}).items():
+            if mapel not in core.SUBJECTS:
+                problems.append((nisn, f"Mapel '{mapel}' tidak dikenal."))
+            error = core.validasi_nilai(mapel, v)
+            if error:
+                problems.append((nisn, error))
+
+    for nisn, error in problems:
+        print(f"{nisn}: {error}")
+    print(f"{len(data)} siswa diperiksa, {len(problems)} masalah.")
+    return 1 if problems else 0
+
+
+# REGRADE: bandingkan hasil aturan sekarang dengan aturan baru (mis. setelah
+# perubahan batas lulus / bobot) tanpa mengubah data
+def cmd_regrade(args):
+    import time
+    from rapor.rules import GradingRules
+    from rapor.analytics import GradeMatrix
+
+    store = open_store(args)
+    try:
+        if args.data and args.data.endswith(".bin"):
+            # kolom nilai langsung dari file biner (mmap), tanpa dict siswa
+            matrix = GradeMatrix.from_store(store)
+        else:
+            matrix = GradeMatrix(load_store(store))
+    finally:
+        store.close()
+
+    baru = GradingRules.load(args.rules_baru)
+    before = {k: matrix.ringkasan(matrix.rows(k)) for k in matrix.kelas_list()}
+    t0 = time.perf_counter()
+    matrix.regrade(baru)
+    elapsed = time.perf_counter() - t0
+    after = {k: matrix.ringkasan(matrix.rows(k)) for k in before}
+
+    print(f"{'Kelas':<10} {'Dinilai':>8} {'Lulus lama':>11} {'Lulus baru':>11}")
+    for kelas in before:
+        print(f"{kelas:<10} {before[kelas]['dinilai']:>8} {before[kelas]['lulus']:>11} {after[kelas]['lulus']:>11}")
+    print(f"{len(matrix)} siswa dihitung ulang dalam {elapsed * 1000:.1f} ms.")
+    return 0
+
+
+# CONVERT: salin seluruh data ke format lain, format dari ekstensi file
+# (.json, .db, .bin), mis. data_siswa.json -> data_siswa.bin untuk laporan
+def cmd_convert(args):
+    source = open_storage(args.source)
+    try:
+        data = load_store(source)
+    finally:
+        source.close()
+
+    target = open_storage(args.target)
+    try:
+        target.write_snapshot(data)
+    finally:
+        target.close()
+    print(f"{len(data)} siswa ditulis ke {args.target}.")
+    return 0
+
+
+# NEW-TERM: tutup semester berjalan (nilai diarsipkan ke riwayat_semester)
+# lalu mulai semester baru dengan nilai kosong
+def cmd_new_term(args):
+    from rapor.terms import TermHistory, close_term
+
+    history = TermHistory(core.TERM_DIR)
+    # tutup semester yang terhenti di tengah jalan dilanjutkan dulu
+    nama = args.tutup or (history.menutup or {}).get("nama") or history.aktif
+    if not nama:
+        print("Nama semester yang ditutup belum diketahui, isi dengan --tutup.", file=sys.stderr)
+        return 1
+    store = open_store(args)
+    try:
+        n = close_term(store, load_store(store), history, nama, args.semester, force=args.force)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    print(f"Nilai {n} siswa diarsipkan sebagai '{nama}'. Semester aktif: {args.semester}.")
+    return 0
+
+
+# HISTORY: tren per semester dari ringkasan yang sudah dihitung, tanpa
+# membaca partisi nilai semester lama
+def cmd_history(args):
+    from rapor.terms import TermHistory, trend_row, term_summary
+
+    history = TermHistory(core.TERM_DIR)
+    current = history.aktif or "(berjalan)"
+    store = open_store(args, read_only=True)
+    try:
+        data = load_store(store)
+    finally:
+        store.close()
+
+    if args.nisn:
+        info = data.get(args.nisn)
+        rows = history.student_history(args.nisn, args.last)
+        rata_now = None
+        if info and info.get("nilai"):
+            rata_now, status = core.hitung_rata_status(info["nilai"])
+            rows.append((current, info.get("kelas", "-"), rata_now, status))
+        if not rows:
+            print(f"Tidak ada nilai untuk NISN {args.nisn}.", file=sys.stderr)
+            return 1
+        print(f"{'Semester':<20} {'Kelas':<10} {'Rata-rata':>9}  Status")
+        for nama, kelas, rata, status in rows:
+            print(f"{nama:<20} {kelas:<10} {rata:>9.2f}  {status}")
+        rata = history.student_average(args.nisn, args.last, rata_now)
+        print(f"\nRata-rata {len(rows)} semester: {rata:.2f}")
+        return 0
+
+    total, kelas_stats, _ = term_summary(data)
+    stats = total if args.kelas is None else kelas_stats.get(args.kelas)
+    rows = history.kelas_trend(args.kelas)
+    if args.last:
+        rows = rows[-args.last:]
+    if stats:
+        rows.append(trend_row(current, stats))
+    print(f"Tren {'sekolah' if args.kelas is None else 'kelas ' + args.kelas}")
+    print(f"{'Semester':<20} {'Siswa':>7} {'Dinilai':>8} {'Lulus':>7} {'Rata-rata':>9}")
+    for nama, siswa, dinilai, lulus, rata in rows:
+        print(f"{nama:<20} {siswa:>7} {dinilai:>8} {lulus:>7} {'-' if rata is None else f'{rata:.2f}':>9}")
+    return 0
+
+
+# COMPACT: gabungkan journal ke snapshot (JSON) atau VACUUM (SQLite)
+def cmd_compact(args):
+    store = open_store(args)
+    try:
+        store.compact()
+    finally:
+        store.close()
+    print("Compact selesai.")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m rapor", description="Aplikasi Rapor tanpa GUI")
+    parser.add_argument("--data", help="file data (.json, .db atau .bin hanya-baca); default mengikuti konfigurasi aplikasi")
+    parser.add_argument("--rules", help="file aturan penilaian; default aturan_nilai.json")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="import siswa dari file JSON / CSV / XLSX")
+    p.add_argument("source")
+    p.add_argument("--replace", action="store_true", help="(JSON) ganti seluruh data, bukan digabung")
+    p.add_argument("--update", action="store_true", help="(CSV/XLSX) perbarui siswa yang sudah terdaftar")
+    p.add_argument("--skip-errors", action="store_true", help="simpan baris yang valid saja")
+    p.add_argument("--report", help="tulis daftar kesalahan ke file CSV")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export-pdf", help="export rapor PDF per kelas / seluruh sekolah")
+    p.add_argument("--kelas", default="all", help="nama kelas atau 'all'")
+    p.add_argument("--out", required=True, help="folder tujuan")
+    p.add_argument("--pattern", default="Rapor_{nisn}_{nama}.pdf")
+    p.add_argument("--book", action="store_true", help="satu file PDF (buku rapor)")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--cache-dir", default=".rapor_cache")
+    p.add_argument("--no-cache", action="store_true")
+    p.set_defaults(func=cmd_export_pdf)
+
+    p = sub.add_parser("stats", help="ringkasan data")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("validate", help="cek data dengan aturan input")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("regrade", help="bandingkan kelulusan dengan file aturan baru")
+    p.add_argument("rules_baru", help="file aturan (format aturan_nilai.json)")
+    p.set_defaults(func=cmd_regrade)
+
+    p = sub.add_parser("convert", help="konversi file data antar format (.json / .db / .bin)")
+    p.add_argument("source")
+    p.add_argument("target")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("new-term", help="tutup semester berjalan dan mulai semester baru")
+    p.add_argument("semester", help="nama semester baru, mis. '2025/2026 Genap'")
+    p.add_argument("--tutup", help="nama semester yang ditutup (default: semester aktif)")
+    p.add_argument("--force", action="store_true", help="timpa arsip semester dengan nama yang sama")
+    p.set_defaults(func=cmd_new_term)
+
+    p = sub.add_parser("history", help="tren nilai per semester (kelas / sekolah / satu siswa)")
+    p.add_argument("--kelas", help="nama kelas (default seluruh sekolah)")
+    p.add_argument("--nisn", help="riwayat dan rata-rata beberapa semester satu siswa")
+    p.add_argument("--last", type=int, help="hanya N semester terakhir yang sudah ditutup (+ semester berjalan)")
+    p.set_defaults(func=cmd_history)
+
+    p = sub.add_parser("compact", help="compact file data")
+    p.set_defaults(func=cmd_compact, uses_rules=False)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        if args.rules:
+            from rapor.rules import GradingRules
+            core.set_rules(GradingRules.load(args.rules))
+        elif core.RULES_ERROR and getattr(args, "uses_rules", True):
+            raise ValueError(core.RULES_ERROR)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return args.func(args)
@@ -0,0 +1,127 @@
+from bisect import bisect_left, bisect_right, insort
+
+# Index nilai per mapel (kolom): untuk setiap mapel disimpan NISN terurut
+# dan urutan nilai, diperbarui per event model. Ganti mapel, urut nilai,
+# filter rentang nilai dan top-N tidak perlu memeriksa seluruh siswa.
+
+REBUILD_THRESHOLD = 1000  # batch lebih besar dari ini: index dibangun ulang
+
+
+class Column:
+    def __init__(self):
+        self.nisn_sorted = []
+        self.scores = {}    # nisn -> nilai
+        self.ranked = []    # (-nilai, nisn), nilai tertinggi dulu
+        self.rank_keys = []  # -nilai, sejajar dengan ranked (untuk bisect rentang)
+
+    @classmethod
+    def from_scores(cls, scores):
+        # bangun sekaligus (sekali sort), jauh lebih cepat dari insort per siswa
+        column = cls()
+        column.scores = scores
+        column.nisn_sorted = sorted(scores)
+        column.ranked = sorted((-v, nisn) for nisn, v in scores.items())
+        column.rank_keys = [neg for neg, _ in column.ranked]
+        return column
+
+    def __len__(self):
+        return len(self.scores)
+
+    def set(self, nisn, nilai):
+        if nisn in self.scores:
+            if self.scores[nisn] == nilai:
+                return
+            self.remove(nisn)
+        insort(self.nisn_sorted, nisn)
+        self.scores[nisn] = nilai
+        i = bisect_left(self.ranked, (-nilai, nisn))
+        self.ranked.insert(i, (-nilai, nisn))
+        self.rank_keys.insert(i, -nilai)
+
+    def remove(self, nisn):
+        nilai = self.scores.pop(nisn, None)
+        if nilai is None:
+            return
+        i = bisect_left(self.nisn_sorted, nisn)
+        del self.nisn_sorted[i]
+        i = bisect_left(self.ranked, (-nilai, nisn))
+        del self.ranked[i]
+        del self.rank_keys[i]
+
+    # hasil berupa list (nisn, nilai)
+    def rows(self):
+        scores = self.scores
+        return [(nisn, scores[nisn]) for nisn in self.nisn_sorted]
+
+    def top(self, n=None):
+        ranked = self.ranked if n is None else self.ranked[:n]
+        return [(nisn, -neg) for neg, nisn in ranked]
+
+    def in_range(self, low=None, high=None):
+        # low <= nilai <= high, urut dari nilai tertinggi
+        start = 0 if high is None else bisect_left(self.rank_keys, -high)
+        end = len(self.ranked) if low is None else bisect_right(self.rank_keys, -low)
+        return [(nisn, -neg) for neg, nisn in self.ranked[start:end]]
+
+
+class ColumnIndex:
+    def __init__(self, data=None):
+        # dibangun saat pertama dipakai, seperti SearchIndex
+        self.data = data if data is not None else {}
+        self.built = False
+        self.columns = {}  # mapel -> Column
+
+    def build(self):
+        scores = {}
+        for nisn, info in self.data.items():
+            for mapel, v in info.get("nilai", {}).items():
+                scores.setdefault(mapel, {})[nisn] = v
+        self.columns = {mapel: Column.from_scores(s) for mapel, s in scores.items()}
+        self.built = True
+
+    def ensure_built(self):
+        if not self.built:
+            self.build()
+
+    def column(self, mapel):
+        self.ensure_built()
+        return self.columns.get(mapel) or Column()
+
+    # pendengar DataModel
+    def apply_change(self, event):
+        if not self.built:
+            return
+        if event["op"] == "batch":
+            if len(event["events"]) > REBUILD_THRESHOLD:
+                # sekali sort lebih murah dari banyak insort; dibangun saat
+                # dipakai lagi, jadi batch beruntun (loading) cukup sekali
+                self.built = False
+                self.columns = {}
+                return
+            for e in event["events"]:
+                self.apply_change(e)
+            return
+        op = event["op"]
+        if op == "add":
+            self._add(event["nisn"], event["info"])
+        elif op == "nilai":
+            for mapel, v in event["changed"].items():
+                self.columns.setdefault(mapel, Column()).set(event["nisn"], v)
+        elif op == "update":
+            self._remove(event["nisn"], event["prev"])
+            self._add(event["nisn"], event["info"])
+        elif op == "rename":
+            self._remove(event["old"], event["prev"])
+            self._add(event["nisn"], event["info"])
+        elif op == "delete":
+            self._remove(event["nisn"], event["prev"])
+
+    def _add(self, nisn, info):
+        for mapel, v in info.get("nilai", {}).items():
+            self.columns.setdefault(mapel, Column()).set(nisn, v)
+
+    def _remove(self, nisn, prev):
+        for mapel in (prev or {}).get("nilai", {}):
+            column = self.columns.get(mapel)
+            if column is not None:
+                column.remove(nisn)
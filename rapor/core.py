@@ -0,0 +1,89 @@
+import os
+
+from rapor.storage import open_storage
+from rapor.rules import RULES_FILE, GradingRules
+
+# Konfigurasi dan fungsi inti tanpa GUI (dipakai aplikasi, command line dan
+# proses worker). Jangan import tkinter / customtkinter / fpdf di sini.
+
+DATA_FILE = "data_siswa.json"
+DB_FILE = "data_siswa.db"
+SHARD_DIR = "data_siswa.shards"
+TERM_DIR = "riwayat_semester"  # nilai semester yang sudah ditutup (rapor/terms.py)
+STORAGE_BACKEND = "json"  # "json" (snapshot + journal), "sqlite" atau "shard" (file per kelas)
+COMPACT_MODEL = True      # data siswa di GUI disimpan sebagai Student (hemat memori)
+# aturan penilaian (mapel, predikat, batas lulus, bobot) dari aturan_nilai.json
+# File aturan rusak tidak menggagalkan import modul ini (command line perlu
+# tetap bisa jalan dengan --rules / compact): aturan default dipasang dan
+# pesan kesalahannya disimpan di RULES_ERROR, pemakai aturan yang menolak
+try:
+    RULES = GradingRules.load(RULES_FILE)
+    RULES_ERROR = None
+except ValueError as e:
+    RULES = GradingRules.from_dict({})
+    RULES_ERROR = str(e)
+SUBJECTS = list(RULES.subjects)
+
+def set_rules(rules):
+    # SUBJECTS diubah di tempat karena modul lain meng-import list yang sama
+    global RULES, RULES_ERROR
+    RULES = rules
+    RULES_ERROR = None
+    SUBJECTS[:] = rules.subjects
+
+def open_app_storage(read_only=False):
+    if STORAGE_BACKEND == "sqlite":
+        # migrasi sekali jalan dari file JSON lama
+        if not os.path.exists(DB_FILE):
+            from rapor.sqlite_store import migrate_json_to_sqlite
+            migrate_json_to_sqlite(DATA_FILE, DB_FILE)
+        return open_storage(DB_FILE, read_only)
+    if STORAGE_BACKEND == "shard":
+        if not os.path.exists(SHARD_DIR):
+            from rapor.shards import migrate_json_to_shards
+            migrate_json_to_shards(DATA_FILE, SHARD_DIR)
+        return open_storage(SHARD_DIR, read_only)
+    return open_storage(DATA_FILE, read_only)
+
+def load_data(store=None, report=None):
+    # file yang tidak terbaca (DataFileError / OSError) diteruskan ke pemanggil,
+    # tidak diganti data kosong; record yang rusak dilewati dan dicatat di report
+    store = store or open_app_storage()
+    return store.load(report)
+
+def save_data(data, store=None):
+    # tulis ulang seluruh snapshot (dipakai untuk simpan penuh, bukan per mutasi)
+    store = store or open_app_storage()
+    store.write_snapshot(data)
+
+# Validasi data siswa, pesan sama dengan form Tambah Siswa; None kalau valid
+def validasi_siswa(nisn, nama, kelas):
+    # NISN wajib dan angka
+    if not nisn:
+        return "NISN wajib diisi."
+    if not nisn.isdigit():
+        return "NISN harus berupa angka."
+
+    # Nama wajib dan tidak boleh angka
+    if not nama:
+        return "Nama siswa wajib diisi."
+    if any(char.isdigit() for char in nama):
+        return "Nama tidak boleh mengandung angka."
+
+    # Kelas wajib diisi
+    if not kelas:
+        return "Kelas wajib diisi."
+    return None
+
+def validasi_nilai(mapel, nilai):
+    if isinstance(nilai, bool) or not isinstance(nilai, int):
+        return f"Nilai {mapel} harus berupa angka bulat."
+    if not (0 <= nilai <= 100):
+        return f"Nilai {mapel} harus 0-100."
+    return None
+
+def hitung_rata_status(nilai_dict):
+    return RULES.hitung_rata_status(nilai_dict)
+
+def get_predikat(nilai):
+    return RULES.predikat(nilai)
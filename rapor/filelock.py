@@ -0,0 +1,67 @@
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Lock advisory antar proses untuk file data yang dipakai bersama (beberapa
+# komputer / jendela aplikasi membuka data_siswa.json yang sama). Lock
+# dipegang di file <data>.lock, hanya selama menulis / membaca journal, jadi
+# instance lain cukup menunggu sebentar. Lock dilepas otomatis oleh sistem
+# operasi kalau proses mati.
+
+LOCK_SUFFIX = ".lock"
+LOCK_TIMEOUT = 30.0  # detik
+LOCK_POLL = 0.05
+
+
+class LockTimeout(OSError):
+    pass
+
+
+class FileLock:
+    # bukan re-entrant: pemanggil (JournalStore) sudah memegang threading.Lock
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._fd = None
+
+    def acquire(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise LockTimeout(f"{self.path}: file data sedang dipakai instance lain terlalu lama.") from None
+                time.sleep(LOCK_POLL)
+        self._fd = fd
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
@@ -0,0 +1,210 @@
+import os
+import csv
+
+from rapor import core
+
+# Import massal siswa + nilai dari CSV / XLSX. Baris dibaca satu per satu
+# (file tidak dimuat utuh), divalidasi dengan aturan yang sama seperti form
+# Tambah Siswa / Input Nilai, dan semua kesalahan dikumpulkan jadi satu
+# laporan. Hasilnya disimpan sekaligus dalam satu batch penyimpanan.
+#
+# Kolom wajib: nisn, nama, kelas. Kolom mapel (nama sama dengan SUBJECTS,
+# huruf besar/kecil bebas) boleh ada, sel kosong = nilai tidak diisi.
+
+IMPORT_EXTENSIONS = (".csv", ".xlsx")
+KOLOM_WAJIB = ("nisn", "nama", "kelas")
+PROGRESS_EVERY = 1000  # baris
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.students = []  # (nisn, info) siap disimpan
+        self.errors = []    # (baris, nisn, pesan)
+        self.warnings = []
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def iter_rows(path):
+    # yield list nilai sel per baris, baris pertama = header
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        # utf-8-sig: file CSV dari Excel sering diawali BOM
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            yield from csv.reader(f, dialect)
+    elif ext == ".xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError("Import XLSX membutuhkan openpyxl (pip install openpyxl).")
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in wb.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            wb.close()
+    else:
+        raise ValueError(f"Format file tidak didukung (harus {' / '.join(IMPORT_EXTENSIONS)}).")
+
+
+def cell_text(value):
+    # angka dari Excel (mis. NISN 1234.0) dijadikan teks tanpa ".0"
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def parse_nilai(mapel, value):
+    # (nilai, pesan_error); sel kosong -> (None, None)
+    text = cell_text(value)
+    if text == "":
+        return None, None
+    try:
+        n = int(text)
+    except ValueError:
+        return None, f"Nilai {mapel} harus berupa angka bulat."
+    return n, core.validasi_nilai(mapel, n)
+
+
+def map_header(header):
+    # nama kolom -> index; kolom yang tidak dikenal dikembalikan terpisah
+    subjects = {m.lower(): m for m in core.SUBJECTS}
+    columns = {}
+    unknown = []
+    for i, name in enumerate(header):
+        key = cell_text(name).lower()
+        if key in KOLOM_WAJIB:
+            columns[key] = i
+        elif key in subjects:
+            columns[subjects[key]] = i
+        elif key:
+            unknown.append(cell_text(name))
+    missing = [k for k in KOLOM_WAJIB if k not in columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ada: {', '.join(missing)}.")
+    return columns, unknown
+
+
+def validate_rows(rows, existing, update_existing=False, progress=None):
+    # rows: iterator list sel (header dulu); existing: data siswa saat ini
+    result = ImportResult()
+    rows = iter(rows)
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ValueError("File kosong.")
+    columns, unknown = map_header(header)
+    if unknown:
+        result.warnings.append(f"Kolom diabaikan: {', '.join(unknown)}")
+    mapel_cols = [(m, i) for m, i in columns.items() if m not in KOLOM_WAJIB]
+
+    seen = {}  # nisn -> baris pertama di file
+    for line_no, row in enumerate(rows, start=2):
+        if not any(cell_text(v) for v in row):
+            continue  # baris kosong
+        result.rows += 1
+        if progress and result.rows % PROGRESS_EVERY == 0:
+            progress(result.rows)
+
+        def cell(key):
+            i = columns[key]
+            return cell_text(row[i]) if i < len(row) else ""
+
+        nisn = cell("nisn")
+        nama = cell("nama")
+        kelas = cell("kelas")
+
+        # validasi sama dengan form Tambah Siswa; nilai tetap dicek walaupun
+        # identitas salah, supaya semua kesalahan baris masuk satu laporan
+        row_ok = True
+        old = None
+        error = core.validasi_siswa(nisn, nama, kelas)
+        if error:
+            result.errors.append((line_no, nisn, error))
+            row_ok = False
+        elif nisn in seen:
+            result.errors.append((line_no, nisn, f"NISN duplikat di file (sama dengan baris {seen[nisn]})."))
+            row_ok = False
+        else:
+            seen[nisn] = line_no
+            old = existing.get(nisn)
+            if old is not None and not update_existing:
+                result.errors.append((line_no, nisn, f"NISN '{nisn}' sudah terdaftar (Nama: {old.get('nama')})."))
+                row_ok = False
+
+        nilai = {}
+        for mapel, i in mapel_cols:
+            n, error = parse_nilai(mapel, row[i] if i < len(row) else None)
+            if error:
+                result.errors.append((line_no, nisn, error))
+                row_ok = False
+            elif n is not None:
+                nilai[mapel] = n
+        if not row_ok:
+            continue
+
+        info = {"nama": nama.title(), "kelas": kelas.upper()}
+        if old is not None:
+            # siswa lama: nilai di file menimpa mapel yang sama saja
+            nilai = {**old.get("nilai", {}), **nilai}
+        if nilai:
+            info["nilai"] = nilai
+        result.students.append((nisn, info))
+
+    if progress:
+        progress(result.rows)
+    return result
+
+
+def read_import(path, existing, update_existing=False, progress=None):
+    return validate_rows(iter_rows(path), existing, update_existing, progress)
+
+
+def validate_json(incoming):
+    # isi file JSON (format data_siswa.json), divalidasi dengan aturan yang
+    # sama; "baris" di laporan = urutan record di file
+    if not isinstance(incoming, dict):
+        raise ValueError("File JSON harus berisi object {nisn: data siswa}.")
+    result = ImportResult()
+    for line_no, (nisn, info) in enumerate(incoming.items(), start=1):
+        result.rows += 1
+        if not isinstance(info, dict):
+            result.errors.append((line_no, nisn, "Data siswa harus berupa object."))
+            continue
+        errors = []
+        nama, kelas = info.get("nama", ""), info.get("kelas", "")
+        if not isinstance(nama, str) or not isinstance(kelas, str):
+            errors.append("Nama dan kelas harus berupa teks.")
+        else:
+            error = core.validasi_siswa(nisn, nama.strip(), kelas.strip())
+            if error:
+                errors.append(error)
+
+        nilai = info.get("nilai", {})
+        if not isinstance(nilai, dict):
+            errors.append("Nilai harus berupa object {mapel: nilai}.")
+        else:
+            errors.extend(e for e in (core.validasi_nilai(m, n) for m, n in nilai.items()) if e)
+        if errors:
+            result.errors.extend((line_no, nisn, e) for e in errors)
+            continue
+        result.students.append((nisn, info))
+    return result
+
+
+def write_report(path, result):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["baris", "nisn", "kesalahan"])
+        writer.writerows(result.errors)
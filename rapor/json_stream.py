@@ -0,0 +1,269 @@
+import re
+import json
+import codecs
+
+# Pembaca snapshot data_siswa.json secara bertahap. File berbentuk satu objek
+# {nisn: {...}, ...}; record siswa di-parse satu per satu dari buffer kecil,
+# jadi memori puncak sebanding dengan satu potongan file, bukan seluruh file.
+#
+# Record yang rusak (JSON tidak valid, bentuk data salah) dicatat lengkap
+# dengan baris / kolom lalu dilewati; pembacaan dilanjutkan dari record
+# berikutnya. Hanya file yang sama sekali tidak bisa dibaca (bukan objek
+# JSON, tidak ada record yang bisa ditemukan lagi) yang menjadi DataFileError.
+
+READ_SIZE = 1 << 16       # byte per baca
+MIN_AHEAD = 1 << 16       # sisa buffer minimal sebelum satu record di-parse
+MAX_RECORD = 1 << 20      # record lebih besar dari ini dianggap rusak
+LOAD_CHUNK = 2000         # siswa per potongan yang dikirim ke pemanggil
+
+WS_RE = re.compile(r"[ \t\n\r]*")
+# awal record berikutnya setelah record rusak: key dengan indentasi 4 spasi
+# (format atomic_write_json) atau key NISN diikuti objek (JSON padat)
+RESYNC_RE = re.compile(r'\n {4}(?=")|,\s*(?="\d+"\s*:\s*\{)')
+# koma di antara dua record (pola sama), untuk parse banyak record sekaligus
+BOUNDARY_RE = re.compile(r',(?=\n {4}"|\s*"\d+"\s*:\s*\{)')
+BOUNDARY_TAIL = 4096  # boundary terakhir dicari di ujung buffer sepanjang ini
+
+
+class DataFileError(ValueError):
+    def __init__(self, path, line, column, pesan):
+        super().__init__(f"{path} baris {line} kolom {column}: {pesan}")
+        self.path = path
+        self.line = line
+        self.column = column
+        self.pesan = pesan
+
+
+class LoadReport:
+    def __init__(self):
+        self.records = 0
+        self.errors = []    # (baris, kolom, nisn, pesan)
+        self.backup = None  # salinan file asli kalau ada record rusak
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def check_record(info):
+    # bentuk data siswa yang bisa dipakai aplikasi; pesan error atau None.
+    # Dipanggil untuk setiap record: cek type() langsung, bukan isinstance
+    if type(info) is not dict:
+        return "Data siswa harus berupa objek."
+    for key in ("nama", "kelas"):
+        if key in info and type(info[key]) is not str:
+            return f"'{key}' harus berupa teks."
+    if "nilai" not in info:
+        return None
+    nilai = info["nilai"]
+    if type(nilai) is not dict:
+        return "'nilai' harus berupa objek {mapel: nilai}."
+    for mapel, v in nilai.items():
+        if type(v) is not int and type(v) is not float:  # bool juga ditolak
+            return f"Nilai {mapel} harus berupa angka."
+    return None
+
+
+class _Buffer:
+    # teks yang sudah dibaca tapi belum di-parse. Posisi absolut = offset + pos
+    # (offset = jumlah karakter yang sudah dibuang); line / column = posisi
+    # karakter pertama buffer, untuk pesan error
+    def __init__(self, f):
+        self.f = f
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.text = ""
+        self.pos = 0
+        self.offset = 0
+        self.line = 1
+        self.column = 1
+        self.bytes_read = 0
+        self.eof = False
+
+    def fill(self):
+        # buang bagian yang sudah di-parse, lalu baca potongan berikutnya
+        consumed = self.text[:self.pos]
+        newlines = consumed.count("\n")
+        if newlines:
+            self.line += newlines
+            self.column = len(consumed) - consumed.rfind("\n")
+        else:
+            self.column += len(consumed)
+        self.offset += self.pos
+        chunk = self.f.read(READ_SIZE)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+        self.text = self.text[self.pos:] + self.decoder.decode(chunk, final=not chunk)
+        self.pos = 0
+
+    def ensure(self, size):
+        while not self.eof and len(self.text) - self.pos < size:
+            self.fill()
+
+    def tell(self):
+        return self.offset + self.pos
+
+    def location(self, where):
+        # (baris, kolom) dari posisi absolut yang masih ada di buffer
+        pos = where - self.offset
+        newlines = self.text.count("\n", 0, pos)
+        if newlines:
+            return self.line + newlines, pos - self.text.rfind("\n", 0, pos)
+        return self.line, self.column + pos
+
+    def skip_ws(self):
+        while True:
+            self.pos = WS_RE.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or self.eof:
+                return
+            self.fill()
+
+    def peek(self):
+        self.skip_ws()
+        return self.text[self.pos:self.pos + 1]
+
+    def decode(self, decoder):
+        # satu nilai JSON mulai dari pos; buffer diperbesar kalau nilai
+        # mungkin terpotong di ujung buffer. Error: JSONDecodeError dengan
+        # pos absolut
+        ahead = MIN_AHEAD
+        while True:
+            self.ensure(ahead)
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof or ahead >= MAX_RECORD:
+                    raise json.JSONDecodeError(e.msg, self.text, self.offset + e.pos) from None
+                ahead *= 2
+                continue
+            if end == len(self.text) and not self.eof:
+                ahead *= 2
+                continue  # angka di ujung buffer bisa masih berlanjut
+            self.pos = end
+            return value
+
+    def take_batch(self):
+        # teks dari pos sampai koma antar-record terakhir di buffer, atau None
+        self.ensure(MIN_AHEAD)
+        tail = max(self.pos, len(self.text) - BOUNDARY_TAIL)
+        end = None
+        for match in BOUNDARY_RE.finditer(self.text, tail):
+            end = match.start()
+        if end is None or end <= self.pos:
+            return None
+        return self.text[self.pos:end], end
+
+    def resync(self, where):
+        # lompat ke awal record berikutnya setelah posisi absolut where;
+        # False kalau tidak ada lagi
+        start = where - self.offset
+        while True:
+            match = RESYNC_RE.search(self.text, start)
+            if match:
+                self.pos = match.end()
+                return True
+            if self.eof:
+                self.pos = len(self.text)
+                return False
+            # ekor buffer disimpan: pola bisa terpotong di batas potongan
+            self.pos = max(start, len(self.text) - 64)
+            self.fill()
+            start = 0
+
+
+def iter_records(f, path, report, chunk_size=LOAD_CHUNK, progress=None):
+    # yield list (nisn, info) per potongan; f dibuka dalam mode biner,
+    # progress(byte_terbaca) dipanggil setiap potongan
+    buf = _Buffer(f)
+    decoder = json.JSONDecoder()
+
+    def record_error(where, nisn, pesan):
+        line, column = buf.location(where)
+        report.errors.append((line, column, nisn, pesan))
+
+    if buf.peek() != "{":
+        line, column = buf.location(buf.tell())
+        kosong = buf.eof and buf.pos >= len(buf.text)
+        raise DataFileError(
+            path, line, column,
+            "File kosong." if kosong else "Data harus berupa objek JSON {nisn: data siswa}.",
+        )
+    buf.pos += 1
+
+    chunk = []
+    first = True
+    slow_until = 0  # sampai posisi ini record di-parse satu per satu
+    while True:
+        c = buf.peek()
+        if c == "}":
+            break
+        if c == "":
+            record_error(buf.tell(), None, "File terpotong (kurung '}' penutup tidak ada).")
+            break
+        if not first:
+            if c == ",":
+                buf.pos += 1
+                c = buf.peek()
+                if c == "}":
+                    record_error(buf.tell(), None, "Koma berlebih sebelum '}'.")
+                    break
+            elif c == '"':
+                # koma hilang di antara dua record: dicatat, record tetap dibaca
+                record_error(buf.tell(), None, "Koma hilang sebelum record ini.")
+        first = False
+
+        # jalur cepat: banyak record di-parse sekaligus oleh json.loads (C);
+        # kalau gagal / ada record tidak valid, bagian itu diulang per record
+        # supaya lokasi kesalahannya tepat
+        batch = buf.take_batch() if c == '"' and buf.tell() >= slow_until else None
+        if batch is not None:
+            text, end = batch
+            try:
+                records = json.loads("{" + text + "}")
+            except ValueError:
+                records = None
+            if records is not None and all(check_record(info) is None for info in records.values()):
+                buf.pos = end
+                report.records += len(records)
+                chunk.extend(records.items())
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+                    if progress:
+                        progress(buf.bytes_read)
+                continue
+            slow_until = buf.offset + end
+
+        nisn = None
+        try:
+            if c != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", buf.text, buf.tell())
+            nisn = buf.decode(decoder)
+            if buf.peek() != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", buf.text, buf.tell())
+            buf.pos += 1
+            buf.skip_ws()
+            value_at = buf.tell()
+            info = buf.decode(decoder)
+        except json.JSONDecodeError as e:
+            record_error(e.pos, nisn, f"JSON tidak valid ({e.msg}).")
+            if not buf.resync(buf.tell() + 1):
+                break
+            first = True  # resync berhenti tepat di key record berikutnya
+            continue
+
+        error = check_record(info)
+        if error:
+            record_error(value_at, nisn, error)
+            continue
+        report.records += 1
+        chunk.append((nisn, info))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+            if progress:
+                progress(buf.bytes_read)
+    if chunk:
+        yield chunk
+    if progress:
+        progress(buf.bytes_read)
@@ -0,0 +1,186 @@
+from rapor.saver import copy_record
+from rapor.student import update_nilai
+
+# Model data siswa: semua perubahan lewat sini supaya penyimpanan dan
+# pendengar (index, halaman GUI, ringkasan) mendapat event yang sama.
+# Event berupa dict, mirip record journal:
+#   {"op": "add",    "nisn", "info"}
+#   {"op": "update", "nisn", "info", "prev"}
+#   {"op": "nilai",  "nisn", "info", "prev", "changed"}
+#   {"op": "rename", "old", "nisn", "info", "prev"}
+#   {"op": "delete", "nisn", "prev"}
+#   {"op": "batch",  "events": [...]}   (banyak perubahan sekaligus;
+#                                        "load": True = data dari file,
+#                                        "external": True = dari instance lain)
+# "prev" = data siswa sebelum perubahan, "changed" = nilai yang baru diisi.
+
+ADD = "add"
+UPDATE = "update"
+NILAI = "nilai"
+RENAME = "rename"
+DELETE = "delete"
+BATCH = "batch"
+MERGE_EVENTS = 50  # perubahan dari instance lain di atas ini dikirim sebagai satu batch
+
+
+class DataModel:
+    def __init__(self, data=None, store=None, wrap=None):
+        # wrap: pengubah data siswa dari form (dict) ke bentuk di memori,
+        # mis. Student.from_dict; None = dict apa adanya
+        self.data = data if data is not None else {}
+        self.store = store
+        self.wrap = wrap or (lambda info: info)
+        self.listeners = []
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def emit(self, event):
+        for listener in list(self.listeners):
+            listener(event)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, nisn):
+        return nisn in self.data
+
+    def get(self, nisn, default=None):
+        return self.data.get(nisn, default)
+
+    # MUTASI
+    def add(self, nisn, info):
+        if nisn in self.data:
+            self.update(nisn, info)
+            return
+        info = self.wrap(info)
+        self.data[nisn] = info
+        if self.store:
+            self.store.put(nisn, info)
+        self.emit({"op": ADD, "nisn": nisn, "info": info})
+
+    def update(self, nisn, info):
+        prev = self.data.get(nisn)
+        if prev is None:
+            self.add(nisn, info)
+            return
+        info = self.wrap(info)
+        self.data[nisn] = info
+        if self.store:
+            self.store.put(nisn, info)
+        self.emit({"op": UPDATE, "nisn": nisn, "info": info, "prev": prev})
+
+    def set_nilai(self, nisn, nilai_dict):
+        # update nilai yang ada (tidak menimpa mapel lain yang sudah ada)
+        info = self.data.get(nisn)
+        if info is None:
+            return
+        prev = copy_record(info)
+        update_nilai(info, nilai_dict)
+        if self.store:
+            self.store.put_nilai(nisn, nilai_dict)
+        self.emit({"op": NILAI, "nisn": nisn, "info": info, "prev": prev, "changed": dict(nilai_dict)})
+
+    def rename(self, old_nisn, new_nisn, info):
+        if old_nisn == new_nisn:
+            self.update(new_nisn, info)
+            return
+        # NISN tujuan yang sudah ada ditimpa: kirim event hapus dulu
+        replaced = self.data.pop(new_nisn, None)
+        if replaced is not None:
+            self.emit({"op": DELETE, "nisn": new_nisn, "prev": replaced})
+        prev = self.data.pop(old_nisn, None)
+        info = self.wrap(info)
+        self.data[new_nisn] = info
+        if self.store:
+            self.store.rename(old_nisn, new_nisn, info)
+        self.emit({"op": RENAME, "old": old_nisn, "nisn": new_nisn, "info": info, "prev": prev})
+
+    # banyak siswa sekaligus (import, grid nilai): satu batch penyimpanan dan
+    # satu event, bukan satu per siswa
+    def put_many(self, students):
+        events = []
+        records = []
+        for nisn, info in students:
+            info = self.wrap(info)
+            prev = self.data.get(nisn)
+            self.data[nisn] = info
+            records.append({"op": "put", "nisn": nisn, "data": copy_record(info)})
+            if prev is None:
+                events.append({"op": ADD, "nisn": nisn, "info": info})
+            else:
+                events.append({"op": UPDATE, "nisn": nisn, "info": info, "prev": prev})
+        if not events:
+            return
+        if self.store:
+            self.store.apply_batch(records)
+        self.emit({"op": BATCH, "events": events})
+
+    # siswa dari file saat loading bertahap: tidak ditulis lagi ke penyimpanan.
+    # NISN yang sudah ada di memori (diubah selama loading) tidak ditimpa
+    def load_many(self, students):
+        events = []
+        for nisn, info in students:
+            if nisn in self.data:
+                continue
+            info = self.wrap(info)
+            self.data[nisn] = info
+            events.append({"op": ADD, "nisn": nisn, "info": info})
+        if events:
+            self.emit({"op": BATCH, "events": events, "load": True})
+
+    # record journal dari instance lain (sudah ada di file): diterapkan ke
+    # memori tanpa ditulis lagi. Sedikit perubahan dikirim sebagai event per
+    # siswa supaya halaman cukup memperbarui baris yang bersangkutan
+    def merge_external(self, records):
+        events = []
+        for r in records:
+            op, nisn = r["op"], r["nisn"]
+            if op == "rename":
+                prev = self.data.pop(r["old"], None)
+                replaced = self.data.pop(nisn, None)
+                if replaced is not None:
+                    events.append({"op": DELETE, "nisn": nisn, "prev": replaced})
+                info = self.wrap(r["data"])
+                self.data[nisn] = info
+                if prev is None:
+                    events.append({"op": ADD, "nisn": nisn, "info": info})
+                else:
+                    events.append({"op": RENAME, "old": r["old"], "nisn": nisn, "info": info, "prev": prev})
+            elif op == "put":
+                info = self.wrap(r["data"])
+                prev = self.data.get(nisn)
+                self.data[nisn] = info
+                if prev is None:
+                    events.append({"op": ADD, "nisn": nisn, "info": info})
+                else:
+                    events.append({"op": UPDATE, "nisn": nisn, "info": info, "prev": prev})
+            elif op == "nilai":
+                info = self.data.get(nisn)
+                if info is None:
+                    continue
+                prev = copy_record(info)
+                update_nilai(info, r["data"])
+                events.append({"op": NILAI, "nisn": nisn, "info": info, "prev": prev, "changed": dict(r["data"])})
+            elif op == "delete":
+                prev = self.data.pop(nisn, None)
+                if prev is not None:
+                    events.append({"op": DELETE, "nisn": nisn, "prev": prev})
+        if len(events) > MERGE_EVENTS:
+            self.emit({"op": BATCH, "events": events, "external": True})
+        else:
+            for event in events:
+                self.emit(event)
+        return len(events)
+
+    def delete(self, nisn):
+        prev = self.data.pop(nisn, None)
+        if prev is None:
+            return
+        if self.store:
+            self.store.delete(nisn)
+        self.emit({"op": DELETE, "nisn": nisn, "prev": prev})
@@ -0,0 +1,89 @@
+from rapor.core import hitung_rata_status, get_predikat
+
+# Layout rapor PDF. Tidak memakai dialog / messagebox supaya bisa dijalankan
+# di proses worker maupun dari command line.
+
+FILENAME_PATTERN = "Rapor_{nisn}_{nama}.pdf"
+# naikkan setiap kali layout di draw_rapor_page diubah (membatalkan cache PDF)
+LAYOUT_VERSION = 1
+
+
+def rapor_filename(nisn, nama, kelas="", pattern=FILENAME_PATTERN):
+    safe_name = nama.replace(" ", "_")
+    safe_kelas = str(kelas).replace(" ", "_")
+    name = pattern.format(nisn=nisn, nama=safe_name, kelas=safe_kelas)
+    # jangan sampai pola membuat path keluar dari folder tujuan
+    return name.replace("/", "_").replace("\\", "_")
+
+
+def new_pdf():
+    from fpdf import FPDF  # import di sini supaya modul ini ringan di-import
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    return pdf
+
+
+def draw_rapor_page(pdf, nisn, nama, kelas, nilai_dict):
+    rata, status = hitung_rata_status(nilai_dict)
+    predikat_rata = get_predikat(rata)
+
+    pdf.add_page()
+
+    # ===== HEADER =====
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, "LAPORAN HASIL BELAJAR SISWA", ln=True, align="C")
+    pdf.cell(0, 10, "(RAPOR)", ln=True, align="C")
+    pdf.ln(8)
+
+    # ===== IDENTITAS =====
+    pdf.set_font("Arial", size=12)
+
+    def info_row(label, value, label_w=40):
+        pdf.cell(label_w, 8, label)
+        pdf.cell(2, 8, ":")
+        pdf.cell(0, 8, str(value), ln=True)
+
+    info_row("Nama Peserta Didik", nama)
+    info_row("NISN", nisn)
+    info_row("Kelas", kelas)
+
+    pdf.ln(8)
+
+    # ===== TABEL NILAI =====
+    COL_NO = 12
+    COL_MAPEL = 90
+    COL_NILAI = 28
+    COL_PRED = 28
+
+    table_width = COL_NO + COL_MAPEL + COL_NILAI + COL_PRED
+    start_x = (pdf.w - table_width) / 2
+
+    pdf.set_font("Arial", "B", 12)
+    pdf.set_x(start_x)
+    pdf.cell(COL_NO, 8, "No", border=1, align="C")
+    pdf.cell(COL_MAPEL, 8, "Mata Pelajaran", border=1, align="C")
+    pdf.cell(COL_NILAI, 8, "Nilai", border=1, align="C")
+    pdf.cell(COL_PRED, 8, "Predikat", border=1, align="C", ln=True)
+
+    pdf.set_font("Arial", size=12)
+    for i, (mapel, nilai) in enumerate(nilai_dict.items(), start=1):
+        pdf.set_x(start_x)
+        pdf.cell(COL_NO, 8, str(i), border=1, align="C")
+        pdf.cell(COL_MAPEL, 8, mapel, border=1)
+        pdf.cell(COL_NILAI, 8, str(nilai), border=1, align="C")
+        pdf.cell(COL_PRED, 8, get_predikat(nilai), border=1, align="C", ln=True)
+
+    pdf.ln(8)
+
+    # ===== RINGKASAN =====
+    info_row("Nilai Rata-rata", f"{rata:.2f}")
+    info_row("Predikat Rata-rata", predikat_rata)
+    info_row("Status Kelulusan", status)
+
+
+def write_rapor_pdf(filepath, nisn, nama, kelas, nilai_dict):
+    pdf = new_pdf()
+    draw_rapor_page(pdf, nisn, nama, kelas, nilai_dict)
+    pdf.output(filepath)
+    return filepath
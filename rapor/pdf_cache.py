@@ -0,0 +1,125 @@
+import os
+import json
+import shutil
+import hashlib
+
+from rapor import core
+from rapor.pdf import LAYOUT_VERSION
+
+# Cache rapor PDF di disk. Key = hash (nisn, nama, kelas, nilai, versi layout),
+# jadi rapor yang datanya tidak berubah cukup disalin dari cache.
+# Ukuran cache dibatasi, entri yang paling lama tidak dipakai dibuang dulu (LRU,
+# memakai mtime yang diperbarui setiap kali entri dipakai).
+
+CACHE_DIR = ".rapor_cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+VERSION_FILE = "VERSION"
+
+
+def rapor_key(nisn, nama, kelas, nilai_dict, layout_version=LAYOUT_VERSION):
+    # urutan mapel ikut di-hash karena menentukan urutan baris tabel;
+    # aturan penilaian ikut karena menentukan predikat dan status
+    payload = json.dumps(
+        [layout_version, core.RULES.to_dict(), str(nisn), nama, str(kelas), list(nilai_dict.items())],
+        ensure_ascii=False, separators=(",", ":"), sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def copy_out(src, dest):
+    # selalu disalin, bukan hard link: file tujuan boleh ditimpa (render ulang,
+    # export per siswa) atau diedit pengguna tanpa mengubah isi cache. dest
+    # dihapus dulu supaya hard link dari versi lama juga putus
+    if os.path.lexists(dest):
+        os.remove(dest)
+    shutil.copyfile(src, dest)
+
+
+class PdfCache:
+    def __init__(self, root=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, layout_version=LAYOUT_VERSION):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.layout_version = layout_version
+        os.makedirs(root, exist_ok=True)
+        self._check_version()
+
+    # template berubah -> seluruh isi cache tidak berlaku lagi
+    def _check_version(self):
+        version_path = os.path.join(self.root, VERSION_FILE)
+        try:
+            with open(version_path, "r", encoding="utf-8") as f:
+                current = f.read().strip()
+        except OSError:
+            current = None
+        if current != str(self.layout_version):
+            self.clear()
+            with open(version_path, "w", encoding="utf-8") as f:
+                f.write(str(self.layout_version))
+
+    def path_for(self, key):
+        return os.path.join(self.root, key[:2], key + ".pdf")
+
+    def fetch(self, key, dest):
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return False
+        copy_out(path, dest)
+        os.utime(path)  # tandai baru dipakai
+        return True
+
+    def tmp_path(self, key):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return f"{path}.{os.getpid()}.tmp"
+
+    def store(self, key, src):
+        tmp_path = self.tmp_path(key)
+        shutil.copyfile(src, tmp_path)
+        os.replace(tmp_path, self.path_for(key))
+
+    def entries(self):
+        for sub in os.listdir(self.root):
+            sub_path = os.path.join(self.root, sub)
+            if not os.path.isdir(sub_path):
+                continue
+            for name in os.listdir(sub_path):
+                if name.endswith(".pdf"):
+                    path = os.path.join(sub_path, name)
+                    st = os.stat(path)
+                    yield st.st_mtime, st.st_size, path
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        for sub in os.listdir(self.root):
+            sub_path = os.path.join(self.root, sub)
+            if os.path.isdir(sub_path):
+                shutil.rmtree(sub_path)
+
+    # ambil dari cache, atau render lalu simpan ke cache; True kalau dari cache
+    def get_or_render(self, dest, nisn, nama, kelas, nilai_dict, render):
+        key = rapor_key(nisn, nama, kelas, nilai_dict, self.layout_version)
+        if self.fetch(key, dest):
+            return True
+        # render ke file sementara di folder cache, masuk cache lewat
+        # os.replace, baru disalin ke dest: dest tidak pernah berbagi isi
+        # dengan entri cache
+        tmp_path = self.tmp_path(key)
+        try:
+            render(tmp_path, nisn, nama, kelas, nilai_dict)
+            os.replace(tmp_path, self.path_for(key))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        copy_out(self.path_for(key), dest)
+        return False
@@ -0,0 +1,103 @@
+import os
+import json
+from bisect import bisect_right
+
+# Aturan penilaian: daftar mapel, batas predikat, batas lulus dan bobot
+# mapel. Default-nya sama dengan aturan lama; bisa diganti lewat file
+# aturan_nilai.json tanpa mengubah kode. Satu nilai dievaluasi dengan
+# bisect, array nilai (seluruh sekolah) dengan numpy.searchsorted.
+
+RULES_FILE = "aturan_nilai.json"
+
+DEFAULT_RULES = {
+    "mapel": ["Matematika", "Bahasa Indonesia", "Bahasa Inggris", "IPA", "IPS"],
+    "predikat": {"A": 90, "B": 80, "C": 70, "D": 60, "E": 0},  # huruf -> batas bawah
+    "batas_lulus": 75,
+    "bobot": {},  # mapel -> bobot rata-rata, default 1
+}
+
+
+class GradingRules:
+    def __init__(self, mapel, predikat, batas_lulus, bobot=None):
+        if not mapel:
+            raise ValueError("Daftar mapel tidak boleh kosong.")
+        if not predikat:
+            raise ValueError("Predikat tidak boleh kosong.")
+        self.subjects = list(mapel)
+        self.batas_lulus = batas_lulus
+        self.bobot = dict(bobot or {})
+        for m, w in self.bobot.items():
+            if isinstance(w, bool) or not isinstance(w, (int, float)) or w <= 0:
+                raise ValueError(f"Bobot {m} harus angka lebih dari 0.")
+
+        # urut dari batas terendah; nilai di bawah batas kedua = huruf terendah
+        ordered = sorted(predikat.items(), key=lambda item: item[1])
+        self.huruf = [h for h, _ in ordered]
+        self.batas = [b for _, b in ordered[1:]]
+
+    @classmethod
+    def from_dict(cls, config):
+        merged = {**DEFAULT_RULES, **config}
+        return cls(merged["mapel"], merged["predikat"], merged["batas_lulus"], merged["bobot"])
+
+    @classmethod
+    def load(cls, path=RULES_FILE):
+        # file tidak ada = aturan default; file rusak = error, bukan diam-diam default
+        if not os.path.exists(path):
+            return cls.from_dict({})
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                config = json.load(f)
+            except ValueError as e:
+                raise ValueError(f"File aturan '{path}' tidak valid: {e}") from e
+        return cls.from_dict(config)
+
+    def to_dict(self):
+        predikat = dict(zip(self.huruf, [0] + self.batas))
+        return {"mapel": self.subjects, "predikat": predikat, "batas_lulus": self.batas_lulus, "bobot": self.bobot}
+
+    def weight(self, mapel):
+        return self.bobot.get(mapel, 1)
+
+    # SATU NILAI
+    def predikat(self, nilai):
+        return self.huruf[bisect_right(self.batas, nilai)]
+
+    def rata(self, nilai_dict):
+        if not nilai_dict:
+            return 0
+        if not self.bobot:
+            return sum(nilai_dict.values()) / len(nilai_dict)
+        total = sum(v * self.weight(m) for m, v in nilai_dict.items())
+        return total / sum(self.weight(m) for m in nilai_dict)
+
+    def status(self, rata):
+        return "LULUS" if rata >= self.batas_lulus else "TIDAK LULUS"
+
+    def hitung_rata_status(self, nilai_dict):
+        rata = self.rata(nilai_dict)
+        return rata, self.status(rata)
+
+    # ARRAY (numpy di-import di sini supaya aturan bisa dipakai tanpa numpy)
+    def predikat_array(self, values):
+        import numpy as np
+
+        idx = np.searchsorted(self.batas, values, side="right")
+        return np.array(self.huruf)[idx]
+
+    def rata_array(self, values, mask, subjects):
+        # values / mask: matriks (siswa x subjects); jumlah dihitung per kolom
+        # supaya hasil untuk nilai & bobot bulat sama persis dengan rata()
+        import numpy as np
+
+        n = values.shape[0]
+        sums = np.zeros(n, dtype=np.float64)
+        weights = np.zeros(n, dtype=np.float64)
+        for j, mapel in enumerate(subjects):
+            w = self.weight(mapel)
+            sums += values[:, j] * w
+            weights += mask[:, j] * w
+        return np.divide(sums, weights, out=np.zeros(n), where=weights > 0)
+
+    def lulus_array(self, rata):
+        return rata >= self.batas_lulus
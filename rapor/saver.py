@@ -0,0 +1,205 @@
+import time
+import threading
+
+# Thread penyimpan: mutasi dari GUI hanya dimasukkan ke antrean, thread ini
+# menggabungkan mutasi yang datang beruntun lalu menulisnya dalam satu batch.
+
+SAVE_DELAY = 0.4      # detik tanpa mutasi baru sebelum menulis
+SAVE_MAX_DELAY = 2.0  # batas tunggu kalau mutasi datang terus-menerus
+RETRY_DELAY = 3.0     # jeda sebelum mencoba lagi setelah gagal
+
+
+def copy_record(info):
+    # salinan dangkal supaya dict milik GUI boleh diubah lagi selama ditulis
+    info = dict(info)
+    if "nilai" in info:
+        info["nilai"] = dict(info["nilai"])
+    return info
+
+
+def merge_records(old, new):
+    # gabungkan dua mutasi untuk NISN yang sama menjadi satu
+    if old is None or new["op"] in ("put", "delete"):
+        return new
+    # new["op"] == "nilai"
+    if old["op"] == "put":
+        data = copy_record(old["data"])
+        data.setdefault("nilai", {}).update(new["data"])
+        return {"op": "put", "nisn": old["nisn"], "data": data}
+    if old["op"] == "nilai":
+        return {"op": "nilai", "nisn": old["nisn"], "data": {**old["data"], **new["data"]}}
+    return old  # nilai untuk siswa yang sudah dihapus diabaikan
+
+
+class SaveWorker:
+    def __init__(self, backend, on_status=None, delay=SAVE_DELAY, max_delay=SAVE_MAX_DELAY, version=None):
+        # version(): versi data (seq) yang sedang ditampilkan, dicatat di setiap
+        # mutasi sebagai "base" supaya penyimpanan bisa menolak perubahan yang
+        # dibuat di atas data yang sudah diubah instance lain
+        self.backend = backend
+        self.on_status = on_status
+        self.version = version
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self._cond = threading.Condition()
+        self._pending = {}  # nisn -> record
+        self._first_submit = 0.0
+        self._last_submit = 0.0
+        self._flush_requested = False
+        self._busy = False
+        self._writing = {}  # batch yang sedang ditulis
+        self._closed = False
+        self._attempts = 0
+        self.error = None
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # API sama dengan StorageBackend, jadi halaman tidak perlu tahu
+    def put(self, nisn, info):
+        self._submit({"op": "put", "nisn": nisn, "data": copy_record(info)})
+
+    def put_nilai(self, nisn, nilai_dict):
+        self._submit({"op": "nilai", "nisn": nisn, "data": dict(nilai_dict)})
+
+    def delete(self, nisn):
+        self._submit({"op": "delete", "nisn": nisn})
+
+    def rename(self, old_nisn, new_nisn, info):
+        with self._cond:
+            self._merge(self._stamp({"op": "delete", "nisn": old_nisn}))
+            self._merge(self._stamp({"op": "put", "nisn": new_nisn, "data": copy_record(info)}))
+            self._cond.notify_all()
+        self._report("pending")
+
+    def apply_batch(self, records):
+        with self._cond:
+            for r in records:
+                if r["op"] == "rename":
+                    self._merge(self._stamp({"op": "delete", "nisn": r["old"]}))
+                    r = {"op": "put", "nisn": r["nisn"], "data": r["data"]}
+                self._merge(self._stamp(dict(r)))
+            self._cond.notify_all()
+        self._report("pending")
+
+    def _submit(self, record):
+        with self._cond:
+            self._merge(self._stamp(record))
+            self._cond.notify_all()
+        self._report("pending")
+
+    def _stamp(self, record):
+        if self.version is not None:
+            record["base"] = self.version()
+        return record
+
+    def _merge(self, record):
+        now = time.monotonic()
+        if not self._pending:
+            self._first_submit = now
+        self._last_submit = now
+        nisn = record["nisn"]
+        old = self._pending.get(nisn)
+        merged = merge_records(old, record)
+        if merged is not record and "base" in old:
+            # nilai digabung ke put lama: data put tetap berdasar versi lama
+            merged["base"] = old["base"]
+        self._pending[nisn] = merged
+
+    def _report(self, status, detail=None):
+        if self.on_status:
+            self.on_status(status, detail)
+
+    # LOOP THREAD
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return  # ditutup dan tidak ada sisa
+
+                # debounce: tunggu sampai mutasi berhenti sebentar
+                while not self._flush_requested and not self._closed:
+                    deadline = min(self._last_submit + self.delay, self._first_submit + self.max_delay)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._pending
+                self._pending = {}
+                self._flush_requested = False
+                self._busy = True
+                self._writing = batch
+
+            try:
+                conflicts = self.backend.apply_batch(list(batch.values()))
+            except Exception as e:
+                with self._cond:
+                    # kembalikan batch ke antrean, mutasi yang lebih baru ditimpa di atasnya
+                    newer = self._pending
+                    self._pending = batch
+                    for record in newer.values():
+                        self._merge(record)
+                    self.error = e
+                    self._busy = False
+                    self._writing = {}
+                    self._attempts += 1
+                    self._cond.notify_all()
+                self._report("error", e)
+
+                with self._cond:
+                    self._cond.wait_for(lambda: self._flush_requested or self._closed, RETRY_DELAY)
+                continue
+
+            with self._cond:
+                self.error = None
+                self._busy = False
+                self._writing = {}
+                self._attempts += 1
+                idle = not self._pending
+                self._cond.notify_all()
+            if conflicts:
+                # tidak diulang: data di file lebih baru, GUI memuat versi itu
+                self._report("conflict", conflicts)
+            if idle:
+                self._report("saved", len(batch))
+
+    # FLUSH: tunggu sampai semua mutasi tertulis; False kalau penulisan gagal
+    def flush(self, timeout=None):
+        with self._cond:
+            attempts = self._attempts
+            self._flush_requested = True
+            self._cond.notify_all()
+
+            def done():
+                if self._busy:
+                    return False
+                if not self._pending:
+                    return True
+                return self.error is not None and self._attempts > attempts
+
+            self._cond.wait_for(done, timeout)
+            return not self._pending and not self._busy
+
+    def pending_nisns(self):
+        # NISN yang perubahannya belum selesai ditulis
+        with self._cond:
+            return set(self._pending) | set(self._writing)
+
+    def pending_count(self):
+        with self._cond:
+            return len(self._pending) + (1 if self._busy else 0)
+
+    def close(self, timeout=None):
+        ok = self.flush(timeout)
+        if not ok:
+            return False
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self.backend.close()
+        return True
@@ -0,0 +1,218 @@
+import re
+from bisect import bisect_left, insort
+
+# Index pencarian siswa di memori:
+# - NISN: list terurut, prefix dicari dengan bisect (NISN yang memuat query
+#   di tengah dicari dengan memindai list, bertahap)
+# - nama: trigram -> himpunan NISN; token 1-2 huruf
+#   dicari dengan memindai nama, bertahap
+# Index diperbarui per siswa saat tambah / edit / rename / hapus.
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# peringkat hasil, makin kecil makin relevan
+RANK_NISN_EXACT = 0
+RANK_NISN_PREFIX = 1
+RANK_NAMA_EXACT = 2
+RANK_NAMA_PREFIX = 3
+RANK_KATA_PREFIX = 4
+RANK_SUBSTRING = 5
+
+
+class SearchIndex:
+    def __init__(self, data=None):
+        # index baru dibangun saat pencarian pertama supaya startup tetap cepat;
+        # sebelum itu update inkremental diabaikan
+        self.data = data if data is not None else {}
+        self.built = False
+        self.nisn_sorted = []
+        self.names = {}      # nisn -> nama (huruf kecil)
+        self.by_gram = {}    # trigram -> {nisn}
+
+    def build(self):
+        self.nisn_sorted = sorted(self.data)
+        self.names = {}
+        self.by_gram = {}
+        for nisn, info in self.data.items():
+            self._add_name(nisn, info.get("nama", ""))
+        self.built = True
+
+    def ensure_built(self):
+        if not self.built:
+            self.build()
+
+    def __len__(self):
+        return len(self.data)
+
+    # UPDATE INKREMENTAL
+    def add(self, nisn, info):
+        if not self.built:
+            return
+        if nisn in self.names:
+            self.remove(nisn)
+        insort(self.nisn_sorted, nisn)
+        self._add_name(nisn, info.get("nama", ""))
+
+    def update(self, nisn, info):
+        if not self.built:
+            return
+        nama = info.get("nama", "").lower()
+        if self.names.get(nisn) == nama:
+            return  # nama tidak berubah, index tidak perlu disentuh
+        self.add(nisn, info)
+
+    def rename(self, old_nisn, new_nisn, info):
+        self.remove(old_nisn)
+        self.add(new_nisn, info)
+
+    def remove(self, nisn):
+        if not self.built:
+            return
+        nama = self.names.pop(nisn, None)
+        if nama is None:
+            return
+        i = bisect_left(self.nisn_sorted, nisn)
+        if i < len(self.nisn_sorted) and self.nisn_sorted[i] == nisn:
+            del self.nisn_sorted[i]
+        for key, table in self._name_keys(nama):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(nisn)
+                if not bucket:
+                    del table[key]
+
+    # pendengar DataModel
+    def apply_change(self, event):
+        if event["op"] == "batch":
+            self.apply_batch(event["events"])
+            return
+        op = event["op"]
+        if op == "add":
+            self.add(event["nisn"], event["info"])
+        elif op == "update":
+            self.update(event["nisn"], event["info"])
+        elif op == "rename":
+            self.rename(event["old"], event["nisn"], event["info"])
+        elif op == "delete":
+            self.remove(event["nisn"])
+        # "nilai" tidak mengubah nama / NISN
+
+    def apply_batch(self, events):
+        # siswa baru dikumpulkan lalu list NISN diurutkan sekali di akhir,
+        # bukan insort satu per satu
+        if not self.built:
+            return
+        added = []
+        for e in events:
+            if e["op"] == "add" and e["nisn"] not in self.names:
+                self._add_name(e["nisn"], e["info"].get("nama", ""))
+                added.append(e["nisn"])
+            else:
+                self.apply_change(e)
+        if added:
+            self.nisn_sorted.extend(added)
+            self.nisn_sorted.sort()
+
+    def _add_name(self, nisn, nama):
+        nama = nama.lower()
+        self.names[nisn] = nama
+        for key, table in self._name_keys(nama):
+            table.setdefault(key, set()).add(nisn)
+
+    def _name_keys(self, nama):
+        for gram in trigrams(nama):
+            yield gram, self.by_gram
+
+    # PENCARIAN
+    def nisn_prefix(self, prefix):
+        self.ensure_built()
+        i = bisect_left(self.nisn_sorted, prefix)
+        result = []
+        while i < len(self.nisn_sorted) and self.nisn_sorted[i].startswith(prefix):
+            result.append(self.nisn_sorted[i])
+            i += 1
+        return result
+
+    def _token_candidates(self, token):
+        # token >= 3 huruf lewat trigram; None = token pendek, nama harus
+        # dipindai (awal kata saja tidak cukup: "ni" ada di "Rani")
+        if len(token) < 3:
+            return None
+        grams = sorted(trigrams(token), key=lambda g: len(self.by_gram.get(g, ())))
+        found = set(self.by_gram.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not found:
+                break
+            found &= self.by_gram.get(gram, set())
+        return found
+
+    def search(self, query, limit=None):
+        # kembalikan semua NISN yang cocok, urut dari yang paling relevan
+        for result in self.search_steps(query, limit=limit):
+            if result is not None:
+                return result
+
+    def search_steps(self, query, chunk=None, limit=None):
+        # generator: yield None setiap `chunk` NISN / nama diperiksa (supaya
+        # GUI bisa membagi pekerjaan ke beberapa tick), lalu yield hasilnya.
+        # Hasilnya mencakup semua siswa yang cocok dengan pencarian lama
+        # (query ada di dalam NISN atau nama), plus nama yang memuat semua
+        # kata query dengan urutan bebas
+        self.ensure_built()
+        key = query.strip().lower()
+        if not key:
+            yield list(self.nisn_sorted[:limit] if limit else self.nisn_sorted)
+            return
+
+        checked = 0
+        ranks = {}
+        for nisn in self.nisn_prefix(key):
+            ranks[nisn] = RANK_NISN_EXACT if nisn == key else RANK_NISN_PREFIX
+        # NISN yang memuat query di tengah (mis. "123" di 99123)
+        for nisn in self.nisn_sorted:
+            checked += 1
+            if chunk and checked % chunk == 0:
+                yield None
+            if nisn not in ranks and key in nisn:
+                ranks[nisn] = RANK_SUBSTRING
+
+        tokens = TOKEN_RE.findall(key)
+        candidates = None  # None = semua nama dipindai
+        for token in sorted(tokens, key=len, reverse=True):
+            found = self._token_candidates(token)
+            if found is None:
+                continue
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                break
+        names = self.names
+        if candidates is None:
+            candidates = names
+
+        for nisn in candidates:
+            checked += 1
+            if chunk and checked % chunk == 0:
+                yield None
+            if nisn in ranks:
+                continue
+            nama = names.get(nisn)
+            # trigram bisa salah positif, cek ulang setiap token; query tanpa
+            # huruf / angka (mis. "-") dicari apa adanya
+            if nama is None or not (all(t in nama for t in tokens) if tokens else key in nama):
+                continue
+            if nama == key:
+                ranks[nisn] = RANK_NAMA_EXACT
+            elif nama.startswith(key):
+                ranks[nisn] = RANK_NAMA_PREFIX
+            elif tokens and all(nama.startswith(t) or f" {t}" in nama for t in tokens):
+                ranks[nisn] = RANK_KATA_PREFIX
+            else:
+                ranks[nisn] = RANK_SUBSTRING
+
+        result = sorted(ranks, key=lambda n: (ranks[n], names.get(n, ""), n))
+        yield result[:limit] if limit else result
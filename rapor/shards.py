@@ -0,0 +1,320 @@
+import os
+import re
+import json
+import glob
+import hashlib
+import threading
+
+from rapor.aggregates import Aggregates
+from rapor.json_stream import LOAD_CHUNK, LoadReport, iter_records
+from rapor.storage import StorageBackend, apply_record, atomic_write_json, copy_aside
+
+# Penyimpanan per kelas: satu folder (data_siswa.shards) berisi satu file
+# JSON per kelas (shard) dan manifest.json kecil berisi ringkasan setiap
+# shard (jumlah siswa, dinilai, lulus, jumlah nilai per mapel) plus checksum
+# isi shard. Dashboard cukup membaca manifest; shard baru dibaca saat siswanya
+# dibutuhkan. Daftar NISN tiap shard ada di file indeks kecil di sebelahnya
+# (kelas-....nisn), dibaca sekali saat NISN pertama kali dicari. Setiap simpan
+# hanya menulis ulang shard yang berubah, indeksnya, dan manifest (ukurannya
+# sebanding jumlah kelas, bukan jumlah siswa).
+#
+# Satu batch (mis. siswa pindah kelas = hapus di shard lama + tulis di shard
+# baru) dicatat dulu di transaksi.json. Kalau proses mati di tengah jalan,
+# transaksi diulang saat folder dibuka lagi (put / delete idempoten), jadi
+# siswa tidak pernah hilang atau tercatat di dua kelas.
+
+MANIFEST_FILE = "manifest.json"
+TXN_FILE = "transaksi.json"
+SHARD_PREFIX = "kelas-"
+INDEX_SUFFIX = ".nisn"
+MANIFEST_VERSION = 2
+
+
+def kelas_of(info):
+    return info.get("kelas", "")
+
+
+def shard_filename(kelas, suffix=".json"):
+    # nama kelas bebas (spasi, "/", huruf besar/kecil), jadi nama file diberi
+    # hash supaya tetap unik dan aman di semua sistem file
+    slug = re.sub(r"[^0-9A-Za-z_-]+", "_", kelas)[:40]
+    digest = hashlib.sha1(kelas.encode("utf-8")).hexdigest()[:8]
+    return f"{SHARD_PREFIX}{slug}-{digest}{suffix}"
+
+
+def write_shard_file(path, records):
+    # seperti atomic_write_json, tapi mengembalikan checksum isi file
+    payload = json.dumps(records, indent=4, ensure_ascii=False, default=dict).encode("utf-8")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return hashlib.sha1(payload).hexdigest()
+
+
+def write_index_file(path, checksum, nisns):
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump({"checksum": checksum, "nisn": sorted(nisns)}, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def shard_summary(records):
+    # ringkasan satu shard untuk manifest, dihitung sama seperti dashboard
+    agg = Aggregates(records)
+    return {
+        "siswa": agg.total,
+        "dinilai": agg.dinilai,
+        "lulus": agg.lulus,
+        "mapel_sum": agg.mapel_sum,
+        "mapel_count": agg.mapel_count,
+    }
+
+
+class ShardedStore(StorageBackend):
+    # GUI memuat shard sesuai kebutuhan halaman, bukan seluruh data saat start
+    lazy = True
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest_path = os.path.join(path, MANIFEST_FILE)
+        self.txn_path = os.path.join(path, TXN_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+        self.shards = self._read_manifest()
+        # nisn -> kelas, untuk mengarahkan nilai / hapus ke shard yang benar
+        # tanpa membaca shard, dan untuk cek NISN ganda antar kelas. Dibangun
+        # dari file indeks saat pertama kali dibutuhkan (lihat _directory)
+        self.directory = None
+        if os.path.exists(self.txn_path):
+            with open(self.txn_path, "r", encoding="utf-8") as f:
+                self._apply(json.load(f))
+            os.remove(self.txn_path)
+
+    # MANIFEST
+    def _read_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return self._rebuild_manifest()
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == 1:
+            # manifest lama menyimpan daftar NISN lengkap: dibangun ulang sekali
+            return self._rebuild_manifest()
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"{self.manifest_path}: versi manifest tidak didukung.")
+        return manifest["shards"]
+
+    def _rebuild_manifest(self):
+        # manifest hilang: dibangun ulang dari isi setiap shard
+        shards = {}
+        for path in sorted(glob.glob(os.path.join(self.path, f"{SHARD_PREFIX}*.json"))):
+            with open(path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            for nisn, info in records.items():
+                shards.setdefault(kelas_of(info), {})[nisn] = info
+        entries = {kelas: self._write_shard(kelas, records) for kelas, records in shards.items()}
+        if entries:
+            self._write_manifest(entries)
+        return entries
+
+    def _write_shard(self, kelas, records):
+        # tulis shard + indeks NISN-nya, kembalikan entri manifest
+        path = os.path.join(self.path, shard_filename(kelas))
+        entry = shard_summary(records)
+        entry["file"] = shard_filename(kelas)
+        entry["checksum"] = write_shard_file(path, records)
+        write_index_file(os.path.join(self.path, shard_filename(kelas, INDEX_SUFFIX)), entry["checksum"], records)
+        return entry
+
+    def _remove_shard(self, kelas):
+        for suffix in (".json", INDEX_SUFFIX):
+            path = os.path.join(self.path, shard_filename(kelas, suffix))
+            if os.path.exists(path):
+                os.remove(path)
+
+    # INDEKS NISN
+    def _read_index(self, kelas):
+        # daftar NISN satu shard; indeks yang hilang / tidak cocok dengan
+        # checksum di manifest (mis. proses mati di tengah simpan) dibangun
+        # ulang dari isi shard
+        entry = self.shards[kelas]
+        path = os.path.join(self.path, shard_filename(kelas, INDEX_SUFFIX))
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("checksum") == entry.get("checksum"):
+                return index["nisn"]
+        except (OSError, ValueError):
+            pass
+        nisns = list(self.read_shard(kelas))
+        write_index_file(path, entry.get("checksum"), nisns)
+        return nisns
+
+    def _directory(self):
+        # dipanggil dengan self._lock dipegang
+        if self.directory is None:
+            self.directory = {
+                nisn: kelas for kelas in self.shards for nisn in self._read_index(kelas)
+            }
+        return self.directory
+
+    def _write_manifest(self, shards):
+        atomic_write_json(self.manifest_path, {"version": MANIFEST_VERSION, "shards": shards})
+
+    def kelas_list(self):
+        with self._lock:
+            return sorted(self.shards)
+
+    def summaries(self):
+        # salinan ringkasan per kelas (tanpa daftar NISN) untuk dashboard
+        with self._lock:
+            return {
+                kelas: {k: v for k, v in entry.items() if k not in ("file", "checksum")}
+                for kelas, entry in self.shards.items()
+            }
+
+    def kelas_of(self, nisn):
+        with self._lock:
+            return self._directory().get(nisn)
+
+    # BACA SHARD
+    def shard_path(self, kelas):
+        return os.path.join(self.path, self.shards[kelas]["file"])
+
+    def read_shard(self, kelas, report=None):
+        if kelas not in self.shards:
+            return {}
+        data = {}
+        for students in self._iter_shard(kelas, report if report is not None else LoadReport()):
+            data.update(students)
+        return data
+
+    def _iter_shard(self, kelas, report, chunk_size=LOAD_CHUNK):
+        path = self.shard_path(kelas)
+        if not os.path.exists(path):
+            return
+        shard_report = LoadReport()
+        with open(path, "rb") as f:
+            yield from iter_records(f, path, shard_report, chunk_size)
+        # lokasi record rusak diberi nama file shard-nya
+        name = os.path.basename(path)
+        report.records += shard_report.records
+        report.errors.extend((line, col, nisn, f"{name}: {msg}") for line, col, nisn, msg in shard_report.errors)
+        if shard_report.errors:
+            report.backup = copy_aside(path)
+
+    def load(self, report=None):
+        data = {}
+        for students in self.stream(report):
+            data.update(students)
+        return data
+
+    def stream(self, report=None, chunk_size=LOAD_CHUNK, progress=None, kelas=None):
+        # kelas: daftar kelas yang dimuat (None = semua); progress dalam siswa
+        report = report if report is not None else LoadReport()
+        with self._lock:
+            wanted = [k for k in (self.shards if kelas is None else kelas) if k in self.shards]
+            total = sum(self.shards[k]["siswa"] for k in wanted)
+        done = 0
+        for k in wanted:
+            for students in self._iter_shard(k, report, chunk_size):
+                done += len(students)
+                yield students
+                if progress:
+                    progress(min(done, total), total)
+
+    def iter_students(self, kelas=None, page_size=500):
+        # satu shard (kelas) di memori sekaligus, urut kelas lalu NISN
+        wanted = self.kelas_list() if kelas is None else [kelas]
+        for k in wanted:
+            data = self.read_shard(k)
+            for nisn in sorted(data):
+                info = data[nisn]
+                yield nisn, info.get("nama", "-"), info.get("kelas", "-"), info.get("nilai", {})
+
+    # TULIS
+    def write_snapshot(self, data):
+        grouped = {}
+        for nisn, info in data.items():
+            grouped.setdefault(kelas_of(info), {})[nisn] = info
+        with self._lock:
+            shards = {kelas: self._write_shard(kelas, records) for kelas, records in grouped.items()}
+            for kelas in set(self.shards) - set(grouped):
+                self._remove_shard(kelas)
+            self.shards = shards
+            self.directory = {nisn: kelas_of(info) for nisn, info in data.items()}
+            self._write_manifest(self.shards)
+
+    def put(self, nisn, info):
+        self.apply_batch([{"op": "put", "nisn": nisn, "data": info}])
+
+    def put_nilai(self, nisn, nilai_dict):
+        self.apply_batch([{"op": "nilai", "nisn": nisn, "data": nilai_dict}])
+
+    def delete(self, nisn):
+        self.apply_batch([{"op": "delete", "nisn": nisn}])
+
+    def rename(self, old_nisn, new_nisn, info):
+        self.apply_batch([{"op": "rename", "old": old_nisn, "nisn": new_nisn, "data": info}])
+
+    def apply_batch(self, records):
+        with self._lock:
+            # transaksi dicatat dulu, baru shard dan manifest ditulis ulang
+            atomic_write_json(self.txn_path, records)
+            self._apply(records)
+            os.remove(self.txn_path)
+
+    def _apply(self, records):
+        changed = {}  # kelas -> isi shard (dibaca sekali per batch)
+        directory = self._directory()
+
+        def shard(kelas):
+            if kelas not in changed:
+                changed[kelas] = self.read_shard(kelas)
+            return changed[kelas]
+
+        def remove(nisn):
+            kelas = directory.pop(nisn, None)
+            if kelas is not None:
+                shard(kelas).pop(nisn, None)
+
+        for record in records:
+            op = record.get("op")
+            if op in ("put", "rename"):
+                if op == "rename":
+                    remove(record["old"])
+                # siswa pindah kelas: dihapus dari shard lama di batch yang sama
+                nisn, info = record["nisn"], record["data"]
+                kelas = kelas_of(info)
+                if directory.get(nisn) != kelas:
+                    remove(nisn)
+                shard(kelas)[nisn] = info
+                directory[nisn] = kelas
+            elif op == "nilai":
+                kelas = directory.get(record["nisn"])
+                if kelas is not None:
+                    apply_record(shard(kelas), record)
+            elif op == "delete":
+                remove(record["nisn"])
+
+        for kelas, records in changed.items():
+            if records:
+                self.shards[kelas] = self._write_shard(kelas, records)
+            else:
+                self._remove_shard(kelas)
+                self.shards.pop(kelas, None)
+        if changed:
+            self._write_manifest(self.shards)
+
+
+def migrate_json_to_shards(json_path, shard_path):
+    # MIGRASI SEKALI JALAN: data_siswa.json (+ journal) -> folder shard
+    from rapor.storage import JournalStore
+
+    if not os.path.exists(json_path):
+        return 0
+    data = JournalStore(json_path).load()
+    ShardedStore(shard_path).write_snapshot(data)
+    return len(data)
@@ -0,0 +1,185 @@
+import os
+import sqlite3
+import threading
+
+from rapor.storage import StorageBackend, JournalStore
+
+# Backend SQLite: tabel siswa + tabel nilai, setiap mutasi cukup
+# UPSERT / DELETE beberapa baris (tidak menulis ulang seluruh data).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS siswa (
+    nisn  TEXT PRIMARY KEY,
+    nama  TEXT NOT NULL,
+    kelas TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nilai (
+    nisn  TEXT NOT NULL REFERENCES siswa(nisn) ON DELETE CASCADE ON UPDATE CASCADE,
+    mapel TEXT NOT NULL,
+    nilai INTEGER NOT NULL,
+    UNIQUE (nisn, mapel)
+);
+-- index NISN sudah ada lewat PRIMARY KEY / UNIQUE
+CREATE INDEX IF NOT EXISTS idx_siswa_nama ON siswa(nama COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_siswa_kelas ON siswa(kelas);
+"""
+
+UPSERT_SISWA = """
+INSERT INTO siswa (nisn, nama, kelas) VALUES (?, ?, ?)
+ON CONFLICT(nisn) DO UPDATE SET nama = excluded.nama, kelas = excluded.kelas
+"""
+
+UPSERT_NILAI = """
+INSERT INTO nilai (nisn, mapel, nilai) VALUES (?, ?, ?)
+ON CONFLICT(nisn, mapel) DO UPDATE SET nilai = excluded.nilai
+"""
+
+
+class SQLiteStore(StorageBackend):
+    def __init__(self, path):
+        self.path = path
+        # dipakai juga dari thread penyimpan, akses diserialkan lewat lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def load(self, report=None):
+        data = {}
+        with self._lock:
+            # urutan rowid = urutan input, sama seperti urutan key di JSON
+            for nisn, nama, kelas in self.conn.execute(
+                "SELECT nisn, nama, kelas FROM siswa ORDER BY rowid"
+            ):
+                data[nisn] = {"nama": nama, "kelas": kelas}
+
+            for nisn, mapel, nilai in self.conn.execute(
+                "SELECT nisn, mapel, nilai FROM nilai ORDER BY rowid"
+            ):
+                data[nisn].setdefault("nilai", {})[mapel] = nilai
+        return data
+
+    def iter_students(self, kelas=None, page_size=500):
+        # keyset pagination: hanya satu halaman siswa yang ada di memori
+        last = ""
+        while True:
+            with self._lock:
+                if kelas is None:
+                    rows = self.conn.execute(
+                        "SELECT nisn, nama, kelas FROM siswa WHERE nisn > ? ORDER BY nisn LIMIT ?",
+                        (last, page_size),
+                    ).fetchall()
+                else:
+                    rows = self.conn.execute(
+                        "SELECT nisn, nama, kelas FROM siswa WHERE kelas = ? AND nisn > ? "
+                        "ORDER BY nisn LIMIT ?",
+                        (kelas, last, page_size),
+                    ).fetchall()
+                if not rows:
+                    return
+
+                nilai = {nisn: {} for nisn, _, _ in rows}
+                placeholders = ", ".join("?" * len(rows))
+                for nisn, mapel, v in self.conn.execute(
+                    f"SELECT nisn, mapel, nilai FROM nilai WHERE nisn IN ({placeholders}) ORDER BY rowid",
+                    list(nilai),
+                ):
+                    nilai[nisn][mapel] = v
+
+            for nisn, nama, kls in rows:
+                yield nisn, nama, kls, nilai[nisn]
+            last = rows[-1][0]
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM siswa").fetchone()[0]
+
+    # MUTASI PER RECORD
+    def _put(self, nisn, info):
+        self.conn.execute(UPSERT_SISWA, (nisn, info.get("nama", ""), info.get("kelas", "")))
+
+        nilai = info.get("nilai", {})
+        if nilai:
+            placeholders = ", ".join("?" * len(nilai))
+            self.conn.execute(
+                f"DELETE FROM nilai WHERE nisn = ? AND mapel NOT IN ({placeholders})",
+                (nisn, *nilai),
+            )
+        else:
+            self.conn.execute("DELETE FROM nilai WHERE nisn = ?", (nisn,))
+        self._put_nilai(nisn, nilai)
+
+    def _put_nilai(self, nisn, nilai_dict):
+        self.conn.executemany(
+            UPSERT_NILAI, [(nisn, mapel, v) for mapel, v in nilai_dict.items()]
+        )
+
+    def put(self, nisn, info):
+        self.apply_batch([{"op": "put", "nisn": nisn, "data": info}])
+
+    def put_nilai(self, nisn, nilai_dict):
+        self.apply_batch([{"op": "nilai", "nisn": nisn, "data": nilai_dict}])
+
+    def delete(self, nisn):
+        self.apply_batch([{"op": "delete", "nisn": nisn}])
+
+    def rename(self, old_nisn, new_nisn, info):
+        self.apply_batch([{"op": "rename", "old": old_nisn, "nisn": new_nisn, "data": info}])
+
+    def apply_batch(self, records):
+        # satu transaksi untuk seluruh batch
+        with self._lock, self.conn:
+            for r in records:
+                if r["op"] == "put":
+                    self._put(r["nisn"], r["data"])
+                elif r["op"] == "nilai":
+                    self._put_nilai(r["nisn"], r["data"])
+                elif r["op"] == "delete":
+                    self.conn.execute("DELETE FROM siswa WHERE nisn = ?", (r["nisn"],))
+                elif r["op"] == "rename":
+                    # hapus + tulis dalam transaksi yang sama, tidak ada keadaan setengah jadi
+                    self.conn.execute("DELETE FROM siswa WHERE nisn IN (?, ?)", (r["old"], r["nisn"]))
+                    self._put(r["nisn"], r["data"])
+
+    def write_snapshot(self, data):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM siswa")
+            self.conn.executemany(
+                "INSERT INTO siswa (nisn, nama, kelas) VALUES (?, ?, ?)",
+                [(nisn, info.get("nama", ""), info.get("kelas", "")) for nisn, info in data.items()],
+            )
+            self.conn.executemany(
+                "INSERT INTO nilai (nisn, mapel, nilai) VALUES (?, ?, ?)",
+                [
+                    (nisn, mapel, v)
+                    for nisn, info in data.items()
+                    for mapel, v in info.get("nilai", {}).items()
+                ],
+            )
+
+    def compact(self):
+        with self._lock:
+            self.conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# MIGRASI SEKALI JALAN: data_siswa.json (+ journal) -> SQLite
+def migrate_json_to_sqlite(json_path, db_path):
+    if not os.path.exists(json_path):
+        return 0
+
+    data = JournalStore(json_path).load()
+    store = SQLiteStore(db_path)
+    try:
+        if store.count():
+            raise ValueError(f"Database '{db_path}' sudah berisi data, migrasi dibatalkan.")
+        store.write_snapshot(data)
+    finally:
+        store.close()
+    return len(data)
@@ -0,0 +1,543 @@
+import os
+import json
+import time
+import shutil
+import threading
+from contextlib import nullcontext
+
+from rapor.json_stream import LOAD_CHUNK, LoadReport, iter_records
+from rapor.filelock import LOCK_SUFFIX, FileLock
+
+# Penyimpanan data siswa: snapshot JSON + journal append-only.
+# Setiap perubahan (tambah / edit / hapus) cukup menambah satu baris ke
+# journal, snapshot hanya ditulis ulang saat compaction.
+#
+# Beberapa instance (komputer lain, CLI) boleh membuka file yang sama:
+#   - journal, compaction dan simpan penuh ditulis di bawah lock file (.lock)
+#   - setiap record journal diberi nomor urut "seq" global; file .versi
+#     menyimpan generasi snapshot (naik setiap simpan penuh) dan seq terakhir
+#     yang sudah digabung ke snapshot
+#   - sebelum menulis, record instance lain yang belum terbaca dibaca dulu;
+#     perubahan untuk siswa yang sudah diubah instance lain sejak versi yang
+#     dilihat pemanggil ("base") tidak ditulis (konflik), termasuk nilai:
+#     pemanggil memuat ulang siswa itu dari file
+#   - changed() cukup membandingkan stat (inode / ukuran / mtime) file;
+#     read_changes() memberikan record baru saja, bukan seluruh data
+#   - perintah yang hanya membaca (stats, validate, history) membuka file
+#     hanya-baca: tanpa lock (tidak ada file .lock baru) dan ekor journal
+#     yang terpotong tidak dibuang, karena bisa jadi sedang ditulis
+
+JOURNAL_SUFFIX = ".journal"
+PENDING_SUFFIX = ".journal.1"
+VERSION_SUFFIX = ".versi"
+COMPACT_THRESHOLD = 1024 * 1024  # byte
+BACKUP_SUFFIX = ".rusak"
+
+
+def atomic_write_json(path, data):
+    # tulis ke file sementara lalu rename, supaya file lama tidak pernah
+    # terpotong kalau proses mati di tengah jalan
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        # default=dict: data siswa berbentuk mapping lain (Student) ditulis sebagai dict
+        json.dump(data, f, indent=4, ensure_ascii=False, default=dict)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def backup_path(path):
+    return f"{path}{BACKUP_SUFFIX}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+def copy_aside(path):
+    # salinan file data yang rusak, sebelum ada yang menimpanya
+    target = backup_path(path)
+    shutil.copyfile(path, target)
+    return target
+
+
+def move_aside(path):
+    # file yang sama sekali tidak terbaca dipindah supaya aplikasi bisa mulai
+    # dari journal / data kosong tanpa menghapusnya
+    target = backup_path(path)
+    os.replace(path, target)
+    return target
+
+
+def apply_record(data, record):
+    op = record.get("op")
+    if op == "put":
+        data[record["nisn"]] = record["data"]
+    elif op == "nilai":
+        info = data.get(record["nisn"])
+        if info is not None:
+            info.setdefault("nilai", {}).update(record["data"])
+    elif op == "delete":
+        data.pop(record["nisn"], None)
+    elif op == "rename":
+        data.pop(record["old"], None)
+        data[record["nisn"]] = record["data"]
+
+
+def read_journal_at(path, offset=0):
+    # record journal mulai dari byte offset -> (records, inode, offset akhir
+    # baris utuh terakhir); baris terakhir yang terpotong (crash saat append)
+    # diabaikan
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return [], None, 0
+
+    records = []
+    with f:
+        inode = os.fstat(f.fileno()).st_ino
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            records.append(record)
+            offset += len(line)
+    return records, inode, offset
+
+
+def read_journal(path, truncate_tail=False):
+    # baris terakhir yang terpotong bisa dibuang dari file (truncate_tail)
+    records, _, good_offset = read_journal_at(path)
+    if truncate_tail and os.path.exists(path) and good_offset < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(good_offset)
+    return records
+
+
+def record_nisns(record):
+    return (record["nisn"], record["old"]) if "old" in record else (record["nisn"],)
+
+
+def file_stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def replay_journal(path, data, truncate_tail=False):
+    records = read_journal(path, truncate_tail)
+    for record in records:
+        apply_record(data, record)
+    return len(records)
+
+
+# Antarmuka backend penyimpanan. Halaman GUI hanya memanggil method ini,
+# jadi format file (JSON + journal, SQLite, ...) bisa diganti.
+class StorageBackend:
+    # report: LoadReport, diisi record yang rusak (dilewati)
+    def load(self, report=None):
+        raise NotImplementedError
+
+    # siswa sebagai list (nisn, info) per potongan, untuk loading bertahap;
+    # progress(selesai, total). Default: dari hasil load()
+    def stream(self, report=None, chunk_size=LOAD_CHUNK, progress=None):
+        items = list(self.load(report).items())
+        for i in range(0, len(items), chunk_size):
+            yield items[i:i + chunk_size]
+            if progress:
+                progress(min(i + chunk_size, len(items)), len(items))
+
+    def write_snapshot(self, data):
+        raise NotImplementedError
+
+    def put(self, nisn, info):
+        raise NotImplementedError
+
+    def put_nilai(self, nisn, nilai_dict):
+        raise NotImplementedError
+
+    def delete(self, nisn):
+        raise NotImplementedError
+
+    def rename(self, old_nisn, new_nisn, info):
+        raise NotImplementedError
+
+    # siswa sebagai (nisn, nama, kelas, nilai), dibaca per halaman lewat
+    # stream(). Urutan mengikuti backend: SQLite / biner urut NISN, shard
+    # per kelas, default (JSON) urutan di file
+    def iter_students(self, kelas=None, page_size=500):
+        return students_from_chunks(self.stream(chunk_size=page_size), kelas)
+
+    # beberapa record sekaligus (format record sama dengan journal)
+    def apply_batch(self, records):
+        for r in records:
+            if r["op"] == "put":
+                self.put(r["nisn"], r["data"])
+            elif r["op"] == "nilai":
+                self.put_nilai(r["nisn"], r["data"])
+            elif r["op"] == "delete":
+                self.delete(r["nisn"])
+            elif r["op"] == "rename":
+                self.rename(r["old"], r["nisn"], r["data"])
+
+    def compact(self):
+        pass
+
+    def close(self):
+        pass
+
+    # PERUBAHAN DARI INSTANCE LAIN (file yang dipakai bersama); default:
+    # backend tidak mendukung, tidak pernah ada perubahan
+    def changed(self):
+        return False
+
+    def read_changes(self):
+        # (records baru dari instance lain, perlu_muat_ulang, seq)
+        return [], False, None
+
+    def read_students(self, nisns):
+        # data terbaru beberapa siswa dari file ({nisn: info}, yang tidak ada = dihapus)
+        data = self.load()
+        return {nisn: data[nisn] for nisn in nisns if nisn in data}
+
+
+def students_from_chunks(chunks, kelas=None):
+    # potongan [(nisn, info)] -> (nisn, nama, kelas, nilai), tanpa menampung semuanya
+    for students in chunks:
+        for nisn, info in students:
+            if kelas is not None and info.get("kelas") != kelas:
+                continue
+            yield nisn, info.get("nama", "-"), info.get("kelas", "-"), info.get("nilai", {})
+
+
+def open_storage(path, read_only=False):
+    # backend dipilih dari ekstensi file; read_only hanya berpengaruh ke
+    # JournalStore (backend lain tidak memakai file lock)
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        from rapor.sqlite_store import SQLiteStore
+        return SQLiteStore(path)
+    if path.endswith(".shards"):
+        from rapor.shards import ShardedStore
+        return ShardedStore(path)
+    if path.endswith(".bin"):
+        from rapor.binstore import BinaryStore
+        return BinaryStore(path)
+    return JournalStore(path, read_only=read_only)
+
+
+class JournalStore(StorageBackend):
+    def __init__(self, path, threshold=COMPACT_THRESHOLD, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.pending_path = path + PENDING_SUFFIX
+        self.version_path = path + VERSION_SUFFIX
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self.file_lock = nullcontext() if read_only else FileLock(path + LOCK_SUFFIX)
+        self._compactor = None
+
+        # versi data yang sudah dibaca instance ini
+        self.generasi = None
+        self.seq = 0
+        self.loaded_seq = 0
+        self._cursor = (None, 0)  # (inode, offset) journal aktif yang sudah dibaca
+        self._external = []       # record instance lain yang belum diambil read_changes
+        self._last_change = {}    # nisn -> seq perubahan terakhir dari instance lain
+        self._resync = False
+        self._stat = None
+
+    # FILE VERSI: {"generasi", "seq"}
+    def _read_version(self):
+        try:
+            with open(self.version_path, "r", encoding="utf-8") as f:
+                version = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"generasi": 0, "seq": 0}
+        return version
+
+    def _write_version(self, generasi, seq):
+        atomic_write_json(self.version_path, {"generasi": generasi, "seq": seq})
+
+    def _stat_all(self):
+        return tuple(file_stat(p) for p in (self.path, self.journal_path, self.pending_path, self.version_path))
+
+    # LOAD: snapshot -> journal yang sedang di-compact -> journal aktif
+    def load(self, report=None):
+        data = {}
+        for students in self.stream(report):
+            data.update(students)
+        return data
+
+    def stream(self, report=None, chunk_size=LOAD_CHUNK, progress=None, sync=True):
+        # snapshot dibaca bertahap. Record yang disentuh journal ditahan
+        # sampai snapshot selesai, lalu journal diterapkan ke record itu saja
+        # (journal kecil, snapshot bisa sangat besar).
+        # sync: versi yang dibaca menjadi versi instance ini (load penuh)
+        report = report if report is not None else LoadReport()
+        self.wait_compaction()
+        # lock (thread dan file) hanya selama membaca versi + journal, tidak
+        # selama snapshot di-parse dan di-yield: penyimpanan tetap jalan
+        # selama loading bertahap
+        with self._lock, self.file_lock:
+            version = self._read_version()
+            # journal dibaca sebelum segmen pending: tanpa lock (hanya-baca),
+            # journal yang dipindah compaction di antaranya terbaca dua kali
+            # (replay idempoten), bukan terlewat
+            journal = read_journal(self.journal_path, truncate_tail=not self.read_only)
+            journal = read_journal(self.pending_path) + journal
+            if sync:
+                _, inode, offset = read_journal_at(self.journal_path)
+                self.generasi = version["generasi"]
+                self.seq = max([version["seq"]] + [r.get("seq", 0) for r in journal])
+                self.loaded_seq = self.seq
+                self._cursor = (inode, offset)
+                self._external = []
+                self._resync = False
+                self._stat = self._stat_all()
+        touched = {n for r in journal for n in record_nisns(r)}
+
+        # snapshot yang diganti compaction selama dibaca sudah memuat journal
+        # yang sama (replay idempoten); record sesudahnya datang lewat
+        # read_changes. Simpan penuh di tengah jalan dicek di akhir
+        held = {}
+        for students in self.iter_snapshot(report, chunk_size, progress):
+            if touched:
+                ready = []
+                for nisn, info in students:
+                    if nisn in touched:
+                        held[nisn] = info
+                    else:
+                        ready.append((nisn, info))
+                students = ready
+            if students:
+                yield students
+
+        with self._lock:
+            for record in journal:
+                apply_record(held, record)
+            if sync and self._read_version()["generasi"] != version["generasi"]:
+                self._resync = True
+        if held:
+            yield list(held.items())
+
+    def iter_snapshot(self, report, chunk_size=LOAD_CHUNK, progress=None):
+        # record rusak dilewati; file asli disalin dulu supaya compaction /
+        # simpan penuh berikutnya tidak menghilangkannya
+        if not os.path.exists(self.path):
+            return
+        total = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            yield from iter_records(
+                f, self.path, report, chunk_size,
+                progress and (lambda done: progress(done, total)),
+            )
+        if report.errors and report.backup is None:
+            report.backup = copy_aside(self.path)
+
+    def read_students(self, nisns):
+        wanted = set(nisns)
+        data = {}
+        for students in self.stream(sync=False):
+            data.update((nisn, info) for nisn, info in students if nisn in wanted)
+        return data
+
+    # SIMPAN SELURUH DATA (menggantikan snapshot dan mengosongkan journal);
+    # instance lain melihat generasi baru dan memuat ulang
+    def write_snapshot(self, data):
+        self._check_writable()
+        self.wait_compaction()
+        with self._lock, self.file_lock:
+            version = self._read_version()
+            self._catch_up()
+            atomic_write_json(self.path, data)
+            for path in (self.pending_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.generasi = version["generasi"] + 1
+            self._write_version(self.generasi, self.seq)
+            self._cursor = (None, 0)
+            self._stat = self._stat_all()
+
+    # MUTASI PER RECORD
+    def put(self, nisn, info):
+        self.append([{"op": "put", "nisn": nisn, "data": info}])
+
+    def put_nilai(self, nisn, nilai_dict):
+        self.append([{"op": "nilai", "nisn": nisn, "data": nilai_dict}])
+
+    def delete(self, nisn):
+        self.append([{"op": "delete", "nisn": nisn}])
+
+    def rename(self, old_nisn, new_nisn, info):
+        self.append([{"op": "rename", "old": old_nisn, "nisn": new_nisn, "data": info}])
+
+    def iter_students(self, kelas=None, page_size=500):
+        # sync=False: membaca untuk export tidak mengubah versi milik GUI.
+        # Urutan di file, siswa yang ada di journal di akhir
+        return students_from_chunks(self.stream(chunk_size=page_size, sync=False), kelas)
+
+    def apply_batch(self, records):
+        return self.append(records)
+
+    def append(self, records):
+        # record boleh membawa "base" = seq data yang dilihat pemanggil saat
+        # perubahan dibuat (default: versi yang terakhir dibaca instance ini).
+        # Hasil: record yang tidak ditulis karena konflik
+        self._check_writable()
+        with self._lock, self.file_lock:
+            default_base = self.seq
+            self._catch_up()
+            conflicts = []
+            lines = []
+            for r in records:
+                base = r.get("base")
+                if base is None:
+                    base = default_base
+                if any(
+                    self._last_change.get(n, 0) > base for n in record_nisns(r)
+                ):
+                    conflicts.append(r)
+                    continue
+                self.seq += 1
+                r = {k: v for k, v in r.items() if k != "base"}
+                r["seq"] = self.seq
+                lines.append(json.dumps(r, ensure_ascii=False, separators=(",", ":"), default=dict) + "\n")
+
+            size = 0
+            if lines:
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+                    f.flush()
+                    os.fsync(f.fileno())
+                    size = f.tell()
+                    # _catch_up sudah membaca journal sampai akhir, jadi
+                    # posisi baru = akhir record milik sendiri
+                    self._cursor = (os.fstat(f.fileno()).st_ino, size)
+                self._stat = self._stat_all()
+
+        if size >= self.threshold:
+            self.start_compaction()
+        return conflicts
+
+    # PERUBAHAN DARI INSTANCE LAIN
+    def _catch_up(self):
+        # dipanggil dengan lock file dipegang: baca record instance lain sejak
+        # posisi terakhir. Kalau ada yang terlewat (sudah digabung ke snapshot
+        # oleh compaction instance lain / simpan penuh), tandai perlu muat ulang
+        version = self._read_version()
+        if self.generasi is None:
+            # belum pernah load: mulai dari versi file sekarang
+            self.generasi = version["generasi"]
+            self.seq = max(self.seq, version["seq"])
+        if version["generasi"] != self.generasi:
+            self._resync = True
+            return
+
+        # dibaca dari posisi terakhir kalau file yang sama; journal yang sudah
+        # dipindah ke segmen pending (compaction) diselesaikan dulu
+        inode, offset = self._cursor
+        journal = file_stat(self.journal_path)
+        pending = file_stat(self.pending_path)
+        if journal and journal[0] == inode and journal[1] >= offset:
+            sources = [(self.journal_path, offset)]
+        elif pending and pending[0] == inode and pending[1] >= offset:
+            sources = [(self.pending_path, offset), (self.journal_path, 0)]
+        else:
+            sources = [(self.pending_path, 0), (self.journal_path, 0)]
+        records = []
+        for path, start in sources:
+            found, found_inode, end = read_journal_at(path, start)
+            if found_inode is not None:
+                self._cursor = (found_inode, end)
+            records += found
+
+        # record sudah diberi seq berurutan; celah = ada yang terlewat
+        new = [r for r in records if r.get("seq", 0) > self.seq]
+        if new and new[0]["seq"] != self.seq + 1 or not new and version["seq"] > self.seq:
+            self._resync = True
+        if not new:
+            return
+        self.seq = new[-1]["seq"]
+        for r in new:
+            for n in record_nisns(r):
+                self._last_change[n] = r["seq"]
+        self._external.extend(new)
+
+    def changed(self):
+        # cek murah (stat saja), dipanggil berkala oleh GUI
+        return bool(self._external) or self._resync or self._stat_all() != self._stat
+
+    def read_changes(self):
+        with self._lock, self.file_lock:
+            self._catch_up()
+            self._stat = self._stat_all()
+            records, self._external = self._external, []
+            resync, self._resync = self._resync, False
+            return records, resync, self.seq
+
+    # COMPACTION DI BACKGROUND
+    def journal_size(self):
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError(f"{self.path}: dibuka hanya-baca.")
+
+    def start_compaction(self):
+        self._check_writable()
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return False
+            with self.file_lock:
+                if not os.path.exists(self.journal_path):
+                    return False
+                # journal aktif dipindah ke segmen pending; append berikutnya
+                # masuk ke journal baru sehingga UI tidak perlu menunggu
+                if not os.path.exists(self.pending_path):
+                    os.replace(self.journal_path, self.pending_path)
+
+            self._compactor = threading.Thread(target=self._compact_pending, daemon=True)
+            self._compactor.start()
+        return True
+
+    def _compact_pending(self):
+        # dibaca tanpa lock (lama untuk file besar), lalu ditulis hanya kalau
+        # snapshot dan segmen pending belum diubah instance lain
+        snapshot_stat = file_stat(self.path)
+        pending_stat = file_stat(self.pending_path)
+        data = {}
+        for students in self.iter_snapshot(LoadReport()):
+            data.update(students)
+        records = read_journal(self.pending_path)
+        for record in records:
+            apply_record(data, record)
+
+        with self._lock, self.file_lock:
+            if file_stat(self.path) != snapshot_stat or file_stat(self.pending_path) != pending_stat:
+                return  # sudah di-compact / disimpan penuh oleh instance lain
+            # snapshot baru sudah memuat segmen pending; kalau crash sebelum
+            # segmen dihapus, replay ulang tetap aman (put/delete idempoten)
+            version = self._read_version()
+            atomic_write_json(self.path, data)
+            self._write_version(version["generasi"], max([version["seq"]] + [r.get("seq", 0) for r in records]))
+            os.remove(self.pending_path)
+            self._stat = self._stat_all()
+
+    def wait_compaction(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def compact(self):
+        if self.start_compaction():
+            self.wait_compaction()
+
+    def close(self):
+        self.wait_compaction()
@@ -0,0 +1,183 @@
+from array import array
+from types import MappingProxyType
+from collections.abc import Mapping
+
+from rapor import core
+
+# Representasi siswa yang hemat memori untuk roster besar. Nilai disimpan
+# di array('b') sesuai urutan SUBJECTS (satu byte per mapel), mapel yang
+# belum diisi = MISSING. Nama mapel tidak lagi diulang di setiap siswa:
+# setiap Student hanya menyimpan referensi ke layout (urutan mapel) yang
+# berlaku saat nilainya ditulis, jadi aturan yang diganti (core.set_rules)
+# tidak membuat array lama terbaca dengan urutan yang salah.
+#
+# Student bisa dibaca seperti dict lama ({"nama", "kelas", "nilai"}), jadi
+# halaman GUI, export PDF dan penyimpanan tidak perlu diubah. Konversi
+# bolak-balik tanpa kehilangan data: nilai di luar SUBJECTS / di luar
+# rentang byte, urutan mapel yang tidak standar dan key lain tetap disimpan.
+
+MISSING = -128  # nilai valid 0-100, jadi -128 tidak pernah dipakai
+NAMA = "nama"
+KELAS = "kelas"
+NILAI = "nilai"
+
+_layout = ((), {})
+
+
+def current_layout():
+    # (SUBJECTS, {mapel: kolom}) mengikuti core.SUBJECTS saat ini; dipakai
+    # bersama oleh semua Student selama mapelnya tidak berubah
+    global _layout
+    subjects = tuple(core.SUBJECTS)
+    if _layout[0] != subjects:
+        _layout = (subjects, {m: i for i, m in enumerate(subjects)})
+    return _layout
+
+
+class Student(Mapping):
+    __slots__ = ("nama", "kelas", "layout", "grades", "others", "order", "fields")
+
+    def __init__(self, nama=None, kelas=None):
+        self.nama = nama
+        self.kelas = kelas
+        self.layout = current_layout()
+        self.grades = None   # array('b') atau None kalau tidak ada key "nilai"
+        self.others = None   # nilai yang tidak muat di array: {mapel: nilai}
+        self.order = None    # urutan mapel asli kalau berbeda dari urutan standar
+        self.fields = None   # key lain selain nama / kelas / nilai
+
+    @classmethod
+    def from_dict(cls, info):
+        if isinstance(info, Student) and info.layout[0] == current_layout()[0]:
+            return info
+        student = cls(info.get(NAMA), info.get(KELAS))
+        for key, value in info.items():
+            if key not in (NAMA, KELAS, NILAI):
+                if student.fields is None:
+                    student.fields = {}
+                student.fields[key] = value
+        if NILAI in info:
+            student.set_nilai(info[NILAI], replace=True)
+        return student
+
+    @property
+    def subjects(self):
+        # urutan mapel kolom array siswa ini
+        return self.layout[0]
+
+    def to_dict(self):
+        info = dict(self.items())
+        if self.grades is not None:
+            info[NILAI] = self.nilai_dict()
+        return info
+
+    # NILAI
+    def set_nilai(self, nilai_dict, replace=False):
+        if replace or self.grades is None:
+            old = nilai_dict
+        else:
+            old = self.nilai_dict()
+            old.update(nilai_dict)
+
+        # ditulis ulang dengan urutan mapel yang berlaku sekarang
+        self.layout = subjects, index = current_layout()
+        if all(m in index and type(v) is int and MISSING < v <= 127 for m, v in old.items()):
+            # jalur cepat: semua nilai muat di array
+            self.grades = array("b", [old.get(m, MISSING) for m in subjects])
+            self.others = None
+            keys = list(old)
+            self.order = None if keys == [m for m in subjects if m in old] else tuple(keys)
+            return
+
+        grades = array("b", [MISSING]) * len(subjects)
+        others = None
+        for mapel, v in old.items():
+            i = index.get(mapel)
+            if i is not None and type(v) is int and MISSING < v <= 127:
+                grades[i] = v
+            else:
+                if others is None:
+                    others = {}
+                others[mapel] = v
+        self.grades = grades
+        self.others = others
+
+        keys = list(old)
+        canonical = [m for m in subjects if m in old] + [m for m in keys if m not in index]
+        self.order = None if keys == canonical else tuple(keys)
+
+    def nilai_dict(self):
+        if self.grades is None:
+            return {}
+        subjects = self.layout[0]
+        result = {subjects[i]: v for i, v in enumerate(self.grades) if v != MISSING}
+        if self.others:
+            for mapel, v in self.others.items():
+                result[mapel] = v
+        if self.order is not None:
+            result = {m: result[m] for m in self.order}
+        return result
+
+    def grade(self, mapel, default=None):
+        i = self.layout[1].get(mapel)
+        if i is not None and self.grades is not None and self.grades[i] != MISSING:
+            return self.grades[i]
+        if self.others and mapel in self.others:
+            return self.others[mapel]
+        return default
+
+    # PROTOKOL MAPPING (dibaca seperti dict lama)
+    def __getitem__(self, key):
+        if key == NAMA and self.nama is not None:
+            return self.nama
+        if key == KELAS and self.kelas is not None:
+            return self.kelas
+        if key == NILAI and self.grades is not None:
+            # hanya-baca: ubah nilai lewat set_nilai / update_nilai, bukan
+            # student["nilai"][mapel] = ... (perubahan itu akan hilang)
+            return MappingProxyType(self.nilai_dict())
+        if self.fields and key in self.fields:
+            return self.fields[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        if self.nama is not None:
+            yield NAMA
+        if self.kelas is not None:
+            yield KELAS
+        if self.grades is not None:
+            yield NILAI
+        if self.fields:
+            yield from self.fields
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"Student({self.to_dict()!r})"
+
+
+def update_nilai(info, nilai_dict):
+    # sama dengan info["nilai"].update(...) untuk dict maupun Student
+    if isinstance(info, Student):
+        info.set_nilai(nilai_dict)
+    else:
+        info.setdefault(NILAI, {}).update(nilai_dict)
+
+
+def to_students(data):
+    # ubah di tempat supaya referensi ke dict data (index, model) tetap sama
+    for nisn, info in data.items():
+        data[nisn] = Student.from_dict(info)
+    return data
+
+
+def to_plain(data):
+    return {nisn: info.to_dict() if isinstance(info, Student) else dict(info) for nisn, info in data.items()}
@@ -0,0 +1,240 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from rapor.core import hitung_rata_status
+from rapor.json_stream import LoadReport, iter_records
+from rapor.storage import atomic_write_json, copy_aside, file_stat
+
+# Riwayat nilai per semester. Data aktif (data_siswa.json / .db / .shards)
+# hanya berisi nilai semester berjalan; saat semester ditutup nilainya
+# dipindah ke folder riwayat_semester, satu file (partisi) per semester:
+#
+#   index.json                daftar semester (lama -> baru), semester aktif,
+#                             ringkasan per semester dan per kelas
+#   semester-<nama>.json      data siswa semester itu (format data_siswa.json)
+#   semester-<nama>.rata.json rata-rata / status / kelas per siswa
+#
+# Saat start hanya index.json yang dibaca. Tren kelas dihitung dari index,
+# rata-rata beberapa semester satu siswa dari file .rata (kecil), dan
+# partisi lengkap baru dibaca kalau nilai per mapel semester lama dibuka.
+# Ringkasan dihitung sekali saat semester ditutup, dengan aturan saat itu.
+
+INDEX_FILE = "index.json"
+TERM_PREFIX = "semester-"
+INDEX_VERSION = 1
+TERM_CACHE = 2  # partisi lengkap yang disimpan di memori
+
+
+def term_filename(nama, suffix=".json"):
+    # nama semester bebas ("2024/2025 Ganjil"), jadi diberi hash seperti shard
+    slug = re.sub(r"[^0-9A-Za-z_-]+", "_", nama)[:40]
+    digest = hashlib.sha1(nama.encode("utf-8")).hexdigest()[:8]
+    return f"{TERM_PREFIX}{slug}-{digest}{suffix}"
+
+
+def term_summary(data):
+    # ringkasan satu semester: total + per kelas, dan rata-rata per siswa
+    kelas_stats = {}
+    students = {}
+    total = {"siswa": 0, "dinilai": 0, "lulus": 0, "rata_sum": 0.0}
+    for nisn, info in data.items():
+        kelas = info.get("kelas", "-")
+        stats = kelas_stats.setdefault(kelas, {"siswa": 0, "dinilai": 0, "lulus": 0, "rata_sum": 0.0})
+        for acc in (stats, total):
+            acc["siswa"] += 1
+        nilai = info.get("nilai")
+        if not nilai:
+            continue
+        rata, status = hitung_rata_status(nilai)
+        students[nisn] = [round(rata, 4), status, kelas]
+        for acc in (stats, total):
+            acc["dinilai"] += 1
+            acc["rata_sum"] += rata
+            if status == "LULUS":
+                acc["lulus"] += 1
+    return total, kelas_stats, students
+
+
+def trend_row(nama, stats):
+    # (semester, siswa, dinilai, lulus, rata) dari ringkasan {siswa, dinilai, lulus, rata_sum}
+    dinilai = stats["dinilai"]
+    rata = stats["rata_sum"] / dinilai if dinilai else None
+    return nama, stats["siswa"], dinilai, stats["lulus"], rata
+
+
+class TermHistory:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = os.path.join(path, INDEX_FILE)
+        self._lock = threading.Lock()
+        self._terms = OrderedDict()    # nama -> data siswa (partisi lengkap, LRU)
+        self._students = {}            # nama -> {nisn: [rata, status, kelas]}
+        self.aktif = None
+        self.entries = []
+        self.menutup = None            # {"nama", "next"} tutup semester yang belum selesai
+        self._stat = None
+        self.reload()
+
+    def reload(self):
+        # index dibaca ulang, mis. semester ditutup dari command line saat
+        # aplikasi terbuka; cache partisi dibuang karena isinya bisa diganti
+        stat = file_stat(self.index_path)
+        index = {"aktif": None, "semester": []}
+        if stat is not None:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("version") != INDEX_VERSION:
+                raise ValueError(f"{self.index_path}: versi riwayat semester tidak didukung.")
+        with self._lock:
+            self.aktif = index.get("aktif")
+            self.entries = index["semester"]
+            self.menutup = index.get("menutup")
+            self._terms.clear()
+            self._students.clear()
+            self._stat = stat
+
+    def changed(self):
+        # cek murah (stat saja), dipanggil berkala oleh GUI
+        return file_stat(self.index_path) != self._stat
+
+    def _write_index(self):
+        os.makedirs(self.path, exist_ok=True)
+        atomic_write_json(self.index_path, {
+            "version": INDEX_VERSION, "aktif": self.aktif, "semester": self.entries,
+            "menutup": self.menutup,
+        })
+        self._stat = file_stat(self.index_path)
+
+    def terms(self):
+        # semester yang sudah ditutup, lama -> baru
+        return [entry["nama"] for entry in self.entries]
+
+    def entry(self, nama):
+        for entry in self.entries:
+            if entry["nama"] == nama:
+                return entry
+        raise KeyError(nama)
+
+    def set_aktif(self, nama):
+        self.aktif = nama
+        self._write_index()
+
+    # TUTUP SEMESTER
+    def archive(self, nama, data, next_term=None, closing=False):
+        # simpan nilai semester `nama` sebagai partisi baru; semester dengan
+        # nama sama ditimpa. closing: index mencatat tutup semester belum
+        # selesai (data aktif belum dikosongkan), diselesaikan finish_close
+        total, kelas_stats, students = term_summary(data)
+        entry = dict(total, nama=nama, file=term_filename(nama), rata=term_filename(nama, ".rata.json"), kelas=kelas_stats)
+        os.makedirs(self.path, exist_ok=True)
+        atomic_write_json(os.path.join(self.path, entry["file"]), data)
+        atomic_write_json(os.path.join(self.path, entry["rata"]), students)
+        with self._lock:
+            # semester yang ditimpa (--force) tetap di posisinya: urutan
+            # entries = urutan semester untuk tren dan --last
+            names = self.terms()
+            if nama in names:
+                self.entries[names.index(nama)] = entry
+            else:
+                self.entries.append(entry)
+            if closing:
+                self.menutup = {"nama": nama, "next": next_term}
+            else:
+                self.aktif = next_term
+            self._terms.pop(nama, None)
+            self._students[nama] = students
+            self._write_index()
+        return entry
+
+    def finish_close(self, next_term):
+        with self._lock:
+            self.aktif = next_term
+            self.menutup = None
+            self._write_index()
+
+    # RINGKASAN (tanpa membaca partisi lengkap)
+    def kelas_trend(self, kelas=None):
+        # [(semester, siswa, dinilai, lulus, rata)] satu kelas / seluruh sekolah
+        rows = []
+        for entry in self.entries:
+            stats = entry if kelas is None else entry["kelas"].get(kelas)
+            if stats:
+                rows.append(trend_row(entry["nama"], stats))
+        return rows
+
+    def student_summaries(self, nama):
+        with self._lock:
+            students = self._students.get(nama)
+        if students is None:
+            path = os.path.join(self.path, self.entry(nama)["rata"])
+            with open(path, "r", encoding="utf-8") as f:
+                students = json.load(f)
+            with self._lock:
+                self._students[nama] = students
+        return students
+
+    def student_history(self, nisn, last=None):
+        # [(semester, kelas, rata, status)] semester yang ada nilainya
+        rows = []
+        for nama in self.terms()[-last:] if last else self.terms():
+            found = self.student_summaries(nama).get(nisn)
+            if found:
+                rata, status, kelas = found
+                rows.append((nama, kelas, rata, status))
+        return rows
+
+    def student_average(self, nisn, last=None, current=None):
+        # rata-rata dari rata-rata per semester; current = rata semester berjalan
+        values = [rata for _, _, rata, _ in self.student_history(nisn, last)]
+        if current is not None:
+            values.append(current)
+        return sum(values) / len(values) if values else None
+
+    # PARTISI LENGKAP (dibaca saat dibutuhkan)
+    def load_term(self, nama, report=None):
+        with self._lock:
+            data = self._terms.get(nama)
+            if data is not None:
+                self._terms.move_to_end(nama)
+                return data
+        path = os.path.join(self.path, self.entry(nama)["file"])
+        report = report if report is not None else LoadReport()
+        data = {}
+        with open(path, "rb") as f:
+            for students in iter_records(f, path, report):
+                data.update(students)
+        if report.errors:
+            report.backup = copy_aside(path)
+        with self._lock:
+            self._terms[nama] = data
+            while len(self._terms) > TERM_CACHE:
+                self._terms.popitem(last=False)
+        return data
+
+    def record(self, nama, nisn):
+        return self.load_term(nama).get(nisn)
+
+
+def close_term(store, data, history, nama, next_term, force=False):
+    # TUTUP SEMESTER: nilai semester berjalan (data = isi store) diarsipkan,
+    # lalu dikosongkan di data aktif (identitas siswa tetap). Arsip ditulis
+    # dulu bersama tanda "menutup" di index. Kalau proses mati sebelum tanda
+    # dihapus, perintah cukup diulang: arsip yang sudah ada tidak ditulis
+    # ulang (data aktif mungkin sudah kosong), hanya pengosongannya
+    pending = history.menutup
+    if pending and pending["nama"] != nama:
+        raise ValueError(f"Tutup semester '{pending['nama']}' belum selesai, ulangi dulu untuk semester itu.")
+    if not pending:
+        if nama in history.terms() and not force:
+            raise ValueError(f"Semester '{nama}' sudah ada di riwayat. Pakai --force untuk menimpa arsipnya.")
+        history.archive(nama, data, next_term, closing=True)
+    store.write_snapshot({
+        nisn: {key: value for key, value in info.items() if key != "nilai"}
+        for nisn, info in data.items()
+    })
+    history.finish_close(next_term)
+    return len(data)
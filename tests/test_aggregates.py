@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from rapor.aggregates import Aggregates
+from rapor.model import DataModel
+
+MAPEL = ["Matematika", "IPA", "IPS"]
+
+
+def random_nilai(rng):
+    return {m: rng.randrange(40, 101) for m in rng.sample(MAPEL, rng.randrange(len(MAPEL) + 1))}
+
+
+def mutate(dm, rng, steps=400):
+    for _ in range(steps):
+        nisn = str(rng.randrange(40))
+        op = rng.randrange(6)
+        if op == 0:
+            dm.add(nisn, {"nama": "A", "kelas": "X", "nilai": random_nilai(rng)})
+        elif op == 1:
+            dm.update(nisn, {"nama": "B", "kelas": "X", "nilai": random_nilai(rng)})
+        elif op == 2:
+            dm.set_nilai(nisn, random_nilai(rng))
+        elif op == 3:
+            dm.rename(nisn, str(rng.randrange(40)), {"nama": "C", "kelas": "X", "nilai": random_nilai(rng)})
+        elif op == 4:
+            dm.delete(nisn)
+        else:
+            dm.put_many([(str(rng.randrange(40)), {"nama": "D", "kelas": "X", "nilai": random_nilai(rng)})
+                         for _ in range(3)])
+
+
+def assert_same(agg, fresh):
+    assert (agg.total, agg.dinilai, agg.lulus) == (fresh.total, fresh.dinilai, fresh.lulus)
+    assert agg.mapel_count == fresh.mapel_count
+    assert agg.mapel_sum == pytest.approx(fresh.mapel_sum)
+    assert agg.persen_lulus == pytest.approx(fresh.persen_lulus)
+    for mapel in MAPEL:
+        assert agg.rata_mapel(mapel) == pytest.approx(fresh.rata_mapel(mapel))
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_inkremental_sama_dengan_hitung_ulang(seed):
+    rng = random.Random(seed)
+    dm = DataModel()
+    agg = Aggregates(dm.data)
+    dm.subscribe(agg.apply_change)
+    mutate(dm, rng)
+    assert_same(agg, Aggregates(dm.data))
+
+
+def test_memo_dibuang_saat_nilai_berubah():
+    dm = DataModel({"1": {"nama": "A", "kelas": "X", "nilai": {"IPA": 50}}})
+    agg = Aggregates(dm.data)
+    dm.subscribe(agg.apply_change)
+    assert agg.summary("1", dm.get("1"))[1] == "TIDAK LULUS"
+    assert agg.lulus == 0
+
+    dm.set_nilai("1", {"IPA": 95})
+    assert agg.summary("1", dm.get("1")) == (95, "LULUS")
+    assert agg.lulus == 1 and agg.rata_mapel("IPA") == 95
+    assert agg.rata_mapel("Matematika") is None
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from rapor import core
+from rapor.analytics import GradeMatrix
+from rapor.student import Student
+
+
+def test_update_row_sama_dengan_bangun_ulang():
+    data = {
+        "1": {"nama": "A", "kelas": "X", "nilai": {"IPA": 70}},
+        "2": {"nama": "B", "kelas": "Y"},
+    }
+    matrix = GradeMatrix(data)
+    data["2"] = {"nama": "B", "kelas": "X", "nilai": {"IPA": 90, "IPS": 80}}
+    assert matrix.update_row("2", data["2"])
+
+    fresh = GradeMatrix(data)
+    for name in ("values", "mask", "rata", "lulus", "graded", "counts"):
+        assert (getattr(matrix, name) == getattr(fresh, name)).all()
+    assert matrix.kelas_list() == ["X"]
+
+
+def test_update_row_siswa_baru_butuh_bangun_ulang():
+    matrix = GradeMatrix({"1": {"nama": "A", "kelas": "X"}})
+    assert not matrix.update_row("2", {"nama": "B", "kelas": "X"})
+    assert not matrix.update_row("1", {"nama": "A", "kelas": "X", "nilai": {"Kimia": 80}})
+
+
+def random_data(n=200, seed=1):
+    rng = random.Random(seed)
+    mapel = list(core.SUBJECTS) + ["Muatan Lokal"]
+    data = {}
+    for i in range(n):
+        chosen = rng.sample(mapel, rng.randrange(len(mapel) + 1))
+        data[str(10000 + i)] = {
+            "nama": f"Siswa {i}", "kelas": rng.choice(["X", "XI"]),
+            "nilai": {m: rng.randrange(30, 101) for m in chosen},
+        }
+    return data
+
+
+def test_sama_dengan_hitung_skalar():
+    data = random_data()
+    matrix = GradeMatrix(data)
+    graded = [nisn for nisn, info in data.items() if info["nilai"]]
+    for nisn in graded:
+        rata, status = core.hitung_rata_status(data[nisn]["nilai"])
+        assert matrix.summary(nisn) == (pytest.approx(rata), status)
+
+    summary = matrix.ringkasan()
+    lulus = sum(core.hitung_rata_status(data[n]["nilai"])[1] == "LULUS" for n in graded)
+    assert (summary["siswa"], summary["dinilai"], summary["lulus"]) == (len(data), len(graded), lulus)
+
+    expected = {h: 0 for h in reversed(core.RULES.huruf)}
+    for nisn in graded:
+        expected[core.get_predikat(core.hitung_rata_status(data[nisn]["nilai"])[0])] += 1
+    assert matrix.distribusi_predikat() == expected
+
+
+def test_peringkat_per_kelas():
+    data = random_data(80, seed=2)
+    data["1"] = {"nama": "Kembar", "kelas": "X", "nilai": {"IPA": 100}}
+    data["2"] = {"nama": "Kembar", "kelas": "X", "nilai": {"IPA": 100}}
+    matrix = GradeMatrix(data)
+    ranks = dict(zip(matrix.nisn, matrix.peringkat().tolist()))
+    for nisn, info in data.items():
+        if not info["nilai"]:
+            assert ranks[nisn] == 0
+            continue
+        rata = matrix.summary(nisn)[0]
+        better = sum(
+            1 for other, o in data.items()
+            if o["nilai"] and o["kelas"] == info["kelas"] and matrix.summary(other)[0] > rata
+        )
+        assert ranks[nisn] == better + 1
+    assert ranks["1"] == ranks["2"] == 1
+
+
+def test_jalur_student_sama_dengan_dict():
+    data = {nisn: dict(info, nilai={m: v for m, v in info["nilai"].items() if m in core.SUBJECTS})
+            for nisn, info in random_data(50, seed=3).items()}
+    from_dict = GradeMatrix(data)
+    from_students = GradeMatrix({nisn: Student.from_dict(info) for nisn, info in data.items()})
+    for name in ("values", "mask", "rata", "lulus"):
+        assert (getattr(from_dict, name) == getattr(from_students, name)).all()
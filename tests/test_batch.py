@@ -0,0 +1,55 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from rapor import core
+from rapor.batch import export_batch, render_chunk, select_students
+from rapor.pdf_cache import PdfCache, rapor_key
+from rapor.rules import GradingRules
+
+
+def test_worker_spawn_memakai_aturan_induk(tmp_path):
+    rules = GradingRules.from_dict({"batas_lulus": 95})
+    old = core.RULES
+    core.set_rules(rules)
+    try:
+        cache_dir = str(tmp_path / "cache")
+        PdfCache(cache_dir)
+        nilai = {"Matematika": 80}
+        # worker spawn meng-import ulang rapor.core (aturan default)
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = pool.submit(
+                render_chunk, str(tmp_path), "Rapor_{nisn}.pdf", [("1", "A", "X", nilai)], cache_dir, rules.to_dict()
+            ).result()
+        assert results[0][2] is None
+        # entri cache ada di key yang dihitung dengan aturan induk
+        assert os.path.exists(PdfCache(cache_dir).path_for(rapor_key("1", "A", "X", nilai)))
+    finally:
+        core.set_rules(old)
+
+
+DATA = {
+    "3": {"nama": "Cici Lestari", "kelas": "XI", "nilai": {"Matematika": 70}},
+    "1": {"nama": "Andi", "kelas": "X", "nilai": {"Matematika": 80}},
+    "2": {"nama": "Budi", "kelas": "X"},
+}
+
+
+def test_pilih_siswa_per_kelas_urut_nisn():
+    assert [s[0] for s in select_students(DATA)] == ["1", "2", "3"]
+    assert [s[0] for s in select_students(DATA, "Semua")] == ["1", "2", "3"]
+    assert select_students(DATA, "X") == [("1", "Andi", "X", {"Matematika": 80}), ("2", "Budi", "X", {})]
+    assert select_students(DATA, "XII") == []
+
+
+def test_export_massal_semua_siswa(tmp_path):
+    progress = []
+    out_dir = tmp_path / "out"
+    results = export_batch(
+        select_students(DATA), str(out_dir), pattern="{kelas}_{nama}.pdf", workers=2,
+        progress=lambda done, total: progress.append((done, total)), chunk_size=2, cache_dir=None,
+    )
+    assert sorted(r[0] for r in results) == ["1", "2", "3"]
+    assert all(r[2] is None for r in results)
+    assert sorted(os.listdir(out_dir)) == ["XI_Cici_Lestari.pdf", "X_Andi.pdf", "X_Budi.pdf"]
+    assert progress[-1] == (3, 3)
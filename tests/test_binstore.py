@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from rapor import core
+from rapor.analytics import GradeMatrix
+from rapor.binstore import BinaryStore, read_binstore, write_binstore
+from rapor.student import MISSING
+
+MTK, BIN = core.SUBJECTS[0], core.SUBJECTS[1]
+
+
+def make_data():
+    return {
+        "003": {"nama": "Cici", "kelas": "XI", "nilai": {BIN: 88, MTK: 75}},  # urutan tidak standar
+        "001": {"nama": "Ani Ü", "kelas": "X", "nilai": {MTK: 90}},
+        "002": {"nama": "Budi", "kelas": "X", "nilai": {MTK: 80, "Muatan Lokal": 85, BIN: 70.5}},
+        "004": {"nama": "Dedi", "kelas": "", "nilai": {}, "wali": "Bu Sri"},
+        "005": {"kelas": "X"},
+    }
+
+
+def test_json_biner_json_tanpa_kehilangan_data(tmp_path):
+    path = str(tmp_path / "data_siswa.bin")
+    data = make_data()
+    assert write_binstore(path, data) == len(data)
+    loaded = read_binstore(path)
+    assert loaded == data
+    assert list(loaded) == sorted(data)
+    assert list(loaded["003"]["nilai"]) == [BIN, MTK]
+
+
+def test_akses_langsung_dari_mmap(tmp_path):
+    path = str(tmp_path / "data_siswa.bin")
+    write_binstore(path, make_data())
+    store = BinaryStore(path)
+    try:
+        assert store.nisn_list() == ["001", "002", "003", "004", "005"]
+        assert store.row("003") == 2 and store.row("999") is None and store.row("ü") is None
+        assert store.get("001") == make_data()["001"]
+        assert store.column(MTK).tolist() == [90, 80, 75, MISSING, MISSING]
+        assert store.kelas_array().tolist() == ["X", "X", "XI", "", "X"]
+        assert store.has_others()
+        assert [s[0] for s in store.iter_students("X")] == ["001", "002", "005"]
+        with pytest.raises(ValueError, match="hanya-baca"):
+            store.put("006", {"nama": "E"})
+    finally:
+        store.close()
+
+
+def test_matriks_dari_file_biner(tmp_path):
+    path = str(tmp_path / "data_siswa.bin")
+    data = {nisn: info for nisn, info in make_data().items() if nisn != "002"}
+    write_binstore(path, data)
+    store = BinaryStore(path)
+    try:
+        assert not store.has_others()
+        matrix, fresh = GradeMatrix.from_store(store), GradeMatrix(data)
+        assert matrix.nisn == fresh.nisn and matrix.subjects == fresh.subjects
+        for name in ("values", "mask", "rata", "lulus"):
+            assert (getattr(matrix, name) == getattr(fresh, name)).all()
+        assert matrix.kelas.tolist() == fresh.kelas.tolist()
+        del matrix
+    finally:
+        store.close()
+
+
+def test_file_tidak_valid(tmp_path):
+    path = tmp_path / "rusak.bin"
+    path.write_bytes(b"bukan file biner" * 10)
+    with pytest.raises(ValueError, match="bukan file data biner"):
+        BinaryStore(str(path))
+    with pytest.raises(ValueError, match="NISN"):
+        write_binstore(str(tmp_path / "x.bin"), {"1" * 21: {"nama": "A"}})
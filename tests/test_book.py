@@ -0,0 +1,21 @@
+from rapor import book
+from rapor.pdf import draw_rapor_page
+
+
+def draw_two_pages(pdf, nisn, nama, kelas, nilai_dict):
+    draw_rapor_page(pdf, nisn, nama, kelas, nilai_dict)
+    pdf.add_page()
+    pdf.set_font("Arial", "", 12)
+    pdf.cell(0, 10, f"lanjutan {nisn}")
+
+
+def test_semua_halaman_siswa_masuk_buku(tmp_path, monkeypatch):
+    monkeypatch.setattr(book, "draw_rapor_page", draw_two_pages)
+    path = str(tmp_path / "buku.pdf")
+    students = [("1", "A", "X", {"Matematika": 80}), ("2", "B", "X", {"Matematika": 70})]
+
+    assert book.write_rapor_book(path, students) == 2
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.count(b"/Type /Page ") == 4
+    assert b"/Count 4" in data
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from rapor import cli, core
+
+
+@pytest.fixture
+def rules_rusak(monkeypatch):
+    rules = core.RULES
+    monkeypatch.setattr(core, "RULES_ERROR", "File aturan 'aturan_nilai.json' tidak valid: ...")
+    yield
+    core.set_rules(rules)
+
+
+def write_data(tmp_path):
+    path = tmp_path / "data_siswa.json"
+    path.write_text(json.dumps({"1": {"nama": "Ani", "kelas": "X", "nilai": {"IPA": 80}}}), encoding="utf-8")
+    return str(path)
+
+
+def test_aturan_rusak_pesan_satu_baris(tmp_path, capsys, rules_rusak):
+    data = write_data(tmp_path)
+    assert cli.main(["--data", data, "stats"]) == 1
+    assert capsys.readouterr().err.strip() == core.RULES_ERROR
+    # compact tidak memakai aturan
+    assert cli.main(["--data", data, "compact"]) == 0
+
+
+def test_aturan_dari_opsi_rules(tmp_path, capsys, rules_rusak):
+    data = write_data(tmp_path)
+    rules = tmp_path / "aturan.json"
+    rules.write_text(json.dumps({"batas_lulus": 60}), encoding="utf-8")
+    assert cli.main(["--data", data, "--rules", str(rules), "stats"]) == 0
+
+    rules.write_text("{rusak", encoding="utf-8")
+    assert cli.main(["--data", data, "--rules", str(rules), "stats"]) == 1
+    assert "tidak valid" in capsys.readouterr().err
+
+
+def test_perintah_baca_tanpa_lock(tmp_path):
+    data = write_data(tmp_path)
+    for command in (["stats"], ["validate"], ["history"]):
+        cli.main(["--data", data, *command])
+    assert not os.path.exists(data + ".lock")
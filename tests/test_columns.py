@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from rapor import columns
+from rapor.columns import Column, ColumnIndex
+from rapor.model import DataModel
+
+MAPEL = ["Matematika", "IPA", "IPS"]
+
+
+def random_nilai(rng):
+    return {m: rng.randrange(40, 101) for m in rng.sample(MAPEL, rng.randrange(len(MAPEL) + 1))}
+
+
+def mutate(dm, rng, steps=400):
+    for _ in range(steps):
+        nisn = str(rng.randrange(40))
+        op = rng.randrange(5)
+        if op == 0:
+            dm.update(nisn, {"nama": "A", "kelas": "X", "nilai": random_nilai(rng)})
+        elif op == 1:
+            dm.set_nilai(nisn, random_nilai(rng))
+        elif op == 2:
+            dm.rename(nisn, str(rng.randrange(40)), {"nama": "B", "kelas": "X", "nilai": random_nilai(rng)})
+        elif op == 3:
+            dm.delete(nisn)
+        else:
+            dm.put_many([(str(rng.randrange(40)), {"nama": "C", "kelas": "X", "nilai": random_nilai(rng)})
+                         for _ in range(3)])
+
+
+def assert_same(index, data):
+    fresh = ColumnIndex(data)
+    for mapel in MAPEL:
+        col, expected = index.column(mapel), fresh.column(mapel)
+        assert col.rows() == expected.rows()
+        assert col.top() == expected.top()
+        assert col.rank_keys == [neg for neg, _ in col.ranked]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_inkremental_sama_dengan_bangun_ulang(seed):
+    rng = random.Random(seed)
+    dm = DataModel()
+    index = ColumnIndex(dm.data)
+    index.build()
+    dm.subscribe(index.apply_change)
+    mutate(dm, rng)
+    assert index.built
+    assert_same(index, dm.data)
+
+
+def test_batch_besar_membangun_ulang_saat_dipakai(monkeypatch):
+    monkeypatch.setattr(columns, "REBUILD_THRESHOLD", 2)
+    dm = DataModel()
+    index = ColumnIndex(dm.data)
+    index.build()
+    dm.subscribe(index.apply_change)
+    dm.put_many([(str(i), {"nama": "A", "kelas": "X", "nilai": {"IPA": 60 + i}}) for i in range(5)])
+    assert not index.built
+    assert index.column("IPA").top(2) == [("4", 64), ("3", 63)]
+
+
+def test_rentang_dan_top():
+    rng = random.Random(7)
+    scores = {str(i): rng.randrange(0, 101) for i in range(200)}
+    col = Column.from_scores(dict(scores))
+    for low, high in [(None, None), (70, None), (None, 50), (60, 80), (90, 10)]:
+        expected = sorted(
+            ((n, v) for n, v in scores.items()
+             if (low is None or v >= low) and (high is None or v <= high)),
+            key=lambda r: (-r[1], r[0]),
+        )
+        assert col.in_range(low, high) == expected
+    assert col.top(3) == sorted(scores.items(), key=lambda r: (-r[1], r[0]))[:3]
+    assert col.rows() == sorted(scores.items())
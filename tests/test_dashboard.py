@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+from main_rapor import DashboardPage
+from rapor.aggregates import Aggregates
+
+
+class FakeTextbox:
+    def __init__(self):
+        self.text = ""
+        self.inserts = 0
+        self.tags = []
+        self.options = {}
+
+    def configure(self, **kwargs):
+        self.options.update(kwargs)
+
+    def delete(self, first, last):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += text
+        self.inserts += 1
+
+    def tag_add(self, tag, first, last):
+        self.tags.append((tag, first, last))
+
+    def yview_moveto(self, fraction):
+        pass
+
+    # teks pada posisi Tk "baris.kolom" (baris mulai dari 1)
+    def get(self, first, last):
+        line, start = map(int, first.split("."))
+        _, end = map(int, last.split("."))
+        return self.text.split("\n")[line - 1][start:end]
+
+
+class FakeVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class FakeDashboard:
+    render_page = DashboardPage.render_page
+    page_count = DashboardPage.page_count
+    go_page = DashboardPage.go_page
+    change_page_size = DashboardPage.change_page_size
+
+    def __init__(self, data, page_size):
+        self.app = SimpleNamespace(data=data, aggregates=Aggregates(data), unloaded_kelas=lambda: False)
+        self.order = sorted(data)
+        self.page_no = 0
+        self.page_size = page_size
+        self.page_size_var = FakeVar(str(page_size))
+        self.info_box = FakeTextbox()
+        self.lbl_page = FakeTextbox()
+        self.btn_prev = FakeTextbox()
+        self.btn_next = FakeTextbox()
+
+
+def make_data(n=25):
+    data = {}
+    for i in range(n):
+        nilai = {} if i % 5 == 0 else {"IPA": 40 + i * 2}
+        data[f"{i:03d}"] = {"nama": f"Siswa {i}", "kelas": "X", "nilai": nilai}
+    return data
+
+
+def test_satu_halaman_satu_insert_dengan_tag_status():
+    page = FakeDashboard(make_data(), 10)
+    page.render_page()
+    box = page.info_box
+    assert box.inserts == 1
+    assert box.text.startswith("1. 000 — Siswa 0 — X\n     Nilai belum diinput")
+    assert "11. 010" not in box.text
+    # tag tepat menutupi teks status di baris yang benar
+    for tag, first, last in box.tags:
+        status = box.get(first, last)
+        assert status == ("LULUS" if tag == "lulus" else "TIDAK LULUS")
+    assert len(box.tags) == 8
+    assert page.btn_prev.options["state"] == "disabled"
+    assert page.btn_next.options["state"] == "normal"
+
+
+def test_pindah_halaman_dibatasi():
+    page = FakeDashboard(make_data(), 10)
+    assert page.page_count() == 3
+    page.go_page(5)
+    assert page.page_no == 2
+    assert page.info_box.text.startswith("21. 020")
+    assert page.lbl_page.options["text"] == "Halaman 3 / 3 · 25 siswa"
+    page.go_page(-9)
+    assert page.page_no == 0
+
+
+def test_ganti_ukuran_halaman_tetap_di_siswa_yang_sama():
+    page = FakeDashboard(make_data(), 5)
+    page.go_page(3)  # siswa ke-16 di baris pertama
+    page.page_size_var.set("10")
+    page.change_page_size()
+    assert page.page_no == 1
+    assert page.info_box.text.startswith("11. 010")
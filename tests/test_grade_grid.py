@@ -0,0 +1,99 @@
+import main_rapor
+from main_rapor import SUBJECTS, GradeGridWindow
+from rapor.model import DataModel
+
+
+class FakeEntry:
+    def __init__(self, text=""):
+        self.text = text
+        self.original = text
+        self.options = {}
+
+    def get(self):
+        return self.text
+
+    def configure(self, **kwargs):
+        self.options.update(kwargs)
+
+
+class FakeApp:
+    def __init__(self, data):
+        self.model = DataModel(data)
+        self.data = self.model.data
+
+
+class FakeGrid:
+    # logika GradeGridWindow tanpa widget Tk: satu baris per siswa kelas X
+    save = GradeGridWindow.save
+    changes = GradeGridWindow.changes
+    cell_error = GradeGridWindow.cell_error
+    check_cell = GradeGridWindow.check_cell
+
+    def __init__(self, data):
+        self.app = FakeApp(data)
+        self.invalid = set()
+        self.lbl_info = FakeEntry()
+        self.moved = []
+        self.rows = []
+        for nisn in sorted(data):
+            nilai = data[nisn].get("nilai", {})
+            self.rows.append((nisn, {m: FakeEntry(str(nilai[m]) if m in nilai else "") for m in SUBJECTS}))
+
+    def move(self, row, col):
+        self.moved.append((row, col))
+
+    def cell(self, nisn, mapel):
+        return dict(self.rows)[nisn][mapel]
+
+
+def make_data():
+    return {
+        "1": {"nama": "Ani", "kelas": "X", "nilai": {SUBJECTS[0]: 70}},
+        "2": {"nama": "Budi", "kelas": "X", "nilai": {}},
+        "3": {"nama": "Cici", "kelas": "X", "nilai": {SUBJECTS[1]: 60}},
+    }
+
+
+def test_simpan_sekali_untuk_seluruh_kelas():
+    grid = FakeGrid(make_data())
+    events = []
+    grid.app.model.subscribe(events.append)
+    grid.cell("1", SUBJECTS[1]).text = "85"
+    grid.cell("2", SUBJECTS[0]).text = " 90 "
+    grid.cell("3", SUBJECTS[1]).text = ""  # kosong = nilai tidak diubah
+
+    assert grid.changes() == {"1": {SUBJECTS[1]: 85}, "2": {SUBJECTS[0]: 90}}
+    assert grid.save()
+    assert [e["op"] for e in events] == ["batch"]
+    assert [e["nisn"] for e in events[0]["events"]] == ["1", "2"]
+    assert grid.app.data["1"]["nilai"] == {SUBJECTS[0]: 70, SUBJECTS[1]: 85}
+    assert grid.app.data["3"]["nilai"] == {SUBJECTS[1]: 60}
+    assert grid.lbl_info.options["text"] == "Nilai 2 siswa disimpan."
+    # setelah disimpan tidak ada perubahan tersisa
+    assert grid.changes() == {}
+
+
+def test_sel_tidak_valid_membatalkan_simpan(monkeypatch):
+    errors = []
+    monkeypatch.setattr(main_rapor.messagebox, "showerror", lambda title, msg, **kw: errors.append(msg))
+    grid = FakeGrid(make_data())
+    events = []
+    grid.app.model.subscribe(events.append)
+    grid.cell("1", SUBJECTS[1]).text = "85"
+    grid.cell("3", SUBJECTS[2]).text = "101"
+
+    assert not grid.save()
+    assert events == []
+    assert errors and errors[0].startswith("3: ")
+    assert grid.moved == [(2, 2)]
+    assert grid.app.data["1"]["nilai"] == {SUBJECTS[0]: 70}
+
+
+def test_siswa_dihapus_selama_tabel_terbuka():
+    grid = FakeGrid(make_data())
+    grid.cell("2", SUBJECTS[0]).text = "90"
+    grid.cell("3", SUBJECTS[0]).text = "80"
+    grid.app.model.delete("2")
+    assert grid.save()
+    assert "2" not in grid.app.data
+    assert grid.app.data["3"]["nilai"][SUBJECTS[0]] == 80
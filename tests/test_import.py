@@ -0,0 +1,51 @@
+import json
+
+from rapor import cli
+from rapor.storage import JournalStore
+
+
+def run_import(tmp_path, incoming, *extra):
+    source = tmp_path / "baru.json"
+    source.write_text(json.dumps(incoming), encoding="utf-8")
+    data = str(tmp_path / "data_siswa.json")
+    code = cli.main(["--data", data, "import", str(source), *extra])
+    return code, JournalStore(data).load()
+
+
+def test_import_json_divalidasi(tmp_path, capsys):
+    incoming = {
+        "1": {"nama": "Ani", "kelas": "X", "nilai": {"Matematika": 80}},
+        "2": {"nama": "B0b", "kelas": "X"},
+        "3": {"nama": "Cici", "kelas": "X", "nilai": {"Matematika": 150}},
+    }
+    code, data = run_import(tmp_path, incoming)
+    assert code == 1 and data == {}
+    err = capsys.readouterr().err
+    assert "record 2: 2:" in err and "record 3: 3:" in err
+
+    code, data = run_import(tmp_path, incoming, "--skip-errors")
+    assert code == 1 and list(data) == ["1"]
+
+
+def test_import_json_bukan_object_ditolak(tmp_path, capsys):
+    code, data = run_import(tmp_path, [{"nama": "Ani"}])
+    assert code == 1 and data == {}
+    assert "harus berisi object" in capsys.readouterr().err
+
+
+def test_semua_kesalahan_baris_dilaporkan(tmp_path):
+    from rapor.importer import read_import, validate_json
+
+    source = tmp_path / "baru.csv"
+    source.write_text("nisn,nama,kelas,Matematika\n1,B2,X,101\n1,Ani,X,80\n1,Ani,X,abc\n", encoding="utf-8")
+    result = read_import(str(source), {})
+    assert [(row, msg) for row, _, msg in result.errors] == [
+        (2, "Nama tidak boleh mengandung angka."),
+        (2, "Nilai Matematika harus 0-100."),
+        (4, "NISN duplikat di file (sama dengan baris 3)."),
+        (4, "Nilai Matematika harus berupa angka bulat."),
+    ]
+    assert result.students == [("1", {"nama": "Ani", "kelas": "X", "nilai": {"Matematika": 80}})]
+
+    result = validate_json({"2": {"nama": "B2", "kelas": "X", "nilai": {"Matematika": 101}}})
+    assert [msg for _, _, msg in result.errors] == ["Nama tidak boleh mengandung angka.", "Nilai Matematika harus 0-100."]
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from rapor.storage import JournalStore
+
+
+def write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_simpan_selama_stream_tidak_menunggu_loading(tmp_path):
+    path = str(tmp_path / "data.json")
+    write_json(path, {str(i): {"nama": f"S{i}"} for i in range(50)})
+    store = JournalStore(path)
+
+    chunks = store.stream(chunk_size=10)
+    first = next(chunks)
+    # generator sedang berhenti di yield: thread yang sama tetap bisa menulis
+    assert store.apply_batch([{"op": "put", "nisn": "99", "data": {"nama": "Baru"}}]) == []
+    data = dict(first)
+    for students in chunks:
+        data.update(students)
+    assert len(data) == 50
+    assert JournalStore(path).load()["99"] == {"nama": "Baru"}
+
+
+def write_lines(path, records, tail=""):
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in records)
+        f.write(tail)
+
+
+def test_replay_setelah_crash(tmp_path):
+    path = str(tmp_path / "data.json")
+    write_json(path, {"1": {"nama": "A", "kelas": "X"}, "2": {"nama": "B", "kelas": "X"}})
+    # compaction mati di tengah jalan (.journal.1 masih ada), lalu append
+    # terakhir ke journal aktif terpotong
+    write_lines(path + ".journal.1", [
+        {"op": "nilai", "nisn": "1", "data": {"Matematika": 80}, "seq": 1},
+        {"op": "delete", "nisn": "2", "seq": 2},
+    ])
+    write_lines(path + ".journal", [
+        {"op": "put", "nisn": "3", "data": {"nama": "C", "kelas": "Y"}, "seq": 3},
+    ], tail='{"op": "put", "nisn": "4", "da')
+
+    store = JournalStore(path)
+    assert store.load() == {
+        "1": {"nama": "A", "kelas": "X", "nilai": {"Matematika": 80}},
+        "3": {"nama": "C", "kelas": "Y"},
+    }
+    assert store.seq == 3
+
+    # ekor terpotong dibuang, jadi record baru tidak menempel ke sampah
+    store.apply_batch([{"op": "put", "nisn": "5", "data": {"nama": "E", "kelas": "Y"}}])
+    data = JournalStore(path).load()
+    assert sorted(data) == ["1", "3", "5"]
+
+
+def test_konflik_antar_instance(tmp_path):
+    path = str(tmp_path / "data.json")
+    write_json(path, {"1": {"nama": "A", "kelas": "X"}, "2": {"nama": "B", "kelas": "X"}})
+    a, b = JournalStore(path), JournalStore(path)
+    a.load()
+    b.load()
+
+    assert a.apply_batch([{"op": "nilai", "nisn": "1", "data": {"IPA": 70}}]) == []
+    # b belum melihat perubahan a: tulisan ke siswa yang sama ditolak,
+    # siswa lain tetap ditulis
+    late = {"op": "nilai", "nisn": "1", "data": {"IPA": 90}}
+    assert b.apply_batch([late, {"op": "nilai", "nisn": "2", "data": {"IPS": 60}}]) == [late]
+
+    records, resync, seq = b.read_changes()
+    assert not resync and seq == 2
+    assert [(r["nisn"], r["data"]) for r in records] == [("1", {"IPA": 70})]
+    data = JournalStore(path).load()
+    assert data["1"]["nilai"] == {"IPA": 70}
+    assert data["2"]["nilai"] == {"IPS": 60}
+
+    # setelah perubahan a dibaca, b boleh menulis siswa itu lagi
+    assert b.apply_batch([{"op": "nilai", "nisn": "1", "data": {"IPA": 90}, "base": seq}]) == []
+    records, _, _ = a.read_changes()
+    assert [r["nisn"] for r in records] == ["2", "1"]
+
+
+def test_iter_students_tanpa_load(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.json")
+    write_json(path, {str(i): {"nama": f"S{i}", "kelas": "X" if i % 2 else "Y"} for i in range(20)})
+    store = JournalStore(path)
+    store.apply_batch([{"op": "nilai", "nisn": "3", "data": {"IPA": 80}}])
+    monkeypatch.setattr(JournalStore, "load", lambda self, report=None: pytest.fail("load() dipanggil"))
+
+    rows = list(store.iter_students("X", page_size=3))
+    assert sorted(nisn for nisn, _, _, _ in rows) == sorted(str(i) for i in range(1, 20, 2))
+    assert ("3", "S3", "X", {"IPA": 80}) in rows
+
+
+def test_simpan_hanya_menambah_journal_lalu_compact(tmp_path):
+    path = str(tmp_path / "data.json")
+    write_json(path, {"1": {"nama": "A", "kelas": "X"}})
+    snapshot = (tmp_path / "data.json").read_bytes()
+    store = JournalStore(path, threshold=10 ** 9)
+    store.load()
+
+    store.put("2", {"nama": "B", "kelas": "X"})
+    store.put_nilai("1", {"IPA": 80})
+    store.rename("2", "3", {"nama": "B", "kelas": "Y"})
+    store.delete("1")
+    # snapshot tidak ditulis ulang, setiap mutasi satu baris journal
+    assert (tmp_path / "data.json").read_bytes() == snapshot
+    assert len((tmp_path / "data.json.journal").read_text(encoding="utf-8").splitlines()) == 4
+
+    expected = {"3": {"nama": "B", "kelas": "Y"}}
+    assert JournalStore(path).load() == expected
+    store.compact()
+    assert not (tmp_path / "data.json.journal").exists()
+    assert json.loads((tmp_path / "data.json").read_text(encoding="utf-8")) == expected
+    assert JournalStore(path).load() == expected
+
+
+def test_compaction_otomatis_di_atas_ambang(tmp_path):
+    path = str(tmp_path / "data.json")
+    write_json(path, {})
+    store = JournalStore(path, threshold=200)
+    for i in range(20):
+        store.put(str(i), {"nama": f"S{i}", "kelas": "X"})
+    store.wait_compaction()
+    assert (tmp_path / "data.json").stat().st_size > 2
+    assert len(JournalStore(path).load()) == 20
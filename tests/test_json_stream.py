@@ -0,0 +1,32 @@
+import io
+
+from rapor.json_stream import LoadReport, iter_records
+
+
+def read_all(text, chunk_size=2):
+    report = LoadReport()
+    data = {}
+    for students in iter_records(io.BytesIO(text.encode("utf-8")), "data.json", report, chunk_size):
+        data.update(students)
+    return data, report
+
+
+def test_record_rusak_dilewati():
+    text = (
+        '{\n'
+        '  "1": {"nama": "A", "kelas": "X"},\n'
+        '  "2": {"nama": tidak valid, "kelas": "X"},\n'
+        '  "3": {"nama": "C", "kelas": "X", "nilai": {"IPA": 80}},\n'
+        '  "4": {"nama": "D", "kelas": "X", "nilai": {"IPA": "80"}}\n'
+        '}\n'
+    )
+    data, report = read_all(text)
+    assert sorted(data) == ["1", "3"]
+    assert report.records == 2
+    assert [(line, nisn) for line, _, nisn, _ in report.errors] == [(3, "2"), (5, "4")]
+
+
+def test_file_terpotong():
+    data, report = read_all('{"1": {"nama": "A"}, "2": {"nama": "B"}, "3": {"na')
+    assert sorted(data) == ["1", "2"]
+    assert report.errors
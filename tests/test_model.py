@@ -0,0 +1,111 @@
+import pytest
+
+from rapor import model
+from rapor.model import DataModel
+
+
+class FakeStore:
+    def __init__(self):
+        self.calls = []
+
+    def put(self, nisn, info):
+        self.calls.append(("put", nisn))
+
+    def put_nilai(self, nisn, nilai):
+        self.calls.append(("nilai", nisn, dict(nilai)))
+
+    def rename(self, old, new, info):
+        self.calls.append(("rename", old, new))
+
+    def delete(self, nisn):
+        self.calls.append(("delete", nisn))
+
+    def apply_batch(self, records):
+        self.calls.append(("batch", [r["nisn"] for r in records]))
+
+
+@pytest.fixture
+def dm():
+    dm = DataModel(store=FakeStore())
+    dm.events = []
+    dm.subscribe(dm.events.append)
+    return dm
+
+
+def ops(events):
+    return [(e["op"], e["nisn"]) for e in events]
+
+
+def test_event_per_perubahan(dm):
+    dm.add("1", {"nama": "Ani", "kelas": "X", "nilai": {}})
+    dm.add("1", {"nama": "Ani S", "kelas": "X", "nilai": {}})
+    dm.set_nilai("1", {"IPA": 80})
+    dm.set_nilai("9", {"IPA": 80})  # tidak ada: diabaikan
+    dm.rename("1", "2", {"nama": "Ani S", "kelas": "X", "nilai": {"IPA": 80}})
+    dm.delete("2")
+    dm.delete("2")
+
+    assert ops(dm.events) == [("add", "1"), ("update", "1"), ("nilai", "1"), ("rename", "2"), ("delete", "2")]
+    assert dm.events[1]["prev"]["nama"] == "Ani"
+    nilai = dm.events[2]
+    assert nilai["prev"]["nilai"] == {} and nilai["changed"] == {"IPA": 80}
+    assert dm.events[3]["old"] == "1"
+    assert dm.store.calls == [
+        ("put", "1"), ("put", "1"), ("nilai", "1", {"IPA": 80}), ("rename", "1", "2"), ("delete", "2"),
+    ]
+    assert len(dm) == 0
+
+
+def test_rename_menimpa_nisn_lain(dm):
+    dm.add("1", {"nama": "Ani", "kelas": "X", "nilai": {}})
+    dm.add("2", {"nama": "Budi", "kelas": "X", "nilai": {}})
+    dm.events.clear()
+    dm.rename("1", "2", {"nama": "Ani", "kelas": "X", "nilai": {}})
+    assert ops(dm.events) == [("delete", "2"), ("rename", "2")]
+    assert dm.get("2")["nama"] == "Ani" and "1" not in dm
+
+
+def test_put_many_satu_batch(dm):
+    dm.add("1", {"nama": "Ani", "kelas": "X", "nilai": {}})
+    dm.events.clear()
+    dm.store.calls.clear()
+    dm.put_many([("1", {"nama": "Ani", "kelas": "X", "nilai": {"IPA": 90}}), ("2", {"nama": "Budi", "kelas": "X"})])
+    assert len(dm.events) == 1 and dm.events[0]["op"] == "batch"
+    assert ops(dm.events[0]["events"]) == [("update", "1"), ("add", "2")]
+    assert dm.store.calls == [("batch", ["1", "2"])]
+    dm.put_many([])
+    assert len(dm.events) == 1
+
+
+def test_load_many_tidak_menimpa_dan_tidak_menulis(dm):
+    dm.add("1", {"nama": "Baru", "kelas": "X", "nilai": {}})
+    dm.events.clear()
+    dm.store.calls.clear()
+    dm.load_many([("1", {"nama": "Lama", "kelas": "X"}), ("2", {"nama": "Budi", "kelas": "X"})])
+    assert dm.get("1")["nama"] == "Baru"
+    assert dm.events == [{"op": "batch", "events": [{"op": "add", "nisn": "2", "info": dm.get("2")}], "load": True}]
+    assert dm.store.calls == []
+
+
+def test_merge_external(dm, monkeypatch):
+    dm.add("1", {"nama": "Ani", "kelas": "X", "nilai": {"IPA": 70}})
+    dm.add("2", {"nama": "Budi", "kelas": "X", "nilai": {}})
+    dm.events.clear()
+    dm.store.calls.clear()
+    count = dm.merge_external([
+        {"op": "nilai", "nisn": "1", "data": {"MTK": 85}},
+        {"op": "rename", "old": "2", "nisn": "3", "data": {"nama": "Budi", "kelas": "XI", "nilai": {}}},
+        {"op": "put", "nisn": "4", "data": {"nama": "Cici", "kelas": "X", "nilai": {}}},
+        {"op": "delete", "nisn": "9"},
+    ])
+    assert count == 3
+    assert ops(dm.events) == [("nilai", "1"), ("rename", "3"), ("add", "4")]
+    assert dm.get("1")["nilai"] == {"IPA": 70, "MTK": 85}
+    assert dm.store.calls == []
+
+    # banyak perubahan: satu event batch
+    monkeypatch.setattr(model, "MERGE_EVENTS", 1)
+    dm.events.clear()
+    dm.merge_external([{"op": "delete", "nisn": "3"}, {"op": "delete", "nisn": "4"}])
+    assert len(dm.events) == 1 and dm.events[0]["external"]
+    assert sorted(dm.data) == ["1"]
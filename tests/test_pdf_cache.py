@@ -0,0 +1,42 @@
+import os
+
+from rapor.pdf_cache import PdfCache, rapor_key
+
+
+def fake_render(path, nisn, nama, kelas, nilai_dict):
+    with open(path, "wb") as f:
+        f.write(repr(sorted(nilai_dict.items())).encode("utf-8"))
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_render_ulang_tidak_merusak_entri_lama(tmp_path):
+    cache = PdfCache(str(tmp_path / "cache"))
+    dest = str(tmp_path / "Rapor_1.pdf")
+
+    assert not cache.get_or_render(dest, "1", "A", "X", {"Matematika": 80}, fake_render)
+    assert cache.get_or_render(dest, "1", "A", "X", {"Matematika": 80}, fake_render)
+    # nilai berubah: nama file output sama, isi baru
+    assert not cache.get_or_render(dest, "1", "A", "X", {"Matematika": 40}, fake_render)
+
+    old = cache.path_for(rapor_key("1", "A", "X", {"Matematika": 80}))
+    new = cache.path_for(rapor_key("1", "A", "X", {"Matematika": 40}))
+    assert read(old) == repr([("Matematika", 80)]).encode("utf-8")
+    assert read(new) == read(dest)
+
+
+def test_dest_ditimpa_tidak_mengubah_cache(tmp_path):
+    cache = PdfCache(str(tmp_path / "cache"))
+    dest = str(tmp_path / "Rapor_1.pdf")
+    cache.get_or_render(dest, "1", "A", "X", {"Matematika": 80}, fake_render)
+    cache.get_or_render(dest, "1", "A", "X", {"Matematika": 80}, fake_render)
+
+    # export per siswa / edit pengguna menulis langsung ke file tujuan
+    with open(dest, "wb") as f:
+        f.write(b"diedit")
+    entry = cache.path_for(rapor_key("1", "A", "X", {"Matematika": 80}))
+    assert read(entry) == repr([("Matematika", 80)]).encode("utf-8")
+    assert not any(name.endswith(".tmp") for _, _, files in os.walk(cache.root) for name in files)
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from rapor.rules import DEFAULT_RULES, GradingRules
+
+RULES = {
+    "mapel": ["Matematika", "IPA"],
+    "predikat": {"E": 0, "A": 85, "C": 65, "B": 75},
+    "batas_lulus": 70,
+    "bobot": {"Matematika": 2},
+}
+
+
+def test_default_sama_dengan_aturan_lama():
+    rules = GradingRules.from_dict({})
+    assert rules.subjects == DEFAULT_RULES["mapel"]
+    assert [rules.predikat(v) for v in (100, 90, 89, 80, 79, 70, 60, 59, 0)] == list("AABBCCDEE")
+    assert rules.hitung_rata_status({"IPA": 75, "IPS": 74}) == (74.5, "TIDAK LULUS")
+    assert rules.hitung_rata_status({"IPA": 75}) == (75, "LULUS")
+    assert rules.rata({}) == 0
+
+
+def test_predikat_dan_bobot_dari_file(tmp_path):
+    path = tmp_path / "aturan_nilai.json"
+    path.write_text(json.dumps(RULES), encoding="utf-8")
+    rules = GradingRules.load(str(path))
+    assert [rules.predikat(v) for v in (85, 84, 75, 74, 65, 64)] == list("ABBCCE")
+    assert rules.weight("Matematika") == 2 and rules.weight("IPA") == 1
+    # (60*2 + 90) / 3
+    assert rules.hitung_rata_status({"Matematika": 60, "IPA": 90}) == (70, "LULUS")
+    assert GradingRules.from_dict(rules.to_dict()).to_dict() == rules.to_dict()
+
+
+def test_file_tidak_ada_pakai_default(tmp_path):
+    rules = GradingRules.load(str(tmp_path / "tidak_ada.json"))
+    assert rules.to_dict()["batas_lulus"] == DEFAULT_RULES["batas_lulus"]
+
+
+@pytest.mark.parametrize("config", [
+    {"mapel": []},
+    {"predikat": {}},
+    {"bobot": {"IPA": 0}},
+    {"bobot": {"IPA": "2"}},
+    {"bobot": {"IPA": True}},
+])
+def test_aturan_tidak_valid(config):
+    with pytest.raises(ValueError):
+        GradingRules.from_dict(config)
+
+
+def test_file_rusak(tmp_path):
+    path = tmp_path / "aturan_nilai.json"
+    path.write_text("{rusak", encoding="utf-8")
+    with pytest.raises(ValueError, match="tidak valid"):
+        GradingRules.load(str(path))
+
+
+def test_array_sama_dengan_skalar():
+    np = pytest.importorskip("numpy")
+    rules = GradingRules.from_dict(RULES)
+    subjects = ["Matematika", "IPA", "IPS"]
+    rows = [{"Matematika": 60, "IPA": 90}, {"IPS": 64}, {}, {"Matematika": 85, "IPA": 75, "IPS": 71}]
+    values = np.array([[r.get(m, 0) for m in subjects] for r in rows], dtype=np.float64)
+    mask = np.array([[m in r for m in subjects] for r in rows])
+
+    rata = rules.rata_array(values, mask, subjects)
+    assert rata.tolist() == [rules.rata(r) for r in rows]
+    assert rules.lulus_array(rata).tolist() == [rules.status(v) == "LULUS" for v in rata]
+    assert rules.predikat_array(rata).tolist() == [rules.predikat(v) for v in rata]
@@ -0,0 +1,74 @@
+import threading
+
+from rapor.saver import SaveWorker, merge_records
+
+
+class FakeBackend:
+    def __init__(self, fail=0):
+        self.batches = []
+        self.fail = fail
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def apply_batch(self, records):
+        with self.lock:
+            if self.fail:
+                self.fail -= 1
+                raise OSError("disk penuh")
+            self.batches.append(records)
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+def test_mutasi_beruntun_digabung_jadi_satu_batch():
+    backend = FakeBackend()
+    worker = SaveWorker(backend, delay=1.0, max_delay=5.0)
+    worker.put("1", {"nama": "A", "kelas": "X"})
+    worker.put_nilai("1", {"IPA": 80})
+    worker.put_nilai("1", {"IPS": 70})
+    worker.put("2", {"nama": "B", "kelas": "X"})
+    worker.delete("2")
+    assert worker.flush(timeout=5)
+
+    assert backend.batches == [[
+        {"op": "put", "nisn": "1", "data": {"nama": "A", "kelas": "X", "nilai": {"IPA": 80, "IPS": 70}}},
+        {"op": "delete", "nisn": "2"},
+    ]]
+    assert worker.close(timeout=5) and backend.closed
+
+
+def test_data_gui_boleh_diubah_setelah_put():
+    backend = FakeBackend()
+    worker = SaveWorker(backend, delay=0.05)
+    info = {"nama": "A", "kelas": "X", "nilai": {"IPA": 80}}
+    worker.put("1", info)
+    info["nilai"]["IPA"] = 10
+    assert worker.flush(timeout=5)
+    assert backend.batches[0][0]["data"]["nilai"] == {"IPA": 80}
+    worker.close(timeout=5)
+
+
+def test_gagal_menulis_dicoba_lagi_dan_dilaporkan():
+    backend = FakeBackend(fail=1)
+    status = []
+    worker = SaveWorker(backend, on_status=lambda s, d: status.append(s), delay=0.01)
+    worker.put("1", {"nama": "A", "kelas": "X"})
+    # flush pertama selesai dengan gagal, mutasi tetap di antrean
+    assert not worker.flush(timeout=5)
+    assert worker.pending_nisns() == {"1"}
+    assert worker.flush(timeout=5)
+    assert backend.batches == [[{"op": "put", "nisn": "1", "data": {"nama": "A", "kelas": "X"}}]]
+    assert "error" in status and status[-1] == "saved"
+    worker.close(timeout=5)
+
+
+def test_merge_records():
+    put = {"op": "put", "nisn": "1", "data": {"nama": "A"}}
+    nilai = {"op": "nilai", "nisn": "1", "data": {"IPA": 80}}
+    delete = {"op": "delete", "nisn": "1"}
+    assert merge_records(put, nilai)["data"] == {"nama": "A", "nilai": {"IPA": 80}}
+    assert merge_records(nilai, {"op": "nilai", "nisn": "1", "data": {"IPS": 1}})["data"] == {"IPA": 80, "IPS": 1}
+    assert merge_records(put, delete) is delete
+    assert merge_records(delete, nilai) is delete
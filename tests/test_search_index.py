@@ -0,0 +1,59 @@
+import random
+
+from rapor.search_index import SearchIndex
+
+NAMES = ["Rani Putri", "Andi Saputra", "Budi Santoso", "Dian Anggraini", "Nia Ramadhani", "Yudi", "Siti Aisyah"]
+QUERIES = ["123", "99", "0", "9912", "ni", "ud", "an", "a", "rani", "putri", "i s", "ra put", "-", "budi santoso", "zz"]
+
+
+def make_data(n=300, seed=1):
+    rng = random.Random(seed)
+    data = {}
+    for i in range(n):
+        nisn = str(rng.randrange(10 ** 9))
+        data[nisn] = {"nama": rng.choice(NAMES), "kelas": "X"}
+    data["99123"] = {"nama": "Rani Putri", "kelas": "X"}
+    data["1234"] = {"nama": "Yu-Di", "kelas": "X"}
+    return data
+
+
+def old_search(data, key):
+    # pencarian lama di SearchPage / NilaiPage
+    return {nisn for nisn, info in data.items() if key in nisn.lower() or key in info["nama"].lower()}
+
+
+def test_hasil_mencakup_pencarian_lama():
+    data = make_data()
+    index = SearchIndex(data)
+    for query in QUERIES:
+        found = index.search(query)
+        assert len(found) == len(set(found))
+        assert old_search(data, query) <= set(found), query
+        # selain itu hanya nama yang memuat semua kata query
+        for nisn in set(found) - old_search(data, query):
+            assert all(t in data[nisn]["nama"].lower() for t in query.split())
+
+
+def test_update_inkremental_sama_dengan_bangun_ulang():
+    data = make_data()
+    index = SearchIndex(data)
+    index.build()
+    data["555"] = {"nama": "Rina Ani", "kelas": "Y"}
+    index.add("555", data["555"])
+    info = data.pop("99123")
+    index.remove("99123")
+    data["77123"] = info
+    index.add("77123", info)
+
+    fresh = SearchIndex(data)
+    for query in QUERIES + ["rina", "555"]:
+        assert index.search(query) == fresh.search(query), query
+
+
+def test_urutan_dan_langkah_bertahap():
+    data = make_data()
+    index = SearchIndex(data)
+    assert index.search("99123")[0] == "99123"
+    steps = list(index.search_steps("ni", chunk=50))
+    assert steps[:-1] and all(step is None for step in steps[:-1])
+    assert steps[-1] == index.search("ni")
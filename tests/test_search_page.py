@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+
+import main_rapor
+from main_rapor import SearchPage
+from rapor.search_index import SearchIndex
+
+
+class FakeWidget:
+    def __init__(self):
+        self.text = None
+
+    def configure(self, **kwargs):
+        self.text = kwargs.get("text", self.text)
+
+
+class FakeList:
+    def __init__(self):
+        self.items = None
+        self.sets = 0
+
+    def set_items(self, items, label_func=None):
+        self.items = list(items)
+        self.sets += 1
+
+
+class FakeSearchPage:
+    # logika pencarian SearchPage tanpa widget Tk; after() hanya mengantre
+    schedule_search = SearchPage.schedule_search
+    perform_search = SearchPage.perform_search
+    _search_step = SearchPage._search_step
+    result_label = SearchPage.result_label
+
+    def __init__(self, data):
+        self.app = SimpleNamespace(data=data, index=SearchIndex(data))
+        self.query = ""
+        self.search_var = SimpleNamespace(get=lambda: self.query)
+        self.search_job = None
+        self.search_gen = 0
+        self.last_timing = None
+        self.listbox = FakeList()
+        self.lbl_info = FakeWidget()
+        self.jobs = {}
+        self.next_job = 0
+
+    def after(self, ms, func):
+        self.next_job += 1
+        self.jobs[self.next_job] = func
+        return self.next_job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def clear_detail(self):
+        pass
+
+    def run_pending(self):
+        while self.jobs:
+            job = min(self.jobs)
+            self.jobs.pop(job)()
+
+    def type(self, text):
+        self.query = text
+        self.schedule_search()
+
+
+def make_data(n=50):
+    data = {str(1000 + i): {"nama": f"Siswa {i}", "kelas": "X"} for i in range(n)}
+    data["9999"] = {"nama": "Rani Putri", "kelas": "XI"}
+    return data
+
+
+def test_ketikan_beruntun_hanya_satu_pencarian():
+    page = FakeSearchPage(make_data())
+    for text in ["r", "ra", "ran", "rani"]:
+        page.type(text)
+    assert len(page.jobs) == 1
+
+    page.run_pending()
+    assert page.listbox.sets == 1
+    assert page.listbox.items == ["9999"]
+    assert page.last_timing["query"] == "rani"
+    assert page.lbl_info.text.startswith("1 hasil")
+
+
+def test_query_baru_membatalkan_langkah_lama(monkeypatch):
+    monkeypatch.setattr(main_rapor, "SEARCH_CHUNK", 5)
+    page = FakeSearchPage(make_data())
+
+    # "siswa" cocok dengan banyak nama: dicari dalam beberapa tick
+    page.query = "siswa"
+    page.perform_search()
+    assert page.jobs and page.listbox.sets == 0
+
+    page.query = "putri"
+    page.perform_search()
+    page.run_pending()
+    assert page.listbox.sets == 1
+    assert page.listbox.items == ["9999"]
+
+
+def test_label_hasil_dari_data_terkini():
+    data = make_data()
+    page = FakeSearchPage(data)
+    assert page.result_label("9999") == "9999 — Rani Putri — XI"
+    data["9999"]["nama"] = "Rani P"
+    assert page.result_label("9999") == "9999 — Rani P — XI"
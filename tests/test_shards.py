@@ -0,0 +1,72 @@
+import json
+import os
+
+from rapor.shards import INDEX_SUFFIX, MANIFEST_FILE, TXN_FILE, ShardedStore, shard_filename
+
+
+def siswa(nama, kelas, nilai=None):
+    info = {"nama": nama, "kelas": kelas}
+    if nilai is not None:
+        info["nilai"] = nilai
+    return info
+
+
+def test_manifest_tanpa_daftar_nisn(tmp_path):
+    path = str(tmp_path / "data.shards")
+    store = ShardedStore(path)
+    store.write_snapshot({"1": siswa("A", "X"), "2": siswa("B", "Y")})
+    store.put_nilai("1", {"Matematika": 80})
+
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    for entry in manifest["shards"].values():
+        assert "nisn" not in entry
+        assert entry["checksum"]
+
+    # instance baru: NISN dicari lewat indeks per shard
+    store = ShardedStore(path)
+    assert store.kelas_of("2") == "Y"
+    store.put_nilai("2", {"Matematika": 70})
+    assert store.load()["2"]["nilai"] == {"Matematika": 70}
+
+
+def test_indeks_basi_dibangun_ulang(tmp_path):
+    path = str(tmp_path / "data.shards")
+    ShardedStore(path).write_snapshot({"1": siswa("A", "X")})
+    with open(os.path.join(path, shard_filename("X", INDEX_SUFFIX)), "w", encoding="utf-8") as f:
+        json.dump({"checksum": "lama", "nisn": []}, f)
+
+    assert ShardedStore(path).kelas_of("1") == "X"
+
+
+def test_transaksi_diulang_saat_dibuka(tmp_path):
+    path = str(tmp_path / "data.shards")
+    ShardedStore(path).write_snapshot({"1": siswa("A", "X", {"IPA": 70}), "2": siswa("B", "X")})
+
+    # proses mati setelah transaksi dicatat (pindah kelas + nilai), sebelum
+    # shard dan manifest ditulis ulang
+    with open(os.path.join(path, TXN_FILE), "w", encoding="utf-8") as f:
+        json.dump([
+            {"op": "put", "nisn": "1", "data": siswa("A", "Y", {"IPA": 70})},
+            {"op": "nilai", "nisn": "2", "data": {"IPS": 60}},
+        ], f)
+
+    store = ShardedStore(path)
+    assert not os.path.exists(os.path.join(path, TXN_FILE))
+    assert store.read_shard("X") == {"2": siswa("B", "X", {"IPS": 60})}
+    assert store.read_shard("Y") == {"1": siswa("A", "Y", {"IPA": 70})}
+    assert store.kelas_of("1") == "Y"
+    assert store.summaries()["Y"]["siswa"] == 1
+
+
+def test_iter_students_satu_shard_sekaligus(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.shards")
+    store = ShardedStore(path)
+    store.write_snapshot({"2": siswa("B", "X"), "1": siswa("A", "X"), "3": siswa("C", "Y")})
+    read = []
+    original = ShardedStore.read_shard
+    monkeypatch.setattr(ShardedStore, "read_shard", lambda self, kelas, report=None: read.append(kelas) or original(self, kelas))
+
+    rows = store.iter_students()
+    assert next(rows)[0] == "1" and read == ["X"]
+    assert [row[0] for row in rows] == ["2", "3"] and read == ["X", "Y"]
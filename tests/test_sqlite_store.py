@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from rapor.sqlite_store import SQLiteStore, migrate_json_to_sqlite
+from rapor.storage import JournalStore
+
+RECORDS = [
+    {"op": "put", "nisn": "2", "data": {"nama": "B", "kelas": "X", "nilai": {"IPA": 70, "IPS": 60}}},
+    {"op": "put", "nisn": "1", "data": {"nama": "A", "kelas": "Y"}},
+    {"op": "nilai", "nisn": "1", "data": {"Matematika": 90}},
+    {"op": "put", "nisn": "2", "data": {"nama": "B", "kelas": "X", "nilai": {"IPA": 75}}},
+    {"op": "rename", "old": "1", "nisn": "4", "data": {"nama": "A", "kelas": "Y", "nilai": {"Matematika": 95}}},
+    {"op": "put", "nisn": "3", "data": {"nama": "C", "kelas": "X"}},
+    {"op": "delete", "nisn": "3"},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteStore(str(tmp_path / "data.db"))
+    yield store
+    store.close()
+
+
+def test_hasil_sama_dengan_journal(tmp_path, store):
+    journal = JournalStore(str(tmp_path / "data.json"))
+    journal.apply_batch(RECORDS)
+    store.apply_batch(RECORDS)
+    assert store.load() == journal.load()
+
+
+def test_iter_students_per_halaman(store):
+    store.write_snapshot({
+        str(n): {"nama": f"S{n}", "kelas": "X" if n % 2 else "Y", "nilai": {"IPA": n}} for n in range(10, 30)
+    })
+    rows = list(store.iter_students(page_size=3))
+    assert [row[0] for row in rows] == [str(n) for n in range(10, 30)]
+    assert rows[0] == ("10", "S10", "Y", {"IPA": 10})
+    assert [row[0] for row in store.iter_students("X", page_size=4)] == [str(n) for n in range(11, 30, 2)]
+
+
+def test_hapus_siswa_ikut_menghapus_nilai(store):
+    store.put("1", {"nama": "A", "kelas": "X", "nilai": {"IPA": 80}})
+    store.delete("1")
+    store.put("1", {"nama": "A", "kelas": "X"})
+    assert store.load() == {"1": {"nama": "A", "kelas": "X"}}
+
+
+def test_migrasi_dari_json(tmp_path):
+    source = tmp_path / "data_siswa.json"
+    source.write_text(json.dumps({"1": {"nama": "A", "kelas": "X", "nilai": {"IPA": 80}}}), encoding="utf-8")
+    target = str(tmp_path / "data_siswa.db")
+    assert migrate_json_to_sqlite(str(source), target) == 1
+    with pytest.raises(ValueError):
+        migrate_json_to_sqlite(str(source), target)
+
+    store = SQLiteStore(target)
+    assert store.load() == {"1": {"nama": "A", "kelas": "X", "nilai": {"IPA": 80}}}
+    store.close()
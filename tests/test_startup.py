@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+from main_rapor import RaporApp
+
+HEAVY = ["fpdf", "numpy", "openpyxl", "rapor.pdf", "rapor.batch", "rapor.analytics"]
+
+
+def loaded_modules(module, names):
+    code = f"import sys, {module}; print(' '.join(m for m in {names!r} if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return out.stdout.split()
+
+
+def test_import_gui_tanpa_modul_berat():
+    assert loaded_modules("main_rapor", HEAVY) == []
+
+
+def test_import_cli_tanpa_tkinter():
+    assert loaded_modules("rapor.cli", HEAVY + ["tkinter", "customtkinter"]) == []
+
+
+class FakePage:
+    made = []
+
+    def __init__(self, parent, app):
+        self.dirty = False
+        self.updates = 0
+        FakePage.made.append(self)
+
+    def grid(self, **kwargs):
+        pass
+
+    def update_contents(self):
+        self.updates += 1
+
+    def tkraise(self):
+        pass
+
+
+class FakeApp:
+    get_page = RaporApp.get_page
+    show_page = RaporApp.show_page
+
+    def __init__(self):
+        self.content = None
+        self.pages = {}
+        self.page_classes = {"dashboard": FakePage, "mapel": FakePage}
+        self.current_page = None
+
+
+def test_page_dibuat_saat_pertama_dibuka():
+    FakePage.made = []
+    app = FakeApp()
+    assert app.pages == {} and FakePage.made == []
+
+    app.show_page("dashboard")
+    app.show_page("dashboard")
+    page = app.pages["dashboard"]
+    assert FakePage.made == [page]
+    # digambar sekali saja selama datanya tidak berubah
+    assert page.updates == 1 and app.current_page == "dashboard"
+    assert app.get_page("tidak_ada") is None
@@ -0,0 +1,33 @@
+import pytest
+
+from rapor import core
+from rapor.student import Student
+
+
+@pytest.fixture
+def restore_rules():
+    rules = core.RULES
+    yield
+    core.set_rules(rules)
+
+
+def test_nilai_hanya_baca():
+    student = Student.from_dict({"nama": "A", "kelas": "X", "nilai": {"Matematika": 80}})
+    with pytest.raises(TypeError):
+        student["nilai"]["Matematika"] = 90
+    student.set_nilai({"Matematika": 90})
+    assert student["nilai"] == {"Matematika": 90}
+    assert type(student.to_dict()["nilai"]) is dict
+
+
+def test_mapel_mengikuti_set_rules(restore_rules):
+    old = Student.from_dict({"nama": "A", "kelas": "X", "nilai": {"Matematika": 80}})
+    rules = core.RULES.to_dict()
+    rules["mapel"] = ["Kimia"] + list(rules["mapel"])
+    core.set_rules(core.RULES.from_dict(rules))
+
+    new = Student.from_dict({"nama": "B", "kelas": "X", "nilai": {"Kimia": 70, "Matematika": 60}})
+    assert new.subjects[0] == "Kimia" and not new.others
+    # siswa lama tetap terbaca dengan urutan mapel saat nilainya ditulis
+    assert old["nilai"] == {"Matematika": 80}
+    assert Student.from_dict(old).subjects == new.subjects
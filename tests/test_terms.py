@@ -0,0 +1,72 @@
+import pytest
+
+from rapor.storage import JournalStore
+from rapor.terms import TermHistory, close_term
+
+
+def make_store(tmp_path):
+    store = JournalStore(str(tmp_path / "data_siswa.json"))
+    store.write_snapshot({"1": {"nama": "A", "kelas": "X", "nilai": {"Matematika": 80}}})
+    return store
+
+
+def test_tutup_ulang_ditolak_tanpa_force(tmp_path):
+    store = make_store(tmp_path)
+    history = TermHistory(str(tmp_path / "riwayat"))
+    close_term(store, store.load(), history, "Ganjil", "Genap")
+
+    with pytest.raises(ValueError):
+        close_term(store, store.load(), history, "Ganjil", "Genap")
+    assert history.record("Ganjil", "1")["nilai"] == {"Matematika": 80}
+
+
+def crash(self, next_term):
+    raise OSError("proses mati")
+
+
+def test_tutup_terhenti_dilanjutkan_tanpa_menimpa_arsip(tmp_path, monkeypatch):
+    store = make_store(tmp_path)
+    history = TermHistory(str(tmp_path / "riwayat"))
+    data = store.load()
+
+    # proses mati setelah data aktif dikosongkan, sebelum index selesai
+    monkeypatch.setattr(TermHistory, "finish_close", crash)
+    with pytest.raises(OSError):
+        close_term(store, data, history, "Ganjil", "Genap")
+    monkeypatch.undo()
+
+    history = TermHistory(str(tmp_path / "riwayat"))
+    assert history.menutup["nama"] == "Ganjil"
+    close_term(store, store.load(), history, "Ganjil", "Genap")
+
+    history = TermHistory(str(tmp_path / "riwayat"))
+    assert history.menutup is None and history.aktif == "Genap"
+    assert history.record("Ganjil", "1")["nilai"] == {"Matematika": 80}
+    assert "nilai" not in store.load()["1"]
+
+
+def test_force_menimpa_di_posisi_semula(tmp_path):
+    store = make_store(tmp_path)
+    history = TermHistory(str(tmp_path / "riwayat"))
+    for nama, next_term in (("2024 Ganjil", "2024 Genap"), ("2024 Genap", "2025 Ganjil")):
+        store.write_snapshot({"1": {"nama": "A", "kelas": "X", "nilai": {"Matematika": 80}}})
+        close_term(store, store.load(), history, nama, next_term)
+
+    store.write_snapshot({"1": {"nama": "A", "kelas": "X", "nilai": {"Matematika": 60}}})
+    close_term(store, store.load(), history, "2024 Ganjil", "2025 Ganjil", force=True)
+
+    assert history.terms() == ["2024 Ganjil", "2024 Genap"]
+    assert [row[0] for row in history.student_history("1", last=1)] == ["2024 Genap"]
+    assert history.student_history("1")[0][2] == 60
+
+
+def test_index_dibaca_ulang_setelah_diubah_instance_lain(tmp_path):
+    store = make_store(tmp_path)
+    gui = TermHistory(str(tmp_path / "riwayat"))
+    assert not gui.changed()
+
+    close_term(store, store.load(), TermHistory(str(tmp_path / "riwayat")), "Ganjil", "Genap")
+    assert gui.changed()
+    gui.reload()
+    assert not gui.changed()
+    assert gui.terms() == ["Ganjil"] and gui.aktif == "Genap"
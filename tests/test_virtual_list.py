@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from main_rapor import VirtualList
+
+
+class FakeList:
+    # logika VirtualList tanpa widget Tk: tinggi tampilan 5 baris
+    set_items = VirtualList.set_items
+    replace_item = VirtualList.replace_item
+    remove_item = VirtualList.remove_item
+    scroll_to = VirtualList.scroll_to
+    on_scrollbar = VirtualList.on_scrollbar
+    on_wheel = VirtualList.on_wheel
+
+    def __init__(self):
+        self.items = []
+        self.offset = 0
+        self.renders = 0
+
+    def visible_count(self):
+        return 5
+
+    def render(self):
+        self.renders += 1
+
+
+def test_scroll_dibatasi_jumlah_item():
+    lst = FakeList()
+    lst.set_items([str(i) for i in range(12)])
+    lst.scroll_to(100)
+    assert lst.offset == 7
+    lst.scroll_to(-3)
+    assert lst.offset == 0
+
+    lst.on_scrollbar("moveto", "0.5")
+    assert lst.offset == 6
+    lst.on_scrollbar("scroll", "1", "pages")
+    assert lst.offset == 7
+    lst.on_wheel(SimpleNamespace(num=4, delta=0))
+    assert lst.offset == 4
+
+
+def test_render_hanya_saat_posisi_berubah():
+    lst = FakeList()
+    lst.set_items(list(range(3)))
+    renders = lst.renders
+    lst.scroll_to(2)  # semua item sudah terlihat
+    assert lst.offset == 0 and lst.renders == renders
+
+
+def test_ganti_dan_hapus_item_menjaga_posisi():
+    lst = FakeList()
+    lst.set_items([str(i) for i in range(12)])
+    lst.scroll_to(7)
+    assert lst.replace_item("3", "30") and lst.items[3] == "30" and lst.offset == 7
+    assert lst.remove_item("11") and lst.offset == 6
+    assert not lst.remove_item("tidak ada")